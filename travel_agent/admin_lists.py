@@ -0,0 +1,55 @@
+"""
+TravelEase - Admin Lists
+Users and bookings for the admin pages a page at a time, newest first, with search and filters applied in SQL.
+"""
+PAGE_SIZE = 50
+USER_COLUMNS = "u.id, u.name, u.email, u.phone, u.points, u.created_at"
+BOOKING_COLUMNS = "b.id, u.name, b.booking_type, b.origin, b.destination, b.travelers, b.total_cost, b.status, b.created_at"
+STATUSES = ("confirmed", "cancelled")
+
+
+def _like(text):
+    """LIKE pattern matching text anywhere, with its own % and _ taken literally"""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _page(conn, sql, alias, where, params, after, limit):
+    # Keyset pagination on (created_at, id): a page costs the same however deep it is, and rows added meanwhile
+    # don't shift it. created_at is the last column, id the first, of every row these queries return
+    if after is not None:
+        where.append(f"({alias}.created_at, {alias}.id) < (?, ?)")
+        params.extend(after)
+    rows = conn.execute(f"{sql} {'WHERE ' + ' AND '.join(where) if where else ''} "
+                        f"ORDER BY {alias}.created_at DESC, {alias}.id DESC LIMIT ?", (*params, limit + 1)).fetchall()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][-1], rows[-1][0])
+
+
+def users_page(conn, after=None, search="", min_points=None, limit=PAGE_SIZE):
+    """(USER_COLUMNS rows, cursor for the next page or None); search matches name, email or phone"""
+    where, params = [], []
+    if search:
+        where.append("(u.name LIKE ? ESCAPE '\\' OR u.email LIKE ? ESCAPE '\\' OR u.phone LIKE ? ESCAPE '\\')")
+        params.extend([_like(search)] * 3)
+    if min_points is not None:
+        where.append("u.points >= ?")
+        params.append(min_points)
+    return _page(conn, f"SELECT {USER_COLUMNS} FROM users u", "u", where, params, after, limit)
+
+
+def bookings_page(conn, after=None, search="", booking_type=None, status=None, limit=PAGE_SIZE):
+    """(BOOKING_COLUMNS rows, cursor for the next page or None); search matches traveller name, origin or destination"""
+    where, params = [], []
+    if search:
+        where.append("(u.name LIKE ? ESCAPE '\\' OR b.origin LIKE ? ESCAPE '\\' OR b.destination LIKE ? ESCAPE '\\')")
+        params.extend([_like(search)] * 3)
+    if booking_type:
+        where.append("b.booking_type = ?")
+        params.append(booking_type)
+    if status:
+        where.append("b.status = ?")
+        params.append(status)
+    return _page(conn, f"SELECT {BOOKING_COLUMNS} FROM bookings b JOIN users u ON u.id = b.user_id", "b", where, params,
+                 after, limit)
@@ -0,0 +1,52 @@
+"""
+TravelEase - Booking Analytics
+Revenue, booking and route rollups read from the trigger-maintained stats and route_stats tables, never from bookings.
+"""
+DAYS = 30  # periods of history on the dashboard
+PERIODS = ("day", "week")
+ROUTE_ORDERS = ("bookings", "revenue")
+
+
+def _average(total, count):
+    return total / count if count else 0.0
+
+
+def totals(conn):
+    row = conn.execute("SELECT users, bookings, revenue, travelers FROM stats WHERE scope = 'all' AND key = ''").fetchone()
+    users, count, revenue, travelers = row or (0, 0, 0, 0)
+    return {"total_users": users, "total_bookings": count, "total_revenue": revenue,
+            "avg_travelers": _average(travelers, count), "avg_booking_value": _average(revenue, count)}
+
+
+def by_type(conn):
+    """(booking type, bookings, revenue, average travelers), highest revenue first"""
+    rows = conn.execute("""SELECT key, bookings, revenue, travelers FROM stats WHERE scope = 'type' AND bookings > 0
+        ORDER BY revenue DESC""").fetchall()
+    return [(kind, count, revenue, _average(travelers, count)) for kind, count, revenue, travelers in rows]
+
+
+def series(conn, period="day", limit=DAYS):
+    """(period start, new users, bookings, revenue, travelers) for the latest periods with activity, oldest first.
+
+    Weeks start on Monday and are summed from the daily rows, so either period reads at most 7 * limit rows.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}")
+    if period == "day":
+        rows = conn.execute("""SELECT key, users, bookings, revenue, travelers FROM stats WHERE scope = 'day' AND key != ''
+            ORDER BY key DESC LIMIT ?""", (limit,)).fetchall()
+    else:
+        rows = conn.execute("""SELECT date(key, 'weekday 0', '-6 days') AS week, SUM(users), SUM(bookings), SUM(revenue),
+            SUM(travelers) FROM stats WHERE scope = 'day' AND key != '' AND key >= (
+                SELECT date(MAX(key), 'weekday 0', ?) FROM stats WHERE scope = 'day' AND key != '')
+            GROUP BY week ORDER BY week DESC LIMIT ?""", (f"-{7 * limit - 1} days", limit)).fetchall()
+    return rows[::-1]
+
+
+def top_routes(conn, k=10, order="bookings"):
+    """(origin, destination, bookings, revenue, average travelers) for the k busiest or highest-earning routes"""
+    if order not in ROUTE_ORDERS:
+        raise ValueError(f"order must be one of {ROUTE_ORDERS}")
+    rows = conn.execute(f"""SELECT origin, destination, bookings, revenue, travelers FROM route_stats WHERE bookings > 0
+        ORDER BY {order} DESC, origin, destination LIMIT ?""", (k,)).fetchall()
+    return [(origin, dest, count, revenue, _average(travelers, count)) for origin, dest, count, revenue, travelers in rows]
@@ -5,10 +5,23 @@ Deploy on Streamlit Cloud for free!
 import streamlit as st
 import sqlite3
 import hashlib
-import math
-import requests
 from datetime import datetime, timedelta
 import os
+import database
+import db_pool
+import location_index
+import geocode_cache
+import routing
+import distance_matrix
+import geo
+import spatial_index
+import pricing
+import regions
+import quote_cache
+import itinerary
+import bookings
+import analytics
+import admin_lists
 
 # Page config
 st.set_page_config(
@@ -169,268 +182,143 @@ st.markdown("""
 
 # ============== DATABASE ==============
 def get_database():
-    conn = sqlite3.connect('travel_agent.db', check_same_thread=False)
-    cursor = conn.cursor()
-    
-    cursor.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        phone TEXT,
-        password TEXT NOT NULL,
-        points INTEGER DEFAULT 100,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    cursor.execute('''CREATE TABLE IF NOT EXISTS bookings (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        booking_type TEXT,
-        origin TEXT,
-        destination TEXT,
-        travelers INTEGER,
-        total_cost REAL,
-        status TEXT DEFAULT 'confirmed',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    cursor.execute('''CREATE TABLE IF NOT EXISTS locations (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT UNIQUE,
-        lat REAL,
-        lng REAL,
-        country TEXT,
-        region TEXT,
-        airport_code TEXT
-    )''')
-    
-    # Add airport_code column if it doesn't exist (migration for old databases)
-    try:
-        cursor.execute("ALTER TABLE locations ADD COLUMN airport_code TEXT")
-        conn.commit()
-    except:
-        pass  # Column already exists
-    
-    # Seed locations - delete old and insert fresh
-    cursor.execute("DELETE FROM locations")
-    locations = [
-        ("Mumbai", 19.0760, 72.8777, "India", "south_asia", "BOM"),
-        ("Delhi", 28.6139, 77.2090, "India", "south_asia", "DEL"),
-        ("Bangalore", 12.9716, 77.5946, "India", "south_asia", "BLR"),
-        ("Chennai", 13.0827, 80.2707, "India", "south_asia", "MAA"),
-        ("Kolkata", 22.5726, 88.3639, "India", "south_asia", "CCU"),
-        ("Hyderabad", 17.3850, 78.4867, "India", "south_asia", "HYD"),
-        ("Pune", 18.5204, 73.8567, "India", "south_asia", "PNQ"),
-        ("Jaipur", 26.9124, 75.7873, "India", "south_asia", "JAI"),
-        ("Goa", 15.2993, 74.1240, "India", "south_asia", "GOI"),
-        ("Agra", 27.1767, 78.0081, "India", "south_asia", "AGR"),
-        ("Varanasi", 25.3176, 82.9739, "India", "south_asia", "VNS"),
-        ("Udaipur", 24.5854, 73.7125, "India", "south_asia", "UDR"),
-        ("Manali", 32.2396, 77.1887, "India", "south_asia", "KUU"),
-        ("Shimla", 31.1048, 77.1734, "India", "south_asia", "SLV"),
-        ("Rishikesh", 30.0869, 78.2676, "India", "south_asia", "DED"),
-        ("Paris", 48.8566, 2.3522, "France", "western_europe", "CDG"),
-        ("London", 51.5074, -0.1278, "UK", "western_europe", "LHR"),
-        ("New York", 40.7128, -74.0060, "USA", "north_america", "JFK"),
-        ("Tokyo", 35.6762, 139.6503, "Japan", "east_asia", "NRT"),
-        ("Dubai", 25.2048, 55.2708, "UAE", "middle_east", "DXB"),
-        ("Singapore", 1.3521, 103.8198, "Singapore", "southeast_asia", "SIN"),
-        ("Bangkok", 13.7563, 100.5018, "Thailand", "southeast_asia", "BKK"),
-        ("Bali", -8.4095, 115.1889, "Indonesia", "southeast_asia", "DPS"),
-        ("Sydney", -33.8688, 151.2093, "Australia", "australia", "SYD"),
-    ]
-    cursor.executemany("INSERT OR IGNORE INTO locations (name, lat, lng, country, region, airport_code) VALUES (?, ?, ?, ?, ?, ?)", locations)
-    conn.commit()
-    
-    return conn
-
-
-def get_user(conn, email, password):
-    cursor = conn.cursor()
+    # Bootstrapped once per process; each session thread reads on its own connection, writes go through the writer queue
+    return db_pool.get_pool(database.DB_PATH)
+
+
+def get_user(db, email, password):
+    cursor = db.connection().cursor()
     pwd_hash = hashlib.sha256(password.encode()).hexdigest()
     cursor.execute("SELECT * FROM users WHERE email=? AND password=?", (email, pwd_hash))
     return cursor.fetchone()
 
 
-def create_user(conn, name, email, phone, password):
-    cursor = conn.cursor()
+def create_user(db, name, email, phone, password):
     pwd_hash = hashlib.sha256(password.encode()).hexdigest()
     try:
-        cursor.execute("INSERT INTO users (name, email, phone, password) VALUES (?, ?, ?, ?)", 
-                      (name, email, phone, pwd_hash))
-        conn.commit()
+        db.write(lambda conn: conn.execute("INSERT INTO users (name, email, phone, password) VALUES (?, ?, ?, ?)",
+                                           (name, email, phone, pwd_hash)))
         return True
     except sqlite3.IntegrityError:
         return False
 
 
-def get_location(conn, name):
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, lat, lng, country, region, COALESCE(airport_code, '') as airport_code FROM locations WHERE LOWER(name) LIKE ?", (f"%{name.lower()}%",))
-    return cursor.fetchone()
+def get_location(db, name):
+    # (id, name, lat, lng, country, region, airport_code), best ranked match
+    return location_index.find_location(db.connection(), name)
 
 
-def get_all_locations(conn):
-    cursor = conn.cursor()
+def get_all_locations(db):
+    cursor = db.connection().cursor()
     cursor.execute("SELECT name FROM locations ORDER BY name")
     return [row[0] for row in cursor.fetchall()]
 
 
-def add_booking(conn, user_id, booking_type, origin, dest, travelers, cost):
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, total_cost) VALUES (?, ?, ?, ?, ?, ?)",
-                  (user_id, booking_type, origin, dest, travelers, cost))
-    conn.commit()
+def add_booking(db, user_id, booking_type, origin, dest, travelers, cost):
+    """Booking plus its reward points in one transaction, returns the points earned"""
+    return bookings.book(db, user_id, booking_type, origin, dest, travelers, cost)["points"]
 
 
-def get_user_bookings(conn, user_id):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM bookings WHERE user_id=? ORDER BY created_at DESC", (user_id,))
-    return cursor.fetchall()
+def get_user_bookings(db, user_id, after=None):
+    """One page of history newest first and the cursor for the next page (None on the last)"""
+    return bookings.history(db.connection(), user_id, after)
 
 
-def update_points(conn, user_id, points):
-    cursor = conn.cursor()
-    cursor.execute("UPDATE users SET points = points + ? WHERE id = ?", (points, user_id))
-    conn.commit()
+def get_all_users(db, after=None, search=""):
+    """One page of users newest first and the cursor for the next page (None on the last)"""
+    return admin_lists.users_page(db.connection(), after, search)
 
 
-def get_all_users(conn):
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, email, phone, points, created_at FROM users ORDER BY created_at DESC")
-    return cursor.fetchall()
+def get_all_bookings(db, after=None, search="", booking_type=None, status=None):
+    """One page of bookings newest first and the cursor for the next page (None on the last)"""
+    return admin_lists.bookings_page(db.connection(), after, search, booking_type, status)
 
 
-def get_all_bookings(conn):
-    cursor = conn.cursor()
-    cursor.execute("""SELECT b.id, u.name, b.booking_type, b.origin, b.destination, 
-                   b.travelers, b.total_cost, b.status, b.created_at FROM bookings b 
-                   JOIN users u ON b.user_id = u.id ORDER BY b.created_at DESC""")
-    return cursor.fetchall()
+def get_stats(db):
+    """Totals and per-type rollups, read from the stats table"""
+    conn = db.connection()
+    return dict(analytics.totals(conn), by_type=analytics.by_type(conn))
 
 
-def get_stats(conn):
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM users")
-    total_users = cursor.fetchone()[0]
-    cursor.execute("SELECT COUNT(*) FROM bookings")
-    total_bookings = cursor.fetchone()[0]
-    cursor.execute("SELECT COALESCE(SUM(total_cost), 0) FROM bookings")
-    total_revenue = cursor.fetchone()[0]
-    return {"total_users": total_users, "total_bookings": total_bookings, "total_revenue": total_revenue}
+def get_analytics(db, period="day", route_order="bookings"):
+    conn = db.connection()
+    return {"series": analytics.series(conn, period), "routes": analytics.top_routes(conn, order=route_order)}
 
 
 # ============== LOCATION SERVICE ==============
-def geocode(conn, query):
-    loc = get_location(conn, query)
-    if loc:
-        return {"name": str(loc[0]), "lat": float(loc[1]), "lng": float(loc[2]), "country": str(loc[3]), "code": str(loc[5]) if len(loc) > 5 and loc[5] else ""}
-    
-    try:
-        url = "https://nominatim.openstreetmap.org/search"
-        headers = {"User-Agent": "TravelEase/1.0"}
-        params = {"q": query, "format": "json", "limit": 1}
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        data = response.json()
-        if data:
-            result = data[0]
-            parts = result.get("display_name", "").split(", ")
-            return {"name": query.title(), "lat": float(result["lat"]), "lng": float(result["lon"]), 
-                   "country": parts[-1] if parts else "Unknown", "code": ""}
-    except:
-        pass
-    return None
+def geocode(db, query):
+    loc = get_location(db, query)
+    if not loc:
+        # Nominatim hits and misses are cached, hits are promoted into locations and read back with their id
+        result = geocode_cache.get_cache(db).resolve(query)
+        loc = get_location(db, query) if result else None
+        if not loc:
+            return spatial_index.with_airport(db.connection(), result)
+    # Towns without an airport of their own show the nearest one
+    return spatial_index.with_airport(db.connection(), {"id": loc[0], "name": str(loc[1]), "lat": float(loc[2]), "lng": float(loc[3]),
+                                                        "country": str(loc[4]), "code": str(loc[6])})
 
 
 def calculate_distance(lat1, lng1, lat2, lng2):
-    R = 6371
-    lat1_rad, lat2_rad = math.radians(lat1), math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lng = math.radians(lng2 - lng1)
-    a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng/2)**2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return geo.distance(lat1, lng1, lat2, lng2)
 
 
-def get_route_info(conn, origin, dest):
-    origin_loc = geocode(conn, origin)
-    dest_loc = geocode(conn, dest)
+def get_route_info(db, origin, dest):
+    """(route, {}) or (None, {place: reason}); origin and destination are geocoded concurrently"""
+    (origin_loc, dest_loc), failures = routing.resolve_places(lambda q: geocode(db, q), [origin, dest])
     if not origin_loc or not dest_loc:
-        return None
-    direct_distance = calculate_distance(origin_loc["lat"], origin_loc["lng"], dest_loc["lat"], dest_loc["lng"])
-    road_distance = direct_distance * 1.3
+        return None, failures
+    direct_distance = distance_matrix.get_matrix(db).great_circle(origin_loc, dest_loc)
+    road_distance = direct_distance * distance_matrix.ROAD_FACTOR
     return {"origin": origin_loc, "destination": dest_loc, "distance_km": round(road_distance, 1), 
-            "flight_hours": round(direct_distance / 800 + 1.5, 1)}
+            "flight_hours": round(direct_distance / 800 + 1.5, 1)}, {}
 
 
 # ============== PRICING ENGINE ==============
-def calculate_prices(distance, origin_country, dest_country, adults, children, nights):
-    cost_index = {"south_asia": 1.0, "southeast_asia": 1.2, "east_asia": 2.5, "middle_east": 2.0, 
-                  "western_europe": 3.5, "north_america": 3.0, "australia": 3.2}
-    base_prices = {"flight_per_km": 5, "train_per_km": 0.8, "bus_per_km": 0.5, "cab_per_km": 12,
-                   "hotel_budget": 800, "hotel_mid": 3000, "hotel_luxury": 12000}
-    
-    regions = {"south_asia": ["India", "Nepal", "Bangladesh", "Sri Lanka"], 
-               "southeast_asia": ["Thailand", "Vietnam", "Indonesia", "Malaysia", "Singapore"],
-               "east_asia": ["Japan", "South Korea"], "middle_east": ["UAE", "Saudi Arabia"], 
-               "western_europe": ["UK", "France", "Germany", "Italy"],
-               "north_america": ["USA", "Canada"], "australia": ["Australia", "New Zealand"]}
-    
-    def get_region(country):
-        for region, countries in regions.items():
-            if country in countries:
-                return region
-        return "south_asia"
-    
-    travelers = adults + children
-    origin_region = get_region(origin_country)
-    dest_region = get_region(dest_country)
-    avg_index = (cost_index.get(origin_region, 1) + cost_index.get(dest_region, 1)) / 2
-    is_international = origin_country != dest_country
-    
-    flight_base = base_prices["flight_per_km"] * distance * avg_index * (1.5 if is_international else 1)
-    flight_economy = max(2000, min(int(flight_base * 0.8), 150000))
-    flight_business = int(flight_economy * 2.5)
-    
-    train_prices, bus_prices = [], []
-    if not is_international and distance < 2000:
-        train_base = base_prices["train_per_km"] * distance * cost_index.get(origin_region, 1)
-        train_prices = [{"type": "Sleeper", "price": max(200, int(train_base * 0.6))}, 
-                       {"type": "AC 3-Tier", "price": max(400, int(train_base))},
-                       {"type": "AC 2-Tier", "price": max(600, int(train_base * 1.5))}, 
-                       {"type": "AC First", "price": max(1000, int(train_base * 2.5))}]
-    if not is_international and distance < 1500:
-        bus_base = base_prices["bus_per_km"] * distance * cost_index.get(origin_region, 1)
-        bus_prices = [{"type": "Non-AC", "price": max(150, int(bus_base * 0.5))}, 
-                     {"type": "AC Seater", "price": max(250, int(bus_base * 0.8))},
-                     {"type": "AC Sleeper", "price": max(400, int(bus_base * 1.2))}, 
-                     {"type": "Volvo", "price": max(600, int(bus_base * 1.8))}]
-    
-    cab_base = base_prices["cab_per_km"] * distance * cost_index.get(dest_region, 1)
-    cab_prices = [{"type": "Sedan", "price": max(500, int(cab_base * 0.8))}, 
-                 {"type": "SUV", "price": max(800, int(cab_base * 1.2))},
-                 {"type": "Luxury", "price": max(1500, int(cab_base * 2))}]
-    
-    dest_index = cost_index.get(dest_region, 1)
-    hotels = {"budget": int(base_prices["hotel_budget"] * dest_index), 
-              "mid_range": int(base_prices["hotel_mid"] * dest_index), 
-              "luxury": int(base_prices["hotel_luxury"] * dest_index)}
-    
-    rooms = max(1, (travelers + 1) // 2)
-    packages = []
-    
-    cheapest = bus_prices[0]["price"] if bus_prices else (train_prices[0]["price"] if train_prices else flight_economy)
-    budget_total = (cheapest * travelers * 2) + (hotels["budget"] * nights * rooms) + (500 * (nights + 1) * travelers)
-    packages.append({"name": "💰 Budget", "total": budget_total, "per_person": budget_total // travelers, "color": "#10B981"})
-    
-    mid_transport = train_prices[1]["price"] if len(train_prices) > 1 else flight_economy
-    comfort_total = (mid_transport * travelers * 2) + (hotels["mid_range"] * nights * rooms) + (1500 * (nights + 1) * travelers)
-    packages.append({"name": "⭐ Comfort", "total": comfort_total, "per_person": comfort_total // travelers, "color": "#0770E3"})
-    
-    premium_total = (flight_business * travelers * 2) + (hotels["luxury"] * nights * rooms) + (4000 * (nights + 1) * travelers)
-    packages.append({"name": "👑 Premium", "total": premium_total, "per_person": premium_total // travelers, "color": "#FF6B00"})
-    
-    return {"flights": [{"type": "Economy", "price": flight_economy}, {"type": "Business", "price": flight_business}],
-            "trains": train_prices, "buses": bus_prices, "cabs": cab_prices, "hotels": hotels, "packages": packages}
+def calculate_prices(distance, origin_country, dest_country, adults, children, nights, departure=None):
+    # Lazy: the open tab prices its own mode and packages, other modes once their section is opened
+    return pricing.quote(distance, origin_country, dest_country, adults, children, nights, pricing.WEB, departure)
+
+
+def get_quote(db, origin, dest, adults, children, nights, departure=None):
+    """(route, prices, failures) for departure (a date); known city pairs are served from the process-wide quote cache"""
+    cache = quote_cache.get_cache(db)
+    day = departure.isoformat() if departure else None
+    origin_loc, dest_loc = get_location(db, origin), get_location(db, dest)
+    if origin_loc and dest_loc:
+        cached = cache.get(("web", origin_loc[0], dest_loc[0], adults, children, nights, day))
+        if cached:
+            return (*cached, {})
+    route, failures = get_route_info(db, origin, dest)
+    if not route:
+        return None, None, failures
+    prices = calculate_prices(route["distance_km"], route["origin"]["country"], route["destination"]["country"],
+                              adults, children, nights, departure)
+    if route["origin"].get("id") and route["destination"].get("id"):
+        cache.put(("web", route["origin"]["id"], route["destination"]["id"], adults, children, nights, day), (route, prices))
+    return route, prices, {}
+
+
+def get_fare_calendar(db, route, start, mode="flights"):
+    """Fare calendar for one mode on the route from start; cached per route, so the grid re-renders without repricing"""
+    origin, dest = route["origin"], route["destination"]
+    key = ("web-calendar", origin.get("id"), dest.get("id"), mode, start.isoformat(), pricing.WINDOW_DAYS)
+    cache = quote_cache.get_cache(db)
+    calendar = cache.get(key) if key[1] and key[2] else None
+    if calendar is None:
+        calendar = pricing.fare_calendar(route["distance_km"], origin["country"], dest["country"], start,
+                                         profile=pricing.WEB, mode=mode)
+        if key[1] and key[2] and calendar is not None:
+            cache.put(key, calendar)
+    return calendar
+
+
+def plan_itinerary(db, start, stops, objective, round_trip):
+    """(plan, {}) or (None, {place: reason}); every city is geocoded concurrently first"""
+    locs, failures = routing.resolve_places(lambda q: geocode(db, q), [start] + stops)
+    if failures:
+        return None, failures
+    return itinerary.plan(db, locs[0], locs[1:], objective, round_trip, profile=pricing.WEB), {}
 
 
 # ============== SESSION STATE ==============
@@ -440,12 +328,16 @@ if 'page' not in st.session_state:
     st.session_state.page = 'home'
 if 'search_results' not in st.session_state:
     st.session_state.search_results = None
+if 'itinerary' not in st.session_state:
+    st.session_state.itinerary = None
+if 'page_cursors' not in st.session_state:
+    st.session_state.page_cursors = {}  # paged list -> its filters and where each page up to the current one starts
 
 
 # ============== MAIN APP ==============
 def main():
-    conn = get_database()
-    locations = get_all_locations(conn)
+    db = get_database()
+    locations = get_all_locations(db)
     
     # Header
     col1, col2, col3 = st.columns([2, 6, 2])
@@ -461,6 +353,7 @@ def main():
             with user_col1:
                 if st.button(f"👤 {st.session_state.user[1].split()[0]}", use_container_width=True):
                     st.session_state.page = 'profile'
+                    st.session_state.page_cursors.pop("history", None)
                     st.rerun()
             with user_col2:
                 if st.button("Logout", use_container_width=True):
@@ -474,39 +367,44 @@ def main():
     st.markdown("---")
     
     # Navigation tabs
-    tabs = st.tabs(["✈️ Flights", "🏨 Hotels", "🚂 Trains", "🚌 Buses", "🚕 Cabs", "🏖️ Holidays", "🛡️ Admin"])
+    # Tabs track which one is open, so search results render (and get priced) in that tab only
+    tabs = st.tabs(["✈️ Flights", "🏨 Hotels", "🚂 Trains", "🚌 Buses", "🚕 Cabs", "🏖️ Holidays", "🗺️ Multi-City", "🛡️ Admin"],
+                   key="nav_tabs", on_change="rerun")
     
     with tabs[0]:  # Flights
-        show_search_form(conn, locations, "flights")
+        show_search_form(db, locations, "flights", tabs[0].open)
     
     with tabs[1]:  # Hotels
-        show_search_form(conn, locations, "hotels")
+        show_search_form(db, locations, "hotels", tabs[1].open)
     
     with tabs[2]:  # Trains
-        show_search_form(conn, locations, "trains")
+        show_search_form(db, locations, "trains", tabs[2].open)
     
     with tabs[3]:  # Buses
-        show_search_form(conn, locations, "buses")
+        show_search_form(db, locations, "buses", tabs[3].open)
     
     with tabs[4]:  # Cabs
-        show_search_form(conn, locations, "cabs")
+        show_search_form(db, locations, "cabs", tabs[4].open)
     
     with tabs[5]:  # Holidays
-        show_search_form(conn, locations, "holidays")
+        show_search_form(db, locations, "holidays", tabs[5].open)
     
-    with tabs[6]:  # Admin
-        show_admin_panel(conn)
+    with tabs[6]:  # Multi-City
+        show_multi_city_form(db, locations)
+    
+    with tabs[7]:  # Admin
+        show_admin_panel(db)
     
     # Show login modal
     if st.session_state.page == 'login':
-        show_login_form(conn)
+        show_login_form(db)
     
     # Show profile
     if st.session_state.page == 'profile' and st.session_state.user:
-        show_profile(conn)
+        show_profile(db)
 
 
-def show_search_form(conn, locations, tab_type):
+def show_search_form(db, locations, tab_type, is_open=True):
     st.markdown("### 🌍 Search Your Perfect Trip")
     
     # Trip type
@@ -523,16 +421,16 @@ def show_search_form(conn, locations, tab_type):
     with col1:
         st.markdown("**FROM**")
         origin = st.selectbox("Origin", locations, index=1, label_visibility="collapsed", key=f"from_{tab_type}")
-        origin_loc = get_location(conn, origin)
+        origin_loc = get_location(db, origin)
         if origin_loc:
-            st.caption(f"[{origin_loc[5] if len(origin_loc) > 5 else ''}] {origin_loc[3]}")
+            st.caption(f"[{origin_loc[6]}] {origin_loc[4]}")
     
     with col2:
         st.markdown("**TO**")
         dest = st.selectbox("Destination", locations, index=0, label_visibility="collapsed", key=f"to_{tab_type}")
-        dest_loc = get_location(conn, dest)
+        dest_loc = get_location(db, dest)
         if dest_loc:
-            st.caption(f"[{dest_loc[5] if len(dest_loc) > 5 else ''}] {dest_loc[3]}")
+            st.caption(f"[{dest_loc[6]}] {dest_loc[4]}")
     
     with col3:
         st.markdown("**DEPARTURE**")
@@ -569,26 +467,166 @@ def show_search_form(conn, locations, tab_type):
     st.markdown("---")
     if st.button("🔍 SEARCH", type="primary", use_container_width=True, key=f"search_{tab_type}"):
         with st.spinner("Searching best deals..."):
-            route = get_route_info(conn, origin, dest)
+            route, prices, failures = get_quote(db, origin, dest, adults, children, nights, dep_date)
             if route:
-                prices = calculate_prices(route["distance_km"], route["origin"]["country"],
-                                         route["destination"]["country"], adults, children, nights)
-                st.session_state.search_results = {"route": route, "prices": prices, 
+                st.session_state.search_results = {"origin": origin, "dest": dest,
+                                                   "route": route, "prices": prices, "dep_date": dep_date,
                                                    "adults": adults, "children": children, "nights": nights}
                 st.rerun()
             else:
-                st.error("Could not find route. Please try different cities.")
+                st.error(f"Could not find route ({routing.describe_failures(failures)}). Please try different cities.")
     
     # Show results
-    if st.session_state.search_results:
-        show_results(conn, st.session_state.search_results, tab_type)
+    if st.session_state.search_results and is_open is not False:
+        show_results(db, st.session_state.search_results, tab_type)
+
+
+def show_multi_city_form(db, locations):
+    st.markdown("### 🗺️ Plan a Multi-City Trip")
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.markdown("**START FROM**")
+        start = st.selectbox("Start", locations, index=1, label_visibility="collapsed", key="multi_start")
+    with col2:
+        st.markdown("**CITIES TO VISIT**")
+        stops = st.multiselect("Cities", [loc for loc in locations if loc != start], label_visibility="collapsed",
+                               key="multi_stops")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        objective = st.radio("Optimize for", ["Shortest distance", "Lowest fare"], horizontal=True, key="multi_objective")
+    with col2:
+        round_trip = st.checkbox("Return to start", value=True, key="multi_round_trip")
+    
+    if st.button("🧭 PLAN ROUTE", type="primary", use_container_width=True, key="search_multi"):
+        if not stops:
+            st.warning("Pick at least one city to visit")
+        else:
+            with st.spinner("Finding the best order..."):
+                plan, failures = plan_itinerary(db, start, stops, "distance" if objective == "Shortest distance" else "fare",
+                                                round_trip)
+            if plan:
+                st.session_state.itinerary = plan
+            else:
+                st.error(f"Could not plan the trip ({routing.describe_failures(failures)}).")
+    
+    plan = st.session_state.itinerary
+    if plan:
+        st.markdown("---")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Legs", len(plan["legs"]))
+        col2.metric("Total Distance", f"{plan['total_km']:,.0f} km")
+        col3.metric("Fares per Person", f"₹{plan['total_fare']:,}")
+        for i, leg in enumerate(plan["legs"], 1):
+            st.markdown(f"""
+            <div style="background: white; padding: 12px 15px; border-radius: 10px; margin: 8px 0;
+                        box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
+                <div style="display: flex; justify-content: space-between;">
+                    <span><b>{i}.</b> {leg['from']['name']} → {leg['to']['name']}</span>
+                    <span style="color: #666;">{leg['distance_km']:,.0f} km</span>
+                    <span style="font-weight: bold; color: #0770E3;">₹{leg['fare']:,}</span>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+        st.caption(f"Order found by {plan['method']}" + (" (optimal)" if plan["optimal"] else " (best found in the time budget)"))
+
+
+def pick_departure(db, tab_type):
+    """Calendar slider callback: reprice the shown search for the picked day and carry it into the search form"""
+    data = st.session_state.search_results
+    day = st.session_state[f"calendar_{tab_type}"]
+    route, prices, _ = get_quote(db, data["origin"], data["dest"], data["adults"], data["children"], data["nights"], day)
+    if route:
+        data.update(route=route, prices=prices, dep_date=day)
+        st.session_state[f"dep_{tab_type}"] = day
+
+
+def show_fare_calendar(db, route, dep_date, mode, tab_type):
+    calendar = get_fare_calendar(db, route, pricing.calendar_start(dep_date), mode)
+    if calendar is None:
+        return
+    days = calendar["dates"].tolist()
+    fares = calendar["lowest"].tolist()
+    ranked = sorted(fares)
+    cheap, dear = ranked[len(ranked) // 3], ranked[2 * len(ranked) // 3]
+    cells = ""
+    for day, fare in zip(days, fares):
+        bg = "#E8F8F0" if fare <= cheap else ("#FFF1E6" if fare > dear else "white")
+        border = "2px solid #0770E3" if day == dep_date else "1px solid #eee"
+        cells += f"""<div style="background: {bg}; border: {border}; border-radius: 8px; padding: 6px; text-align: center;">
+            <div style="font-size: 11px; color: #888;">{day:%a %d %b}</div>
+            <div style="font-size: 13px; font-weight: bold; color: #1a1a2e;">₹{fare:,}</div></div>"""
+    
+    st.markdown("### 📅 Fare Calendar")
+    st.caption(f"Lowest {mode[:-1]} fare per person by departure date, {len(fares)} days from {days[0]:%d %b}. "
+               "Green days are the cheapest; pick one below to reprice this search.")
+    st.markdown(f"""<div style="display: grid; grid-template-columns: repeat(10, 1fr); gap: 6px; margin-bottom: 20px;">
+        {cells}</div>""", unsafe_allow_html=True)
+    fare_on = dict(zip(days, fares))
+    st.select_slider("Departure", days, value=dep_date if dep_date in fare_on else days[0], key=f"calendar_{tab_type}",
+                     format_func=lambda day: f"{day:%a %d %b} · ₹{fare_on[day]:,}",
+                     on_change=pick_departure, args=(db, tab_type))
+
+
+TAB_MODES = {"flights": "flights", "trains": "trains", "buses": "buses", "cabs": "cabs", "hotels": "hotels",
+             "holidays": "packages"}
+MODE_TITLES = {"flights": "✈️ Flights", "trains": "🚂 Trains", "buses": "🚌 Buses", "cabs": "🚕 Local Cabs",
+               "hotels": "🏨 Hotels"}
+
+
+def show_mode(tab_type, mode, render):
+    """The tab's own mode renders straight away; any other sits in a collapsed expander and is priced once opened"""
+    if mode == TAB_MODES[tab_type]:
+        st.markdown(f"### {MODE_TITLES[mode]}")
+        render()
+        return
+    section = st.expander(MODE_TITLES[mode], key=f"more_{tab_type}_{mode}", on_change="rerun")
+    if section.open:
+        with section:
+            render()
+
+
+def show_fares(mode, fares):
+    if not fares:
+        st.info(f"No {mode} on this route")
+    for fare in fares:
+        st.markdown(f"""
+        <div style="background: white; padding: 12px; border-radius: 10px; margin: 8px 0;
+                    box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
+            <div style="display: flex; justify-content: space-between;">
+                <span style="font-size: 14px;">{fare['type']}</span>
+                <span style="font-weight: bold; color: #0770E3;">₹{fare['price']:,}</span>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+def show_hotels(hotels, nights):
+    hotel_cols = st.columns(3)
+    hotel_types = [("Budget", "budget", "⭐⭐"), ("Mid-Range", "mid_range", "⭐⭐⭐"), ("Luxury", "luxury", "⭐⭐⭐⭐⭐")]
+    
+    for i, (name, key, stars) in enumerate(hotel_types):
+        with hotel_cols[i]:
+            price = hotels[key]
+            st.markdown(f"""
+            <div style="background: white; padding: 20px; border-radius: 15px; text-align: center;
+                        box-shadow: 0 4px 15px rgba(0,0,0,0.08);">
+                <h4>{name}</h4>
+                <p style="color: #FF6B00;">{stars}</p>
+                <p style="font-size: 24px; font-weight: bold; color: #0770E3;">₹{price:,}/night</p>
+                <p style="color: #666; font-size: 12px;">Total: ₹{price * nights:,} for {nights} nights</p>
+            </div>
+            """, unsafe_allow_html=True)
 
 
-def show_results(conn, data, tab_type):
+def show_results(db, data, tab_type):
+    """Every mode as before; the lazy quote prices the tab's own mode and packages, the rest when their section opens"""
     route = data["route"]
     prices = data["prices"]
     travelers = data["adults"] + data["children"]
     nights = data["nights"]
+    mode = TAB_MODES[tab_type]
     
     st.markdown("---")
     
@@ -615,61 +653,21 @@ def show_results(conn, data, tab_type):
     </div>
     """, unsafe_allow_html=True)
     
-    # Transport options
+    show_fare_calendar(db, route, data["dep_date"], mode if mode in pricing.CALENDAR_MODES else "flights", tab_type)
+    
+    # Transport options: trains where the route has them, otherwise buses, unless the tab asked for one
     col1, col2, col3 = st.columns(3)
+    ground = mode if mode in ("trains", "buses") else ("trains" if prices.has_trains else "buses")
     
     with col1:
-        if prices["flights"]:
-            st.markdown("### ✈️ Flights")
-            for flight in prices["flights"]:
-                st.markdown(f"""
-                <div style="background: white; padding: 15px; border-radius: 10px; margin: 10px 0; 
-                            box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
-                    <div style="display: flex; justify-content: space-between;">
-                        <span>{flight['type']}</span>
-                        <span style="font-weight: bold; color: #0770E3;">₹{flight['price']:,}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        show_mode(tab_type, "flights", lambda: show_fares("flights", prices["flights"]))
     
     with col2:
-        if prices["trains"]:
-            st.markdown("### 🚂 Trains")
-            for train in prices["trains"]:
-                st.markdown(f"""
-                <div style="background: white; padding: 12px; border-radius: 10px; margin: 8px 0;
-                            box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
-                    <div style="display: flex; justify-content: space-between;">
-                        <span style="font-size: 14px;">{train['type']}</span>
-                        <span style="font-weight: bold; color: #0770E3;">₹{train['price']:,}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-        elif prices["buses"]:
-            st.markdown("### 🚌 Buses")
-            for bus in prices["buses"]:
-                st.markdown(f"""
-                <div style="background: white; padding: 12px; border-radius: 10px; margin: 8px 0;
-                            box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
-                    <div style="display: flex; justify-content: space-between;">
-                        <span style="font-size: 14px;">{bus['type']}</span>
-                        <span style="font-weight: bold; color: #0770E3;">₹{bus['price']:,}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        if prices.has_trains or prices.has_buses:
+            show_mode(tab_type, ground, lambda: show_fares(ground, prices[ground]))
     
     with col3:
-        st.markdown("### 🚕 Local Cabs")
-        for cab in prices["cabs"]:
-            st.markdown(f"""
-            <div style="background: white; padding: 12px; border-radius: 10px; margin: 8px 0;
-                        box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
-                <div style="display: flex; justify-content: space-between;">
-                    <span style="font-size: 14px;">{cab['type']}</span>
-                    <span style="font-weight: bold; color: #0770E3;">₹{cab['price']:,}</span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        show_mode(tab_type, "cabs", lambda: show_fares("cabs", prices["cabs"]))
     
     # Packages
     st.markdown("---")
@@ -692,11 +690,9 @@ def show_results(conn, data, tab_type):
             
             if st.button(f"Book {pkg['name']}", key=f"book_{tab_type}_{i}", use_container_width=True):
                 if st.session_state.user:
-                    add_booking(conn, st.session_state.user[0], "package", 
-                               route['origin']['name'], route['destination']['name'], 
-                               travelers, pkg['total'])
-                    points = int(pkg['total'] / 100)
-                    update_points(conn, st.session_state.user[0], points)
+                    points = add_booking(db, st.session_state.user[0], "package",
+                                         route['origin']['name'], route['destination']['name'],
+                                         travelers, pkg['total'])
                     st.success(f"🎉 Booked! You earned {points} reward points!")
                     st.balloons()
                 else:
@@ -706,26 +702,10 @@ def show_results(conn, data, tab_type):
     
     # Hotels
     st.markdown("---")
-    st.markdown("### 🏨 Hotels")
-    
-    hotel_cols = st.columns(3)
-    hotel_types = [("Budget", "budget", "⭐⭐"), ("Mid-Range", "mid_range", "⭐⭐⭐"), ("Luxury", "luxury", "⭐⭐⭐⭐⭐")]
-    
-    for i, (name, key, stars) in enumerate(hotel_types):
-        with hotel_cols[i]:
-            price = prices["hotels"][key]
-            st.markdown(f"""
-            <div style="background: white; padding: 20px; border-radius: 15px; text-align: center;
-                        box-shadow: 0 4px 15px rgba(0,0,0,0.08);">
-                <h4>{name}</h4>
-                <p style="color: #FF6B00;">{stars}</p>
-                <p style="font-size: 24px; font-weight: bold; color: #0770E3;">₹{price:,}/night</p>
-                <p style="color: #666; font-size: 12px;">Total: ₹{price * nights:,} for {nights} nights</p>
-            </div>
-            """, unsafe_allow_html=True)
+    show_mode(tab_type, "hotels", lambda: show_hotels(prices["hotels"], nights))
 
 
-def show_login_form(conn):
+def show_login_form(db):
     st.markdown("---")
     st.markdown("### 🔐 Login / Sign Up")
     
@@ -737,7 +717,7 @@ def show_login_form(conn):
             password = st.text_input("Password", type="password")
             
             if st.form_submit_button("Login", type="primary", use_container_width=True):
-                user = get_user(conn, email, password)
+                user = get_user(db, email, password)
                 if user:
                     st.session_state.user = user
                     st.session_state.page = 'home'
@@ -755,7 +735,7 @@ def show_login_form(conn):
             
             if st.form_submit_button("Sign Up", type="primary", use_container_width=True):
                 if name and email and password:
-                    if create_user(conn, name, email, phone, password):
+                    if create_user(db, name, email, phone, password):
                         st.success("Account created! Please login.")
                     else:
                         st.error("Email already exists")
@@ -767,7 +747,29 @@ def show_login_form(conn):
         st.rerun()
 
 
-def show_profile(conn):
+def page_cursors(name, filters):
+    """Where each page of a paged list up to the current one starts, back to the first page when filters change"""
+    paged = st.session_state.page_cursors.get(name)
+    if paged is None or paged["filters"] != filters:
+        paged = st.session_state.page_cursors[name] = {"filters": filters, "cursors": [None]}
+    return paged["cursors"]
+
+
+def page_nav(name, cursors, next_cursor):
+    col1, col2, col3 = st.columns([2, 4, 2])
+    with col1:
+        if len(cursors) > 1 and st.button("← Newer", key=f"{name}_newer", use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Page {len(cursors)}")
+    with col3:
+        if next_cursor and st.button("Older →", key=f"{name}_older", use_container_width=True):
+            cursors.append(next_cursor)
+            st.rerun()
+
+
+def show_profile(db):
     st.markdown("---")
     user = st.session_state.user
     
@@ -784,17 +786,19 @@ def show_profile(conn):
     st.markdown("---")
     st.markdown("### 📋 My Bookings")
     
-    bookings = get_user_bookings(conn, user[0])
-    if bookings:
-        for b in bookings:
+    cursors = page_cursors("history", user[0])
+    page, next_cursor = get_user_bookings(db, user[0], cursors[-1])
+    if page:
+        for b in page:
             col1, col2, col3 = st.columns([4, 2, 2])
             with col1:
-                st.markdown(f"**{b[3]} → {b[4]}**")
+                st.markdown(f"**{b[1]} → {b[2]}**")
             with col2:
-                st.markdown(f"👥 {b[5]} travelers")
+                st.markdown(f"👥 {b[3]} travelers")
             with col3:
-                st.markdown(f"**₹{b[6]:,.0f}**")
+                st.markdown(f"**₹{b[4]:,.0f}**")
             st.markdown("---")
+        page_nav("history", cursors, next_cursor)
     else:
         st.info("No bookings yet. Start planning your trip!")
     
@@ -803,13 +807,13 @@ def show_profile(conn):
         st.rerun()
 
 
-def show_admin_panel(conn):
+def show_admin_panel(db):
     st.markdown("### 🛡️ Admin Dashboard")
     
     password = st.text_input("Admin Password", type="password", key="admin_pwd")
     
     if password == "admin123":
-        stats = get_stats(conn)
+        stats = get_stats(db)
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -819,39 +823,82 @@ def show_admin_panel(conn):
         with col3:
             st.metric("💰 Total Revenue", f"₹{stats['total_revenue']:,.0f}")
         
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🧳 Avg Travelers / Booking", f"{stats['avg_travelers']:.2f}")
+        with col2:
+            st.metric("🧾 Avg Booking Value", f"₹{stats['avg_booking_value']:,.0f}")
+        with col3:
+            unmapped = regions.REGISTRY.stats()["unknown_countries"]
+            st.metric("🌐 Countries Without a Region", len(unmapped))
+        if unmapped:
+            st.warning("Priced with the default region until added to pricing_tables.json: " +
+                       ", ".join(f"{country} ({count})" for country, count in unmapped.items()))
+        
+        st.markdown("---")
+        
+        # Analytics
+        st.markdown("### 📈 Analytics")
+        col1, col2 = st.columns(2)
+        with col1:
+            period = st.radio("Revenue per", ["Day", "Week"], horizontal=True, key="admin_period")
+        with col2:
+            route_order = st.radio("Top routes by", ["Bookings", "Revenue"], horizontal=True, key="admin_route_order")
+        trends = get_analytics(db, period.lower(), route_order.lower())
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            st.markdown(f"#### Revenue, Last {analytics.DAYS} Active {period}s")
+            st.bar_chart({period: [p[0] for p in trends["series"]], "Revenue (₹)": [p[3] for p in trends["series"]]},
+                         x=period, y="Revenue (₹)")
+        with col2:
+            st.markdown("#### By Booking Type")
+            st.dataframe({"Type": [(t[0] or "other").title() for t in stats["by_type"]], "Bookings": [t[1] for t in stats["by_type"]],
+                          "Revenue (₹)": [round(t[2]) for t in stats["by_type"]],
+                          "Avg Travelers": [round(t[3], 2) for t in stats["by_type"]]}, hide_index=True, use_container_width=True)
+        st.markdown("#### Top Routes")
+        st.dataframe({"Route": [f"{r[0]} → {r[1]}" for r in trends["routes"]], "Bookings": [r[2] for r in trends["routes"]],
+                      "Revenue (₹)": [round(r[3]) for r in trends["routes"]],
+                      "Avg Travelers": [round(r[4], 2) for r in trends["routes"]]}, hide_index=True, use_container_width=True)
+        
         st.markdown("---")
         
         # Users
         st.markdown("### 👥 All Users")
-        users = get_all_users(conn)
+        search = st.text_input("Search users", placeholder="Name, email or phone", key="admin_user_search").strip()
+        cursors = page_cursors("users", search)
+        users, next_cursor = get_all_users(db, cursors[-1], search)
         if users:
-            for u in users:
-                col1, col2, col3, col4 = st.columns([3, 3, 2, 2])
-                with col1:
-                    st.write(f"**{u[1]}**")
-                with col2:
-                    st.write(u[2])
-                with col3:
-                    st.write(f"📞 {u[3] or 'N/A'}")
-                with col4:
-                    st.write(f"🎁 {u[4]} pts")
+            st.dataframe({"Name": [u[1] for u in users], "Email": [u[2] for u in users],
+                          "Phone": [u[3] or "N/A" for u in users], "Points": [u[4] for u in users],
+                          "Joined": [u[5] for u in users]}, hide_index=True, use_container_width=True)
+            page_nav("users", cursors, next_cursor)
+        else:
+            st.info("No users match")
         
         st.markdown("---")
         
         # Bookings
         st.markdown("### 📋 All Bookings")
-        bookings = get_all_bookings(conn)
-        if bookings:
-            for b in bookings:
-                col1, col2, col3, col4 = st.columns([2, 3, 2, 2])
-                with col1:
-                    st.write(f"**{b[1]}**")
-                with col2:
-                    st.write(f"{b[3]} → {b[4]}")
-                with col3:
-                    st.write(f"👥 {b[5]}")
-                with col4:
-                    st.write(f"**₹{b[6]:,.0f}**")
+        col1, col2, col3 = st.columns([4, 2, 2])
+        with col1:
+            search = st.text_input("Search bookings", placeholder="Traveller, origin or destination",
+                                   key="admin_booking_search").strip()
+        with col2:
+            booking_type = st.selectbox("Type", ["All"] + [t[0] for t in stats["by_type"]], key="admin_booking_type")
+        with col3:
+            status = st.selectbox("Status", ["All", *admin_lists.STATUSES], key="admin_booking_status")
+        filters = (search, None if booking_type == "All" else booking_type, None if status == "All" else status)
+        cursors = page_cursors("bookings", filters)
+        booking_rows, next_cursor = get_all_bookings(db, cursors[-1], *filters)
+        if booking_rows:
+            st.dataframe({"Traveller": [b[1] for b in booking_rows], "Type": [(b[2] or "").title() for b in booking_rows],
+                          "From": [b[3] for b in booking_rows], "To": [b[4] for b in booking_rows],
+                          "Travelers": [b[5] for b in booking_rows], "Total (₹)": [round(b[6] or 0) for b in booking_rows],
+                          "Status": [b[7] for b in booking_rows], "Booked": [b[8] for b in booking_rows]},
+                         hide_index=True, use_container_width=True)
+            page_nav("bookings", cursors, next_cursor)
+        else:
+            st.info("No bookings match")
     elif password:
         st.error("Invalid admin password. Default: admin123")
 
@@ -0,0 +1,121 @@
+"""
+TravelEase - In-Memory Autocomplete Index
+Sorted arrays + bisect over normalized names, name words and IATA codes, loaded once from the locations table
+and kept current from the location_changes feed.
+"""
+import bisect
+import threading
+from location_index import normalize_name
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._names = []    # sorted (normalized full name, id)
+        self._words = []    # sorted (normalized later word + rest, id) so 'york' finds New York
+        self._codes = []    # sorted (lowercase airport code, id)
+        self._rows = {}     # id -> (name, country, airport_code)
+        self.seq = None     # last location_changes.seq applied, None until loaded
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, conn):
+        index = cls()
+        index.refresh(conn)
+        return index
+
+    def _keys(self, id_, name, code):
+        norm = normalize_name(name)
+        words = norm.split(" ")
+        names = [(norm, id_)]
+        rest = [(" ".join(words[i:]), id_) for i in range(1, len(words))]
+        codes = [(code.lower(), id_)] if code else []
+        return names, rest, codes
+
+    def add(self, id_, name, country, code):
+        with self._lock:
+            if id_ in self._rows:
+                self._remove(id_)
+            names, words, codes = self._keys(id_, name, code)
+            for keys, target in ((names, self._names), (words, self._words), (codes, self._codes)):
+                for key in keys:
+                    bisect.insort(target, key)
+            self._rows[id_] = (name, country, code or "")
+
+    def remove(self, id_):
+        with self._lock:
+            self._remove(id_)
+
+    def _remove(self, id_):
+        if id_ not in self._rows:
+            return
+        name, _, code = self._rows.pop(id_)
+        names, words, codes = self._keys(id_, name, code)
+        for keys, target in ((names, self._names), (words, self._words), (codes, self._codes)):
+            for key in keys:
+                i = bisect.bisect_left(target, key)
+                if i < len(target) and target[i] == key:
+                    del target[i]
+
+    def refresh(self, conn):
+        """Apply locations inserted, renamed or deleted since the last load, returns how many changed"""
+        # Read the feed position first: a change racing the reads below is simply applied again next time
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM location_changes").fetchone()[0]
+        if self.seq is None:
+            rows = conn.execute("SELECT id, name, country, COALESCE(airport_code, '') FROM locations ORDER BY id").fetchall()
+        else:
+            rows = conn.execute("""SELECT c.location_id, l.name, l.country, COALESCE(l.airport_code, '')
+                FROM location_changes c LEFT JOIN locations l ON l.id = c.location_id WHERE c.seq > ? ORDER BY c.seq""",
+                                (self.seq,)).fetchall()
+        if len(rows) > 1000:
+            self._bulk_apply(rows)
+        else:
+            for id_, name, country, code in rows:
+                if name is None:
+                    self.remove(id_)
+                else:
+                    self.add(id_, name, country, code)
+        self.seq = seq
+        return len(rows)
+
+    def _bulk_apply(self, rows):
+        """Large batches (the initial load, a gazetteer import) rebuild the sorted keys once instead of insorting"""
+        with self._lock:
+            for id_, name, country, code in rows:
+                if name is None:
+                    self._rows.pop(id_, None)
+                else:
+                    self._rows[id_] = (name, country, code or "")
+            self._names, self._words, self._codes = [], [], []
+            for id_, (name, _, code) in self._rows.items():
+                names, words, codes = self._keys(id_, name, code)
+                self._names.extend(names)
+                self._words.extend(words)
+                self._codes.extend(codes)
+            self._names.sort()
+            self._words.sort()
+            self._codes.sort()
+
+    def _scan(self, keys, prefix, limit, out, seen):
+        i = bisect.bisect_left(keys, (prefix,))
+        while i < len(keys) and len(out) < limit and keys[i][0].startswith(prefix):
+            id_ = keys[i][1]
+            if id_ not in seen:
+                seen.add(id_)
+                out.append(self._rows[id_])
+            i += 1
+
+    def search(self, query, k=6):
+        """Top-k (name, country, airport_code): code matches, then name prefixes, then later-word prefixes"""
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        out, seen = [], set()
+        with self._lock:
+            if len(prefix) <= 3:
+                self._scan(self._codes, prefix, k, out, seen)
+            self._scan(self._names, prefix, k, out, seen)
+            self._scan(self._words, prefix, k, out, seen)
+        return out
+
+    def __len__(self):
+        return len(self._rows)
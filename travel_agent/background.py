@@ -0,0 +1,85 @@
+"""
+TravelEase - Background Work for the Tk Client
+Runs blocking calls (geocoding, routing) on worker threads and hands results back on the Tk thread.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Task:
+    def __init__(self, futures, on_done=None, on_error=None):
+        self.futures = futures
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+
+    def cancel(self):
+        """Drop the callbacks; work that already started finishes but its result is discarded"""
+        self.cancelled = True
+        for future in self.futures:
+            future.cancel()
+
+
+class TkExecutor:
+    POLL_MS = 30
+
+    def __init__(self, widget, workers=4):
+        self.widget = widget
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tk-worker")
+        self._finished = queue.Queue()  # (task, results, error) from worker threads
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        """Run fn(*args) off the Tk thread; on_done(result) / on_error(exc) run on the Tk thread"""
+        return self.gather([(fn, *args)], on_done=(lambda results: on_done(results[0])) if on_done else None,
+                           on_error=on_error)
+
+    def gather(self, calls, on_done=None, on_error=None):
+        """Run [(fn, *args), ...] concurrently; on_done(results in call order) once all have finished"""
+        futures = [self._pool.submit(call[0], *call[1:]) for call in calls]
+        task = Task(futures, on_done, on_error)
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def finished(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            errors = [f.exception() for f in futures if not f.cancelled() and f.exception()]
+            results = None if errors or task.cancelled else [f.result() for f in futures]
+            self._finished.put((task, results, errors[0] if errors else None))
+
+        with self._lock:
+            self._outstanding += 1
+            start_polling = self._outstanding == 1
+        for future in futures:
+            future.add_done_callback(finished)
+        if start_polling:
+            self.widget.after(self.POLL_MS, self._poll)
+        return task
+
+    def _poll(self):
+        while True:
+            try:
+                task, results, error = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._outstanding -= 1
+            if task.cancelled:
+                continue
+            if error is not None:
+                if task.on_error:
+                    task.on_error(error)
+            elif task.on_done:
+                task.on_done(results)
+        with self._lock:
+            keep_polling = self._outstanding > 0
+        if keep_polling:
+            self.widget.after(self.POLL_MS, self._poll)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
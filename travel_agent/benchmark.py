@@ -0,0 +1,958 @@
+"""
+TravelEase - Performance Benchmarks
+Run all: python travel_agent/benchmark.py
+Run some: python travel_agent/benchmark.py bootstrap
+"""
+import os
+import sys
+import time
+import datetime
+import sqlite3
+import tempfile
+import json
+import threading
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import random
+import numpy as np
+import math
+import requests
+import database
+import db_pool
+import location_index
+import autocomplete
+import geocode_cache
+import routing
+import nominatim
+import distance_matrix
+import geo
+import spatial_index
+import pricing
+import pricing_table
+import regions
+import quote_cache
+import itinerary
+import offers
+import bookings
+import analytics
+import admin_lists
+
+BENCHMARKS = {}
+
+
+def benchmark(fn):
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return time.perf_counter() - start
+
+
+def report(label, seconds, count, unit="ops"):
+    print(f"  {label:<40} {count / seconds:>12,.0f} {unit}/s   ({seconds * 1000 / count:.3f} ms each)")
+
+
+class StubNominatim:
+    """Local stand-in for Nominatim: answers /search after `delay` seconds, [] for queries containing 'zz'"""
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.requests = 0
+        self.arrivals = []  # time.monotonic() of each request
+        self.fail_next = 0  # answer this many requests with fail_status first
+        self.fail_status = 503
+        self.retry_after = None  # Retry-After header sent with failures, if any
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def do_GET(self):
+                stub.requests += 1
+                stub.arrivals.append(time.monotonic())
+                query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+                time.sleep(stub.delay)
+                if stub.fail_next > 0:
+                    stub.fail_next -= 1
+                    self.send_response(stub.fail_status)
+                    if stub.retry_after is not None:
+                        self.send_header("Retry-After", stub.retry_after)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = [] if "zz" in query.lower() else [
+                    {"lat": str(10 + len(query)), "lon": str(70 + len(query)), "display_name": f"{query}, Somewhere, India"}]
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ============== BOOTSTRAP ==============
+def legacy_get_database(path):
+    """The per-rerun get_database() app.py used before the bootstrap layer"""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL, phone TEXT, password TEXT NOT NULL, points INTEGER DEFAULT 100,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS bookings (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER,
+        booking_type TEXT, origin TEXT, destination TEXT, travelers INTEGER, total_cost REAL,
+        status TEXT DEFAULT 'confirmed', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS locations (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE,
+        lat REAL, lng REAL, country TEXT, region TEXT, airport_code TEXT)''')
+    try:
+        cursor.execute("ALTER TABLE locations ADD COLUMN airport_code TEXT")
+        conn.commit()
+    except:
+        pass
+    cursor.execute("DELETE FROM locations")
+    cursor.executemany("INSERT OR IGNORE INTO locations (name, lat, lng, country, region, airport_code) VALUES (?, ?, ?, ?, ?, ?)",
+                       database.LOCATIONS)
+    conn.commit()
+    return conn
+
+
+@benchmark
+def bootstrap():
+    """Streamlit reruns per second: per-rerun schema+reseed vs schema-once bootstrap"""
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path, path = os.path.join(tmp, "legacy.db"), os.path.join(tmp, "bootstrap.db")
+        reruns = 200
+
+        def legacy_rerun():
+            conn = legacy_get_database(legacy_path)
+            conn.execute("SELECT name FROM locations ORDER BY name").fetchall()
+            conn.close()
+
+        def rerun():
+            conn = db_pool.get_pool(path).connection()
+            conn.execute("SELECT name FROM locations ORDER BY name").fetchall()
+
+        legacy_rerun()
+        rerun()
+        report("before: get_database() per rerun", timed(legacy_rerun, reruns), reruns, "reruns")
+        report("after: bootstrapped pool connection", timed(rerun, reruns), reruns, "reruns")
+
+
+# ============== CONNECTION POOL ==============
+@benchmark
+def stress(sessions=32, seconds=3.0):
+    """Many simulated sessions searching and booking concurrently through one pool"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "stress.db"))
+        user_ids = [pool.write(lambda conn, i=i: conn.execute(
+            "INSERT INTO users (name, email, password, points) VALUES (?, ?, 'x', 0)", (f"User {i}", f"u{i}@test")).lastrowid)
+            for i in range(sessions)]
+        cities = [loc[0] for loc in database.LOCATIONS]
+        counts = {"searches": 0, "bookings": 0, "errors": 0}
+        booked = {}  # user id -> bookings its session made
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def book(conn, user_id, orig, dest, cost):
+            conn.execute("INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, total_cost) VALUES (?, 'package', ?, ?, 1, ?)",
+                         (user_id, orig, dest, cost))
+            conn.execute("UPDATE users SET points = points + ? WHERE id = ?", (cost // 100, user_id))
+
+        def session(user_id):
+            rng = random.Random(user_id)
+            searches = bookings = errors = 0
+            while time.perf_counter() < deadline:
+                try:
+                    conn = pool.connection()
+                    orig, dest = rng.sample(cities, 2)
+                    conn.execute("SELECT * FROM locations WHERE name = ?", (orig,)).fetchone()
+                    conn.execute("SELECT * FROM locations WHERE name = ?", (dest,)).fetchone()
+                    conn.execute("SELECT * FROM bookings WHERE user_id = ? ORDER BY created_at DESC", (user_id,)).fetchall()
+                    searches += 1
+                    if rng.random() < 0.1:
+                        pool.write(book, user_id, orig, dest, 5000)
+                        bookings += 1
+                except sqlite3.Error:
+                    errors += 1
+            with lock:
+                counts["searches"] += searches
+                counts["bookings"] += bookings
+                counts["errors"] += errors
+                booked[user_id] = bookings
+
+        threads = [threading.Thread(target=session, args=(uid,)) for uid in user_ids]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        conn = pool.connection()
+        stored = dict(conn.execute("SELECT user_id, COUNT(*) FROM bookings GROUP BY user_id").fetchall())
+        points = dict(conn.execute("SELECT id, points FROM users").fetchall())
+        pool.close()
+        print(f"  {sessions} sessions, {elapsed:.1f}s, errors: {counts['errors']}")
+        report("searches", elapsed, counts["searches"], "searches")
+        report("bookings", elapsed, counts["bookings"], "bookings")
+        assert counts["errors"] == 0, f"{counts['errors']} session errors"
+        for user_id, made in booked.items():  # no lost write, and every booking credited with its points
+            assert stored.get(user_id, 0) == made and points[user_id] == made * 50, (user_id, made, stored.get(user_id), points[user_id])
+        print(f"  bookings stored: {sum(stored.values())}, points credited consistently")
+
+
+@benchmark
+def booking_throughput(sessions=32, per_session=40):
+    """Bookings/s from many sessions at once: two transactions vs one vs group commit, WAL vs rollback journal"""
+    def legacy_book(pool, user_id, cost):
+        pool.write(lambda conn: conn.execute(bookings.INSERT_BOOKING, (user_id, "package", "Delhi", "Goa", 1, cost)))
+        pool.write(lambda conn: conn.execute(bookings.CREDIT_POINTS, (bookings.points_for(cost), user_id)))
+
+    def atomic_book(pool, user_id, cost):
+        bookings.book(pool, user_id, "package", "Delhi", "Goa", 1, cost)
+
+    configs = [("two transactions", legacy_book, 1), ("one transaction", atomic_book, 1),
+               ("group commit", atomic_book, db_pool.GROUP_MAX)]
+    for journal_mode in ("WAL", "DELETE"):
+        for label, book, group_max in configs:
+            with tempfile.TemporaryDirectory() as tmp:
+                pool = db_pool.ConnectionPool(os.path.join(tmp, "bookings.db"), journal_mode=journal_mode, group_max=group_max)
+                user_ids = [pool.write(lambda conn, i=i: conn.execute(
+                    "INSERT INTO users (name, email, password, points) VALUES (?, ?, 'x', 0)", (f"User {i}", f"u{i}@test")).lastrowid)
+                    for i in range(sessions)]
+                start_line = threading.Barrier(sessions + 1)
+
+                def session(user_id):
+                    start_line.wait()
+                    for _ in range(per_session):
+                        book(pool, user_id, 5000)
+
+                threads = [threading.Thread(target=session, args=(uid,)) for uid in user_ids]
+                for t in threads:
+                    t.start()
+                start_line.wait()
+                start = time.perf_counter()
+                for t in threads:
+                    t.join()
+                elapsed = time.perf_counter() - start
+                conn = pool.connection()
+                stored, points = conn.execute("SELECT (SELECT COUNT(*) FROM bookings), (SELECT SUM(points) FROM users)").fetchone()
+                assert stored == sessions * per_session and points == stored * 50
+                batched = pool.stats()["writes_per_transaction"]
+                pool.close()
+                report(f"{journal_mode}: {label} ({batched:.1f}/commit)", elapsed, stored, "bookings")
+
+
+@benchmark
+def booking_history(count=1000000, users=10000, lookups=2000, seed=13):
+    """Profile page booking history at 1M bookings: full scan + sort vs the (user_id, created_at) index, keyset pages"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "history.db"))
+        rng = np.random.default_rng(seed)
+        start = datetime.datetime(2024, 1, 1)
+        stamps = rng.integers(0, 365 * 86400, count)
+        heavy = users // 100  # a few frequent travellers with long histories, for the deep-page numbers
+        user_ids = np.where(rng.random(count) < 0.2, rng.integers(1, heavy + 1, count), rng.integers(1, users + 1, count))
+        rows = [(int(u), "package", "Delhi", "Goa", 2, 5000.0, (start + datetime.timedelta(seconds=int(t))).strftime("%Y-%m-%d %H:%M:%S"))
+                for u, t in zip(user_ids, stamps)]
+        t0 = time.perf_counter()
+        pool.write(lambda conn: conn.executemany("INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, "
+                                                 "total_cost, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows))
+        print(f"  {count:,} bookings for {users:,} users loaded in {time.perf_counter() - t0:.1f}s")
+        conn = pool.connection()
+
+        legacy = "SELECT * FROM bookings NOT INDEXED WHERE user_id=? ORDER BY created_at DESC"  # the plan before migration 6
+        picks = rng.integers(1, users + 1, lookups)
+        legacy_lookups = lookups // 100
+        it = iter(picks.tolist())
+        report("before: scan + sort, every booking", timed(lambda: conn.execute(legacy, (next(it),)).fetchall(), legacy_lookups),
+               legacy_lookups, "profiles")
+        it = iter(picks.tolist())
+        report("after: first page off the index", timed(lambda: bookings.history(conn, next(it)), lookups), lookups, "profiles")
+
+        deep = conn.execute("SELECT user_id, COUNT(*) FROM bookings GROUP BY user_id ORDER BY 2 DESC LIMIT 1").fetchone()
+        pages, cursor = 0, None
+        t0 = time.perf_counter()
+        while True:
+            _, cursor = bookings.history(conn, deep[0], cursor)
+            pages += 1
+            if cursor is None:
+                break
+        keyset = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for page in range(pages):
+            conn.execute(bookings.HISTORY_FIRST.replace("LIMIT ?", "LIMIT ? OFFSET ?"),
+                         (deep[0], bookings.HISTORY_PAGE, page * bookings.HISTORY_PAGE)).fetchall()
+        offset = time.perf_counter() - t0
+        print(f"  every page of the longest history ({deep[1]:,} bookings, {pages} pages):")
+        report("  LIMIT/OFFSET", offset, pages, "pages")
+        report("  keyset", keyset, pages, "pages")
+        pool.close()
+
+
+def legacy_get_stats(conn):
+    """get_stats before the stats table: three full-table aggregates"""
+    return {"total_users": conn.execute("SELECT COUNT(*) FROM users").fetchone()[0],
+            "total_bookings": conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0],
+            "total_revenue": conn.execute("SELECT COALESCE(SUM(total_cost), 0) FROM bookings").fetchone()[0]}
+
+
+@benchmark
+def admin_stats(sizes=(10000, 100000, 1000000), renders=200, seed=17):
+    """Admin dashboard reads: three aggregates over the tables vs the trigger-maintained stats rows, and the write cost"""
+    rng = random.Random(seed)
+    types = ["package", "flight", "train", "bus", "hotel", "cab"]
+    start = datetime.datetime(2024, 1, 1)
+    insert = ("INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, total_cost, created_at) "
+              "VALUES (?, ?, 'Delhi', 'Goa', 1, ?, ?)")
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "stats.db"))
+        conn = pool.connection()
+        loaded = 0
+        for size in sizes:
+            rows = [(rng.randint(1, 1000), rng.choice(types), rng.randint(500, 50000),
+                     (start + datetime.timedelta(seconds=rng.randrange(365 * 86400))).strftime("%Y-%m-%d %H:%M:%S"))
+                    for _ in range(size - loaded)]
+            t0 = time.perf_counter()
+            pool.write(lambda c: c.executemany(insert, rows))
+            with_triggers = time.perf_counter() - t0
+            loaded = size
+            assert legacy_get_stats(conn).items() <= analytics.totals(conn).items()
+            print(f"  {size:,} bookings:")
+            report("  before: COUNT/COUNT/SUM", timed(lambda: legacy_get_stats(conn), renders // 10), renders // 10, "renders")
+            report("  after: totals + by type + 30 days", timed(lambda: (analytics.totals(conn), analytics.by_type(conn),
+                                                                           analytics.series(conn)), renders), renders, "renders")
+        report("insert with stats triggers", with_triggers, len(rows), "bookings")
+        pool.write(lambda c: [c.execute(f"DROP TRIGGER stats_bookings_{event}") for event in ("insert", "delete", "update")])
+        t0 = time.perf_counter()
+        pool.write(lambda c: c.executemany(insert, rows))
+        report("insert without (for comparison)", time.perf_counter() - t0, len(rows), "bookings")
+        pool.close()
+
+
+@benchmark
+def admin_lists_paging(users=50000, count=500000, pages=20, seed=19):
+    """Admin user/booking lists: every row per render vs one keyset page, deep pages, search and filters"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    stamp = lambda: (start + datetime.timedelta(seconds=rng.randrange(365 * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "admin.db"))
+        user_rows = [(f"{rng.choice(SYLLABLES).title()}{rng.choice(SYLLABLES)} {i}", f"user{i}@test", rng.randrange(5000), stamp())
+                     for i in range(users)]
+        pool.write(lambda c: c.executemany("INSERT INTO users (name, email, password, points, created_at) VALUES (?, ?, 'x', ?, ?)",
+                                           user_rows))
+        booking_rows = [(rng.randint(1, users), rng.choice(["package", "flight", "train", "bus", "cab"]), rng.randint(500, 50000), stamp())
+                        for _ in range(count)]
+        pool.write(lambda c: c.executemany("INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, total_cost, "
+                                           "created_at) VALUES (?, ?, 'Delhi', 'Goa', 1, ?, ?)", booking_rows))
+        conn = pool.connection()
+        print(f"  {users:,} users, {count:,} bookings")
+
+        legacy_users = "SELECT id, name, email, phone, points, created_at FROM users ORDER BY created_at DESC"
+        legacy_bookings = """SELECT b.id, u.name, b.booking_type, b.origin, b.destination, b.travelers, b.total_cost, b.status,
+            b.created_at FROM bookings b NOT INDEXED JOIN users u ON b.user_id = u.id ORDER BY b.created_at DESC"""
+        report("before: every user", timed(lambda: conn.execute(legacy_users).fetchall(), 3), 3, "renders")
+        report("before: every booking", timed(lambda: conn.execute(legacy_bookings).fetchall(), 1), 1, "renders")
+        report("after: first user page", timed(lambda: admin_lists.users_page(conn), 200), 200, "renders")
+        report("after: first booking page", timed(lambda: admin_lists.bookings_page(conn), 200), 200, "renders")
+
+        def walk(fetch):
+            cursor = None
+            for _ in range(pages):
+                _, cursor = fetch(cursor)
+        report(f"after: {pages} booking pages in a row", timed(lambda: walk(lambda after: admin_lists.bookings_page(conn, after)), 5),
+               5 * pages, "pages")
+        report("after: user search 'ka'", timed(lambda: admin_lists.users_page(conn, search="ka"), 50), 50, "renders")
+        report("after: user search, no match", timed(lambda: admin_lists.users_page(conn, search="zzz"), 3), 3, "renders")
+        report("after: cab bookings", timed(lambda: admin_lists.bookings_page(conn, booking_type="cab"), 200), 200, "renders")
+        pool.close()
+
+
+ADHOC_ANALYTICS = {  # what the analytics panels would run against the live bookings table without the rollups
+    "revenue per day": """SELECT date(created_at) AS day, COUNT(*), SUM(total_cost) FROM bookings
+        GROUP BY day ORDER BY day DESC LIMIT 30""",
+    "revenue per week": """SELECT date(created_at, 'weekday 0', '-6 days') AS week, COUNT(*), SUM(total_cost) FROM bookings
+        GROUP BY week ORDER BY week DESC LIMIT 30""",
+    "by booking type": "SELECT booking_type, COUNT(*), SUM(total_cost), AVG(travelers) FROM bookings GROUP BY booking_type",
+    "top 10 routes": """SELECT origin, destination, COUNT(*) AS n, SUM(total_cost), AVG(travelers) FROM bookings
+        GROUP BY origin, destination ORDER BY n DESC LIMIT 10""",
+}
+
+
+def bulk_bookings(conn, count, users=10000):
+    """Append count random bookings generated inside SQLite, with the bookings indexes and triggers dropped meanwhile"""
+    extras = conn.execute("""SELECT type, name, sql FROM sqlite_master WHERE tbl_name = 'bookings'
+        AND type IN ('index', 'trigger') AND sql IS NOT NULL""").fetchall()
+    for kind, name, _ in extras:
+        conn.execute(f"DROP {kind.upper()} {name}")
+    conn.execute("""WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :count)
+        INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, total_cost, created_at)
+        SELECT 1 + abs(random()) % :users, json_extract(:types, '$[' || (abs(random()) % 6) || ']'),
+               json_extract(:cities, '$[' || (abs(random()) % :n) || ']'), json_extract(:cities, '$[' || (abs(random()) % :n) || ']'),
+               1 + abs(random()) % 4, 500 + abs(random()) % 49501,
+               datetime('2024-01-01', '+' || (abs(random()) % (2 * 365 * 86400)) || ' seconds')
+        FROM n""", {"count": count, "users": users, "types": json.dumps(["package", "flight", "train", "bus", "hotel", "cab"]),
+                    "cities": json.dumps([loc[0] for loc in database.LOCATIONS]), "n": len(database.LOCATIONS)})
+    for _, _, sql in extras:
+        conn.execute(sql)
+
+
+@benchmark
+def analytics_rollups(sizes=(1000000, 10000000), renders=100, bookers=200):
+    """Analytics panels: GROUP BYs over bookings vs the rollup tables, the rebuild, and booking latency under dashboard load"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "analytics.db")
+        pool = db_pool.ConnectionPool(path)
+        pool.write(lambda c: c.execute("INSERT INTO users (name, email, password, created_at) "
+                                       "VALUES ('Bench', 'bench@test', 'x', '2024-01-01 00:00:00')"))
+        conn = pool.connection()
+        loaded = 0
+        for size in sizes:
+            t0 = time.perf_counter()
+            pool.write(lambda c: bulk_bookings(c, size - loaded))
+            loaded = size
+            load = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            pool.write(database.rebuild_rollups)
+            rebuild = time.perf_counter() - t0
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # as after any bulk load; a huge WAL slows every read
+            print(f"  {size:,} bookings (generated in {load:.1f}s):")
+            report("  rebuild all rollups", rebuild, 1, "rebuilds")
+            adhoc = {label: conn.execute(sql).fetchall() for label, sql in ADHOC_ANALYTICS.items()}
+            assert [row[:3] for row in adhoc["revenue per day"][::-1]] == [(row[0],) + row[2:4] for row in analytics.series(conn)]
+            assert [row[:3] for row in adhoc["revenue per week"][::-1]] == [(row[0],) + row[2:4]
+                                                                            for row in analytics.series(conn, "week")]
+            assert {row[0]: row[1:3] for row in adhoc["by booking type"]} == {row[0]: row[1:3] for row in analytics.by_type(conn)}
+            assert [row[2] for row in adhoc["top 10 routes"]] == [row[2] for row in analytics.top_routes(conn)]
+            report("  after: totals + by type + 30 days + 30 weeks + top routes",
+                   timed(lambda: (analytics.totals(conn), analytics.by_type(conn), analytics.series(conn),
+                                  analytics.series(conn, "week"), analytics.top_routes(conn)), renders), renders, "renders")
+            for label, sql in ADHOC_ANALYTICS.items():
+                report(f"  before: {label}", timed(lambda: conn.execute(sql).fetchall(), 1), 1, "renders")
+
+        for label, panels in (("ad hoc", lambda c: [c.execute(sql).fetchall() for sql in ADHOC_ANALYTICS.values()]),
+                              ("rollups", lambda c: (analytics.by_type(c), analytics.series(c), analytics.top_routes(c)))):
+            stop = threading.Event()
+
+            def watch():
+                reader = sqlite3.connect(path)
+                while not stop.is_set():
+                    panels(reader)
+                reader.close()
+
+            viewer = threading.Thread(target=watch)
+            viewer.start()
+            latencies = []
+            for _ in range(bookers):
+                t0 = time.perf_counter()
+                bookings.book(pool, 1, "flight", "Delhi", "Goa", 2, 9000)
+                latencies.append(time.perf_counter() - t0)
+            stop.set()
+            viewer.join()
+            latencies.sort()
+            print(f"  booking latency with {label} dashboard: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+        pool.close()
+
+
+# ============== LOCATION LOOKUP ==============
+SYLLABLES = ["ba", "ra", "ka", "li", "mo", "pur", "ga", "nag", "ta", "shi", "an", "del", "go", "vi", "ha", "san", "to", "ri", "bad", "lo"]
+
+
+def synthetic_locations(count, seed=7):
+    """count unique made-up places spread over the globe, with some airport codes"""
+    rng = random.Random(seed)
+    names, rows = set(), []
+    while len(rows) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))).title()
+        if rng.random() < 0.2:
+            name += " " + rng.choice(["Nagar", "City", "Junction", "Hills", "Beach"])
+        if name in names:
+            continue
+        names.add(name)
+        code = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3)) if rng.random() < 0.05 else None
+        rows.append((name, rng.uniform(-60, 70), rng.uniform(-180, 180), "India", "south_asia", code))
+    return rows
+
+
+def gazetteer_pool(tmp, count):
+    pool = db_pool.ConnectionPool(os.path.join(tmp, f"gazetteer_{count}.db"))
+    rows = [(*row, location_index.normalize_name(row[0])) for row in synthetic_locations(count)]
+    pool.write(lambda conn: conn.executemany(database.UPSERT_LOCATION, rows))
+    return pool
+
+
+@benchmark
+def location_lookup(count=100000):
+    """get_location at 100k places: LOWER(name) LIKE '%x%' scan vs exact/prefix/FTS5 index path"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = gazetteer_pool(tmp, count)
+        conn = pool.connection()
+        names = [row[0] for row in conn.execute("SELECT name FROM locations ORDER BY id LIMIT 200 OFFSET 1000")]
+        queries = {"exact": names, "prefix": [n[:4] for n in names], "substring": [n[2:7].lower() for n in names]}
+
+        def legacy(q):
+            return conn.execute("SELECT * FROM locations WHERE LOWER(name) LIKE ?", (f"%{q.lower()}%",)).fetchone()
+
+        for kind, qs in queries.items():
+            report(f"{kind}: LIKE scan", timed(lambda: [legacy(q) for q in qs], 1), len(qs), "lookups")
+            report(f"{kind}: indexed", timed(lambda: [location_index.find_location(conn, q) for q in qs], 1), len(qs), "lookups")
+        print("  'Goa' resolves to:", location_index.find_location(conn, "goa")[1])
+        pool.close()
+
+
+# ============== AUTOCOMPLETE ==============
+@benchmark
+def keystrokes(count=100000):
+    """Keystroke-to-results latency at 100k places: SQL search per <KeyRelease> vs in-memory prefix index"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = gazetteer_pool(tmp, count)
+        conn = pool.connection()
+        start = time.perf_counter()
+        index = autocomplete.PrefixIndex.load(conn)
+        print(f"  index load: {(time.perf_counter() - start) * 1000:.0f} ms for {len(index):,} places")
+        words = [row[0] for row in conn.execute("SELECT name FROM locations ORDER BY id LIMIT 100 OFFSET 5000")]
+        typed = [word[:i] for word in words for i in range(1, len(word) + 1)]
+
+        def legacy(q):
+            return conn.execute("SELECT name, country, airport_code FROM locations WHERE LOWER(name) LIKE ? OR LOWER(airport_code) LIKE ? ORDER BY name LIMIT 6",
+                                (f"{q.lower()}%", f"{q.lower()}%")).fetchall()
+
+        report("LIKE prefix query", timed(lambda: [legacy(q) for q in typed], 1), len(typed), "keys")
+        report("indexed SQL search", timed(lambda: [location_index.search_locations(conn, q) for q in typed], 1), len(typed), "keys")
+        report("in-memory PrefixIndex", timed(lambda: [index.search(q) for q in typed], 1), len(typed), "keys")
+        pool.write(lambda c: c.execute("INSERT INTO locations (name, country, airport_code, name_norm) VALUES ('Zzyzx', 'USA', 'ZZX', 'zzyzx')"))
+        start = time.perf_counter()
+        added = index.refresh(conn)
+        print(f"  incremental refresh: {added} changed in {(time.perf_counter() - start) * 1e6:.0f} us -> {index.search('zzy')}")
+        pool.close()
+
+
+# ============== GEOCODE CACHE ==============
+@benchmark
+def geocode_cached(queries=50, delay=0.05):
+    """Unknown-city geocodes against a stub Nominatim (50 ms): uncached, cold cache, warm LRU, warm table"""
+    with tempfile.TemporaryDirectory() as tmp:
+        stub = StubNominatim(delay)
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "geocode.db"))
+        fetch = nominatim.NominatimClient(stub.url, rate=None).search  # the stub has no usage policy
+        names = [f"Town {i}" for i in range(queries)] + [f"Misspelt Zz{i}" for i in range(queries // 5)]
+        report("no cache: remote every time", timed(lambda: [fetch(q) for q in names], 1), len(names), "geocodes")
+        cache = geocode_cache.GeocodeCache(pool, fetch=fetch)
+        report("cold cache: remote + store", timed(lambda: [cache.resolve(q) for q in names], 1), len(names), "geocodes")
+        report("warm LRU", timed(lambda: [cache.resolve(q) for q in names], 1), len(names), "geocodes")
+        cold_lru = geocode_cache.GeocodeCache(pool, fetch=fetch)
+        report("warm table, empty LRU", timed(lambda: [cold_lru.resolve(q) for q in names], 1), len(names), "geocodes")
+        promoted = pool.connection().execute("SELECT COUNT(*) FROM locations WHERE name LIKE 'Town %'").fetchone()[0]
+        print(f"  stub requests: {stub.requests}, promoted into locations: {promoted}")
+        print(f"  stats: {cache.stats()}")
+        pool.close()
+        stub.close()
+
+
+# ============== ROUTE RESOLUTION ==============
+@benchmark
+def route_resolution(routes=10, delay=0.2):
+    """Two uncached places per route against a stub Nominatim (200 ms): sequential vs concurrent resolve_places"""
+    with tempfile.TemporaryDirectory() as tmp:
+        stub = StubNominatim(delay)
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "routes.db"))
+        cache = geocode_cache.GeocodeCache(pool, fetch=nominatim.NominatimClient(stub.url, rate=None).search)
+        pairs = lambda tag: [(f"{tag} From {i}", f"{tag} To {i}") for i in range(routes)]
+        report("sequential", timed(lambda: [(cache.resolve(a), cache.resolve(b)) for a, b in pairs("Seq")], 1), routes, "routes")
+        report("concurrent", timed(lambda: [routing.resolve_places(cache.resolve, [a, b]) for a, b in pairs("Par")], 1),
+               routes, "routes")
+        locs, failures = routing.resolve_places(cache.resolve, ["Known Town", "Nowherezz"])
+        print(f"  partial failure: {[loc and loc['name'] for loc in locs]} {routing.describe_failures(failures)}")
+        stub.delay = 1.0
+        locs, failures = routing.resolve_places(cache.resolve, ["Slow Town", "Nowherezz"], deadline=0.5)
+        print(f"  deadline 0.5s, 1s stub: {[loc and loc['name'] for loc in locs]} {routing.describe_failures(failures)}")
+        time.sleep(stub.delay)  # the abandoned lookups still finish and cache their results
+        print(f"  cached after the deadline: {cache.lookup('Slow Town')[0]}, stub requests: {stub.requests}")
+        pool.close()
+        stub.close()
+
+
+
+# ============== DISTANCES ==============
+def scalar_haversine(lat1, lng1, lat2, lng2):
+    """calculate_distance() as both front ends had it"""
+    lat1_rad, lat2_rad = math.radians(lat1), math.radians(lat2)
+    delta_lat, delta_lng = math.radians(lat2 - lat1), math.radians(lng2 - lng1)
+    a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng/2)**2
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+
+
+@benchmark
+def route_distance(added=200):
+    """Distance for every seeded pair: scalar haversine per search vs precomputed matrix, then incremental additions"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "matrix.db"))
+        elapsed = timed(lambda: distance_matrix.DistanceMatrix(pool), 5) / 5
+        matrix = distance_matrix.get_matrix(pool)
+        locs = [{"id": r[0], "lat": r[1], "lng": r[2]} for r in pool.connection().execute("SELECT id, lat, lng FROM locations")]
+        pairs = [(a, b) for a in locs for b in locs]
+        report(f"build matrix for {len(locs)} seeded places", elapsed, 1, "builds")
+        report("scalar haversine", timed(lambda: [scalar_haversine(a["lat"], a["lng"], b["lat"], b["lng"]) for a, b in pairs], 5) / 5,
+               len(pairs), "routes")
+        report("matrix lookup", timed(lambda: [matrix.great_circle(a, b) for a, b in pairs], 5) / 5, len(pairs), "routes")
+        rows = [(*row, location_index.normalize_name(row[0])) for row in synthetic_locations(added)]
+        pool.write(lambda conn: conn.executemany(database.UPSERT_LOCATION, rows))
+        report(f"add {added} places incrementally", timed(matrix.refresh, 1), added, "places")
+        print(f"  matrix now covers {len(matrix)} places")
+        pool.close()
+
+
+@benchmark
+def haversine_batch(sizes=(1000, 10000, 100000), grid=1000):
+    """One origin to N points and an N x N grid: scalar math loop vs geo's vectorized haversine"""
+    rng = random.Random(11)
+    for n in sizes:
+        lats, lngs = [rng.uniform(-60, 70) for _ in range(n)], [rng.uniform(-180, 180) for _ in range(n)]
+        lat_arr, lng_arr = np.array(lats), np.array(lngs)
+        scalar = timed(lambda: [scalar_haversine(28.6, 77.2, lat, lng) for lat, lng in zip(lats, lngs)], 3) / 3
+        vector = timed(lambda: geo.distances_from(28.6, 77.2, lat_arr, lng_arr), 3) / 3
+        report(f"one-to-{n:,} scalar loop", scalar, n, "distances")
+        report(f"one-to-{n:,} vectorized ({scalar / vector:.0f}x)", vector, n, "distances")
+    lats, lngs = np.array(lats[:grid]), np.array(lngs[:grid])
+    scalar = timed(lambda: [[scalar_haversine(a, b, c, d) for c, d in zip(lats.tolist(), lngs.tolist())]
+                            for a, b in zip(lats.tolist(), lngs.tolist())], 1)
+    vector = timed(lambda: geo.pairwise(lats, lngs, lats, lngs), 3) / 3
+    report(f"{grid:,} x {grid:,} scalar loop", scalar, grid * grid, "distances")
+    report(f"{grid:,} x {grid:,} vectorized ({scalar / vector:.0f}x)", vector, grid * grid, "distances")
+    sample = lats[:200].tolist(), lngs[:200].tolist()
+    consistent = all(geo.distance(a, b, c, d) == geo.pairwise(*sample, *sample)[i, j]
+                     for i, (a, b) in enumerate(zip(*sample)) for j, (c, d) in enumerate(zip(*sample)) if j % 17 == 0)
+    print(f"  scalar geo.distance bit-identical to the vectorized path: {consistent}")
+
+
+@benchmark
+def spatial_queries(count=100000, probes=200):
+    """100k places: radius and nearest-airport queries via R*Tree vs a vectorized scan of every location"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = gazetteer_pool(tmp, count)
+        conn = pool.connection()
+        rng = random.Random(5)
+        points = [(rng.uniform(-50, 60), rng.uniform(-170, 170)) for _ in range(probes)]
+        ids, lats, lngs, codes = zip(*conn.execute("SELECT id, lat, lng, COALESCE(airport_code, '') FROM locations"))
+        lats, lngs, has_code = np.array(lats), np.array(lngs), np.array([bool(c) for c in codes])
+
+        def scan_within(lat, lng, km):
+            d = geo.distances_from(lat, lng, lats, lngs)
+            return np.flatnonzero(d <= km)
+
+        def scan_nearest_airport(lat, lng):
+            d = np.where(has_code, geo.distances_from(lat, lng, lats, lngs), np.inf)
+            return int(np.argmin(d))
+
+        for km in (50, 500):
+            report(f"within {km} km, full scan", timed(lambda: [scan_within(lat, lng, km) for lat, lng in points], 1),
+                   probes, "queries")
+            report(f"within {km} km, R*Tree", timed(lambda: [spatial_index.within(conn, lat, lng, km) for lat, lng in points], 1),
+                   probes, "queries")
+        report("nearest airport, full scan", timed(lambda: [scan_nearest_airport(lat, lng) for lat, lng in points], 1),
+               probes, "queries")
+        report("nearest airport, R*Tree", timed(lambda: [spatial_index.nearest_airport(conn, lat, lng) for lat, lng in points], 1),
+               probes, "queries")
+        agree = all(ids[scan_nearest_airport(lat, lng)] == spatial_index.nearest_airport(conn, lat, lng)[0] for lat, lng in points)
+        print(f"  R*Tree nearest airport matches the full scan: {agree}")
+        pool.close()
+
+
+# ============== PRICING ==============
+def random_quotes(count, seed=3):
+    """count (distance, origin_country, dest_country, adults, children, nights) tuples, half domestic"""
+    rng = random.Random(seed)
+    countries = sorted(regions.REGISTRY.countries()) + ["Peru"]
+    rows = []
+    for _ in range(count):
+        origin = rng.choice(countries)
+        dest = origin if rng.random() < 0.5 else rng.choice(countries)
+        rows.append((round(rng.uniform(1, 16000), 1), origin, dest, rng.randint(1, 9), rng.randint(0, 5), rng.randint(0, 14)))
+    return rows
+
+
+def legacy_get_region(country):
+    """PricingEngine.get_region() before the registry: dict rebuilt and scanned on every call"""
+    regions_ = {"south_asia": ["India", "Nepal", "Bangladesh", "Sri Lanka", "Maldives"], "southeast_asia": ["Thailand", "Vietnam", "Indonesia", "Malaysia", "Singapore"],
+                "east_asia": ["Japan", "South Korea"], "middle_east": ["UAE", "Saudi Arabia"], "western_europe": ["UK", "France", "Germany", "Italy"],
+                "north_america": ["USA", "Canada"], "australia": ["Australia", "New Zealand"]}
+    for region, countries in regions_.items():
+        if country in countries:
+            return region
+    return "south_asia"
+
+
+@benchmark
+def region_lookup(count=100000):
+    """Region lookups per quote: four rebuilt-dict scans (legacy desktop engine) vs two registry lookups"""
+    rows = random_quotes(count)
+    legacy = timed(lambda: [(legacy_get_region(o), legacy_get_region(d), legacy_get_region(d), legacy_get_region(d))
+                            for _, o, d, *_ in rows], 1)
+    registry = timed(lambda: [(pricing.region_index(o), pricing.region_index(d)) for _, o, d, *_ in rows], 1)
+    report("legacy get_region x4", legacy, count, "quotes")
+    report(f"registry x2 ({legacy / registry:.0f}x)", registry, count, "quotes")
+    report("full calculate_prices() now", timed(lambda: [pricing.calculate_prices(*row) for row in rows], 1), count, "quotes")
+    print(f"  {regions.REGISTRY.stats()}")
+
+
+@benchmark
+def batch_pricing(count=100000):
+    """Quotes per second: calculate_prices() in a loop vs one calculate_prices_batch() call, per front-end profile"""
+    rows = random_quotes(count)
+    columns = list(zip(*rows))
+    for name in (pricing.WEB, pricing.DESKTOP):
+        scalar = timed(lambda: [pricing.calculate_prices(*row, profile=name) for row in rows], 1)
+        batch = timed(lambda: pricing.calculate_prices_batch(*columns, profile=name), 3) / 3
+        report(f"{name}: scalar loop", scalar, count, "quotes")
+        report(f"{name}: batch ({scalar / batch:.0f}x)", batch, count, "quotes")
+        result = pricing.calculate_prices_batch(*columns, profile=name)
+        mismatches = sum(pricing.batch_row(result, i) != pricing.calculate_prices(*rows[i], profile=name)
+                         for i in range(0, count, 10))
+        print(f"  {name}: rows differing from the scalar path: {mismatches} of {count // 10} checked")
+
+
+def edited_table(tmp, version=None, **profiles):
+    """Copy of pricing_tables.json in tmp with some profile rules overridden; returns its path"""
+    with open(pricing_table.TABLE_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    if version is not None:
+        data["version"] = version
+    for name, rules in profiles.items():
+        data["profiles"][name].update(rules)
+    path = os.path.join(tmp, "pricing_tables.json")
+    with open(path + ".new", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(path + ".new", path)  # readers see the old file or the new one, never half of it
+    return path
+
+
+@benchmark
+def pricing_reload(readers=8, seconds=2.0):
+    """Quotes from several threads while the pricing table file is rewritten: reload cost and torn reads"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = edited_table(tmp)
+        report("parse pricing_tables.json", timed(lambda: pricing_table.load(path), 100) / 100, 1, "loads")
+        source = pricing_table.TableSource(path, check_interval=0)
+        report("current() with an mtime check every call", timed(lambda: [source.current() for _ in range(10000)], 1),
+               10000, "calls")
+        live, pricing_table.SOURCE = pricing_table.SOURCE, source
+        stop, quotes, torn = time.monotonic() + seconds, [0] * readers, []
+
+        def reader(slot):
+            while time.monotonic() < stop:
+                prices = pricing.calculate_prices(900, "India", "India", 2, 0, 3)
+                if prices["flights"][0]["price"] not in (3600, 5000):  # flight_min 2000 -> 3600, 5000 -> 5000
+                    torn.append(prices)
+                quotes[slot] += 1
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        for t in threads:
+            t.start()
+        edits = 0
+        while time.monotonic() < stop:
+            edited_table(tmp, version=edits, web={"flight_min": 5000 if edits % 2 else 2000})
+            edits += 1
+            time.sleep(0.01)
+        for t in threads:
+            t.join()
+        pricing_table.SOURCE = live
+        print(f"  {edits} file rewrites, {sum(quotes):,} quotes, torn quotes: {len(torn)}, source: {source.stats()}")
+
+
+@benchmark
+def lazy_quotes(count=50000):
+    """One tab's worth of prices: every mode up front vs a lazy Quote reading only that tab's mode"""
+    rows = random_quotes(count)
+    eager = timed(lambda: [pricing.calculate_prices(*row) for row in rows], 1)
+    report("calculate_prices(), all modes", eager, count, "quotes")
+    for mode in ("flights", "trains", "cabs", "packages"):
+        lazy = timed(lambda: [pricing.quote(*row)[mode] for row in rows], 1)
+        report(f"quote()[{mode!r}] ({eager / lazy:.1f}x)", lazy, count, "quotes")
+    report("quote(), every mode read", timed(lambda: [pricing.quote(*row).as_dict() for row in rows], 1), count, "quotes")
+
+
+@benchmark
+def offer_selection(count=500000, k=10, seed=9):
+    """Top 10 of a large generated flight inventory: materialize + sort vs heapq top-k over the generator"""
+
+    def inventory():
+        rng = random.Random(seed)
+        for i in range(count):
+            hour, minute = rng.randrange(24), rng.choice((0, 15, 30, 45))
+            yield offers.Offer("flight", f"Airline {i % 40}", f"TE-{i}", rng.randint(2000, 40000),
+                               f"{hour:02d}:{minute:02d}", f"{(hour + rng.randint(1, 6)) % 24:02d}:{minute:02d}")
+
+    def peak(fn):
+        tracemalloc.start()
+        fn()
+        used = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return used / 2 ** 20
+
+    full = lambda: sorted(inventory(), key=offers.SORTS["price"])[:k]
+    top = lambda: offers.select(inventory(), "price", k)
+    assert full() == top()
+    report(f"sorted list, first {k} ({peak(full):.1f} MB peak)", timed(full, 1), count, "offers")
+    report(f"heapq top {k} ({peak(top):.1f} MB peak)", timed(top, 1), count, "offers")
+    evening = lambda: offers.select(inventory(), "duration", k, max_price=10000, **offers.DEPARTURE_WINDOWS["Evening"])
+    report(f"filtered evening <= 10k by duration, top {k}", timed(evening, 1), count, "offers")
+
+
+@benchmark
+def fare_calendar(routes=200, days=60):
+    """60-day fare calendars: per-day Python loop vs one vectorized pass vs a cached calendar"""
+    rows = random_quotes(routes)
+    start = datetime.date.today()
+    rules = pricing.table()
+
+    def per_day(distance, origin, dest):
+        out = []
+        for offset in range(days):
+            day = start + datetime.timedelta(days=offset)
+            mmdd = day.month * 100 + day.day
+            season = next((s.multiplier for s in rules.calendar.seasons
+                           if (s.start <= mmdd <= s.end if s.start <= s.end else mmdd >= s.start or mmdd <= s.end)), 1.0)
+            base = pricing.calculate_prices(distance, origin, dest, 1, 0, 1)
+            out.append(int(rules.calendar.weekday[day.weekday()] * season * base["flights"][0]["price"]))
+        return out
+
+    report("per-day loop", timed(lambda: [per_day(*row[:3]) for row in rows], 1), routes, "calendars")
+    report("vectorized", timed(lambda: [pricing.fare_calendar(*row[:3], start, days) for row in rows], 1), routes, "calendars")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = quote_cache.QuoteCache(db_pool.ConnectionPool(os.path.join(tmp, "calendar.db")))
+        for i, row in enumerate(rows):
+            cache.put(("web-calendar", i, start.isoformat(), days), pricing.fare_calendar(*row[:3], start, days))
+        report("cached", timed(lambda: [cache.get(("web-calendar", i, start.isoformat(), days)) for i in range(routes)], 1),
+               routes, "calendars")
+        cache.pool.close()
+    mismatches = sum(per_day(*row[:3]) != pricing.fare_calendar(*row[:3], start, days)["fares"][:, 0].tolist() for row in rows)
+    print(f"  calendars differing from the per-day loop: {mismatches} of {routes}")
+
+
+@benchmark
+def itinerary_sizes(sizes=(4, 8, 10, 12, 25, 50, 100, 200), seed=11):
+    """Multi-city ordering by size: Held-Karp up to EXACT_MAX, nearest neighbour + 2-opt beyond, with the heuristic's gap"""
+    rng = np.random.default_rng(seed)
+    for size in sizes:
+        lats, lngs = rng.uniform(8, 35, size + 1), rng.uniform(68, 97, size + 1)  # cities across South Asia
+        km = geo.pairwise(lats, lngs, lats, lngs) * distance_matrix.ROAD_FACTOR
+        heuristic = lambda: itinerary.two_opt(km, itinerary.nearest_neighbour(km, True), True)
+        elapsed = timed(heuristic, 3) / 3
+        found = itinerary.path_cost(km, heuristic())
+        if size <= itinerary.EXACT_MAX:
+            exact = timed(lambda: itinerary.held_karp(km, True), 3) / 3
+            best = itinerary.path_cost(km, itinerary.held_karp(km, True))
+            report(f"{size} cities, Held-Karp", exact, 1, "plans")
+            report(f"{size} cities, 2-opt ({found / best - 1:+.1%} vs exact)", elapsed, 1, "plans")
+        else:
+            nn = itinerary.path_cost(km, itinerary.nearest_neighbour(km, True))
+            report(f"{size} cities, 2-opt ({found / nn - 1:+.1%} vs NN)", elapsed, 1, "plans")
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "plan.db"))
+        conn = pool.connection()
+        locs = [{"id": r[0], "name": r[1], "lat": r[2], "lng": r[3], "country": r[4]}
+                for r in conn.execute("SELECT id, name, lat, lng, country FROM locations ORDER BY id LIMIT 13")]
+        report("plan() by fare, 12 seeded", timed(lambda: itinerary.plan(pool, locs[0], locs[1:], "fare", True), 3) / 3,
+               1, "plans")
+        pool.close()
+
+
+@benchmark
+def quote_cache_hits(searches=20000, hot=30, seed=5):
+    """Repeated searches over a few hot city pairs: lookup + distance + pricing every time vs the shared quote cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db_pool.ConnectionPool(os.path.join(tmp, "quotes.db"))
+        matrix = distance_matrix.get_matrix(pool)
+        names = [row[0] for row in pool.connection().execute("SELECT name FROM locations ORDER BY id")]
+        rng = random.Random(seed)
+        pairs = [tuple(rng.sample(names, 2)) for _ in range(hot)]
+        weights = [1 / (rank + 1) for rank in range(hot)]  # a few routes take most of the traffic
+        trips = [(*rng.choices(pairs, weights)[0], rng.choice((1, 2, 2, 4)), rng.choice((0, 0, 1)), rng.choice((2, 3, 5)))
+                 for _ in range(searches)]
+        cache = quote_cache.QuoteCache(pool)
+
+        def uncached(origin, dest, adults, children, nights):
+            conn = pool.connection()
+            o, d = location_index.find_location(conn, origin), location_index.find_location(conn, dest)
+            o, d = ({"id": r[0], "lat": r[2], "lng": r[3], "country": r[4]} for r in (o, d))
+            route = {"origin": o, "destination": d, "distance_km": round(matrix.great_circle(o, d), 1)}
+            return route, pricing.calculate_prices(route["distance_km"], o["country"], d["country"], adults, children, nights)
+
+        def cached(origin, dest, adults, children, nights):
+            conn = pool.connection()
+            o, d = location_index.find_location(conn, origin), location_index.find_location(conn, dest)
+            key = ("web", o[0], d[0], adults, children, nights)
+            quote = cache.get(key)
+            if quote is None:
+                quote = uncached(origin, dest, adults, children, nights)
+                cache.put(key, quote)
+            return quote
+
+        report("uncached pipeline", timed(lambda: [uncached(*trip) for trip in trips], 1), searches, "searches")
+        report("quote cache", timed(lambda: [cached(*trip) for trip in trips], 1), searches, "searches")
+        stats = cache.stats()
+        print(f"  {stats['entries']} distinct quotes, hit rate {stats['hit_rate']:.1%}")
+        mismatches = sum(cached(*trip) != uncached(*trip) for trip in trips[:1000])
+        print(f"  cached quotes differing from fresh ones: {mismatches} of 1000 checked")
+        live = pricing_table.SOURCE
+        pricing_table.SOURCE = pricing_table.TableSource(edited_table(tmp, web={"flight_min": 2100}))
+        cached(*trips[0])
+        pricing_table.SOURCE = live
+        print(f"  after a pricing table edit: {cache.stats()['entries']} entries, invalidations {cache.stats()['invalidations']}")
+        pool.close()
+
+
+@benchmark
+def nominatim_client(lookups=200, burst=20):
+    """Nominatim client against the stub: new connection per call vs keep-alive, coalescing, rate limit, retries"""
+    stub = StubNominatim(0)
+    params = {"q": "Town", "format": "json", "limit": 1}
+    report("requests.get per lookup", timed(lambda: [requests.get(stub.url, params=params, timeout=10).json()
+                                                     for _ in range(lookups)], 1), lookups, "lookups")
+    client = nominatim.NominatimClient(stub.url, rate=None)
+    report("pooled keep-alive session", timed(lambda: [client._get(params) for _ in range(lookups)], 1), lookups, "lookups")
+
+    stub.delay, stub.requests = 0.2, 0
+    client = nominatim.NominatimClient(stub.url, rate=None)
+    threads = [threading.Thread(target=client.search, args=("Same Town",)) for _ in range(burst)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"  {burst} concurrent identical lookups -> {stub.requests} request(s), coalesced {client.stats()['coalesced']}")
+
+    stub.delay = 0
+    client = nominatim.NominatimClient(stub.url, rate=10)
+    elapsed = timed(lambda: [client.search(f"Town {i}") for i in range(burst)], 1)
+    print(f"  {burst} lookups at rate=10/s: {elapsed:.2f}s, throttled {client.stats()['throttled_seconds']:.2f}s")
+
+    stub.fail_next = 2
+    client = nominatim.NominatimClient(stub.url, rate=None, backoff=0.05)
+    result = client.search("Flaky Town")
+    print(f"  two 503s then success: {result['name']}, stats: {client.stats()}")
+    client.close()
+    stub.close()
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"{name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
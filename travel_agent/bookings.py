@@ -0,0 +1,49 @@
+"""
+TravelEase - Booking Service
+A booking and the reward points it earns are written in one transaction; history is read a page at a time.
+"""
+INSERT_BOOKING = "INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, total_cost) VALUES (?, ?, ?, ?, ?, ?)"
+CREDIT_POINTS = "UPDATE users SET points = points + ? WHERE id = ?"
+
+
+def points_for(cost):
+    """Reward points earned: one per ₹100"""
+    return int(cost / 100)
+
+
+def _book(conn, user_id, booking_type, origin, dest, travelers, cost):
+    booking_id = conn.execute(INSERT_BOOKING, (user_id, booking_type, origin, dest, travelers, cost)).lastrowid
+    points = points_for(cost)
+    if conn.execute(CREDIT_POINTS, (points, user_id)).rowcount != 1:
+        raise ValueError(f"no user with id {user_id}")  # rolls the booking back with it
+    return {"id": booking_id, "points": points}
+
+
+def book(pool, user_id, booking_type, origin, dest, travelers, cost):
+    """Store the booking and credit its points atomically; returns {"id", "points"}.
+
+    Runs on the pool's writer, so concurrent bookings from many sessions share a commit.
+    """
+    return pool.write(_book, user_id, booking_type, origin, dest, travelers, cost)
+
+
+# ============== HISTORY ==============
+HISTORY_PAGE = 20
+HISTORY_COLUMNS = "id, origin, destination, travelers, total_cost, status, created_at"  # what the profile pages render
+# Keyset pagination: the next page starts after the last row shown, so deep pages cost the same as the first.
+# created_at has one-second resolution so id breaks ties; both queries walk idx_bookings_user_created in order
+HISTORY_FIRST = f"SELECT {HISTORY_COLUMNS} FROM bookings WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?"
+HISTORY_AFTER = f"""SELECT {HISTORY_COLUMNS} FROM bookings WHERE user_id = ? AND (created_at, id) < (?, ?)
+    ORDER BY created_at DESC, id DESC LIMIT ?"""
+
+
+def history(conn, user_id, after=None, limit=HISTORY_PAGE):
+    """(rows newest first, cursor for the next page or None); rows are HISTORY_COLUMNS tuples, after a previous cursor"""
+    if after is None:
+        rows = conn.execute(HISTORY_FIRST, (user_id, limit + 1)).fetchall()
+    else:
+        rows = conn.execute(HISTORY_AFTER, (user_id, *after, limit + 1)).fetchall()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][6], rows[-1][0])
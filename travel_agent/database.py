@@ -0,0 +1,304 @@
+"""
+TravelEase - Shared SQLite Schema & Bootstrap
+Migrations run once per schema version, seed locations reload only when the seed set changes.
+"""
+import logging
+import sqlite3
+import hashlib
+from location_index import normalize_name
+
+DB_PATH = 'travel_agent.db'
+log = logging.getLogger(__name__)
+
+# ============== SEED DATA ==============
+LOCATIONS = [
+    ("Mumbai", 19.0760, 72.8777, "India", "south_asia", "BOM"), ("Delhi", 28.6139, 77.2090, "India", "south_asia", "DEL"),
+    ("Bangalore", 12.9716, 77.5946, "India", "south_asia", "BLR"), ("Chennai", 13.0827, 80.2707, "India", "south_asia", "MAA"),
+    ("Kolkata", 22.5726, 88.3639, "India", "south_asia", "CCU"), ("Hyderabad", 17.3850, 78.4867, "India", "south_asia", "HYD"),
+    ("Pune", 18.5204, 73.8567, "India", "south_asia", "PNQ"), ("Jaipur", 26.9124, 75.7873, "India", "south_asia", "JAI"),
+    ("Goa", 15.2993, 74.1240, "India", "south_asia", "GOI"), ("Agra", 27.1767, 78.0081, "India", "south_asia", "AGR"),
+    ("Varanasi", 25.3176, 82.9739, "India", "south_asia", "VNS"), ("Udaipur", 24.5854, 73.7125, "India", "south_asia", "UDR"),
+    ("Manali", 32.2396, 77.1887, "India", "south_asia", "KUU"), ("Shimla", 31.1048, 77.1734, "India", "south_asia", "SLV"),
+    ("Rishikesh", 30.0869, 78.2676, "India", "south_asia", "DED"), ("Darjeeling", 27.0410, 88.2663, "India", "south_asia", "IXB"),
+    ("Ooty", 11.4102, 76.6950, "India", "south_asia", "CJB"), ("Ahmedabad", 23.0225, 72.5714, "India", "south_asia", "AMD"),
+    ("Lucknow", 26.8467, 80.9462, "India", "south_asia", "LKO"), ("Kochi", 9.9312, 76.2673, "India", "south_asia", "COK"),
+    ("Amritsar", 31.6340, 74.8723, "India", "south_asia", "ATQ"), ("Srinagar", 34.0837, 74.7973, "India", "south_asia", "SXR"),
+    ("Paris", 48.8566, 2.3522, "France", "western_europe", "CDG"), ("London", 51.5074, -0.1278, "UK", "western_europe", "LHR"),
+    ("New York", 40.7128, -74.0060, "USA", "north_america", "JFK"), ("Tokyo", 35.6762, 139.6503, "Japan", "east_asia", "NRT"),
+    ("Dubai", 25.2048, 55.2708, "UAE", "middle_east", "DXB"), ("Singapore", 1.3521, 103.8198, "Singapore", "southeast_asia", "SIN"),
+    ("Bangkok", 13.7563, 100.5018, "Thailand", "southeast_asia", "BKK"), ("Bali", -8.4095, 115.1889, "Indonesia", "southeast_asia", "DPS"),
+    ("Sydney", -33.8688, 151.2093, "Australia", "australia", "SYD"), ("Rome", 41.9028, 12.4964, "Italy", "western_europe", "FCO"),
+    ("Maldives", 3.2028, 73.2207, "Maldives", "south_asia", "MLE"), ("Phuket", 7.8804, 98.3923, "Thailand", "southeast_asia", "HKT"),
+]
+
+
+def seed_hash(locations=LOCATIONS):
+    return hashlib.sha256(repr(locations).encode()).hexdigest()
+
+
+# ============== MIGRATIONS ==============
+def _column_names(cursor, table):
+    return [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+
+
+def _migration_1(cursor):
+    """Base tables"""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, email TEXT UNIQUE NOT NULL,
+        phone TEXT, password TEXT NOT NULL, points INTEGER DEFAULT 100, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, booking_type TEXT, origin TEXT, destination TEXT,
+        travelers INTEGER, total_cost REAL, status TEXT DEFAULT 'confirmed', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id))''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS locations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, lat REAL, lng REAL, country TEXT, region TEXT, airport_code TEXT)''')
+
+
+def _migration_2(cursor):
+    """airport_code for databases created before it existed"""
+    if "airport_code" not in _column_names(cursor, "locations"):
+        cursor.execute("ALTER TABLE locations ADD COLUMN airport_code TEXT")
+
+
+def _migration_3(cursor):
+    """Indexed location lookup: NOCASE unique name, normalized-name prefix index, FTS5 trigram table"""
+    if "name_norm" not in _column_names(cursor, "locations"):
+        cursor.execute("ALTER TABLE locations ADD COLUMN name_norm TEXT")
+    rows = cursor.execute("SELECT id, name FROM locations").fetchall()
+    cursor.executemany("UPDATE locations SET name_norm = ? WHERE id = ?", [(normalize_name(name), id_) for id_, name in rows])
+    # Names were only unique case-sensitively before: keep the oldest row of any case-insensitive duplicate.
+    # Bookings name their places rather than pointing at location ids, so ones naming a dropped spelling take the kept one.
+    duplicates = cursor.execute("""SELECT d.id, d.name, k.id, k.name FROM locations d
+        JOIN (SELECT MIN(id) AS id, name FROM locations GROUP BY name COLLATE NOCASE) k ON d.name = k.name COLLATE NOCASE
+        WHERE d.id != k.id ORDER BY d.id""").fetchall()
+    for dup_id, dup_name, keep_id, keep_name in duplicates:
+        remapped = sum(cursor.execute(f"UPDATE bookings SET {column} = ? WHERE {column} = ?", (keep_name, dup_name)).rowcount
+                       for column in ("origin", "destination"))
+        cursor.execute("DELETE FROM locations WHERE id = ?", (dup_id,))
+        log.warning("migration 3: removed location %d %r, a duplicate of %d %r; %d booking place(s) renamed to it",
+                    dup_id, dup_name, keep_id, keep_name, remapped)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_locations_name_nocase ON locations(name COLLATE NOCASE)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_locations_name_norm ON locations(name_norm)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_locations_airport ON locations(airport_code COLLATE NOCASE)")
+    try:
+        cursor.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS locations_fts USING fts5(
+            name_norm, content='locations', content_rowid='id', tokenize='trigram')""")
+    except sqlite3.OperationalError:
+        return  # SQLite built without FTS5/trigram (< 3.34), lookups fall back to exact + prefix
+    cursor.execute("""CREATE TRIGGER IF NOT EXISTS locations_fts_ai AFTER INSERT ON locations BEGIN
+        INSERT INTO locations_fts(rowid, name_norm) VALUES (new.id, new.name_norm); END""")
+    cursor.execute("""CREATE TRIGGER IF NOT EXISTS locations_fts_ad AFTER DELETE ON locations BEGIN
+        INSERT INTO locations_fts(locations_fts, rowid, name_norm) VALUES ('delete', old.id, old.name_norm); END""")
+    cursor.execute("""CREATE TRIGGER IF NOT EXISTS locations_fts_au AFTER UPDATE ON locations BEGIN
+        INSERT INTO locations_fts(locations_fts, rowid, name_norm) VALUES ('delete', old.id, old.name_norm);
+        INSERT INTO locations_fts(rowid, name_norm) VALUES (new.id, new.name_norm); END""")
+    cursor.execute("INSERT INTO locations_fts(locations_fts) VALUES ('rebuild')")
+
+
+def _migration_4(cursor):
+    """Geocode cache keyed by normalized query, found=0 rows are negative entries"""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS geocode_cache (
+        query TEXT PRIMARY KEY, found INTEGER NOT NULL, name TEXT, lat REAL, lng REAL, country TEXT, code TEXT,
+        expires_at REAL NOT NULL)''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_geocode_cache_expires ON geocode_cache(expires_at)")
+
+
+def _migration_5(cursor):
+    """R*Tree over location coordinates (points as zero-size boxes) for radius and nearest-airport queries"""
+    try:
+        cursor.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS locations_rtree USING rtree(
+            id, min_lat, max_lat, min_lng, max_lng)""")
+    except sqlite3.OperationalError:
+        return  # SQLite built without R*Tree, spatial queries fall back to a scan
+    cursor.execute("""CREATE TRIGGER IF NOT EXISTS locations_rtree_ai AFTER INSERT ON locations BEGIN
+        INSERT INTO locations_rtree VALUES (new.id, new.lat, new.lat, new.lng, new.lng); END""")
+    cursor.execute("""CREATE TRIGGER IF NOT EXISTS locations_rtree_ad AFTER DELETE ON locations BEGIN
+        DELETE FROM locations_rtree WHERE id = old.id; END""")
+    cursor.execute("""CREATE TRIGGER IF NOT EXISTS locations_rtree_au AFTER UPDATE OF lat, lng ON locations BEGIN
+        UPDATE locations_rtree SET min_lat = new.lat, max_lat = new.lat, min_lng = new.lng, max_lng = new.lng
+        WHERE id = new.id; END""")
+    cursor.execute("INSERT OR REPLACE INTO locations_rtree SELECT id, lat, lat, lng, lng FROM locations")
+
+
+def _migration_6(cursor):
+    """Per-user booking history newest first straight off an index, id breaking ties within created_at's one second"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_user_created ON bookings(user_id, created_at DESC, id DESC)")
+
+
+def _stats_delta(table, row, sign):
+    """Trigger statements adding (sign 1) or taking back (sign -1) one users/bookings row, new or old, in the rollups"""
+    day = f"COALESCE(date({row}.created_at), '')"
+    if table == "users":
+        keys, counts = [("all", "''"), ("day", day)], f"{sign}, 0, 0"
+    else:
+        keys = [("all", "''"), ("day", day), ("type", f"COALESCE({row}.booking_type, '')")]
+        counts = f"0, {sign}, {sign} * COALESCE({row}.total_cost, 0)"
+    return "".join(f"""INSERT INTO stats VALUES ('{scope}', {key}, {counts}) ON CONFLICT(scope, key) DO UPDATE SET
+        users = users + excluded.users, bookings = bookings + excluded.bookings, revenue = revenue + excluded.revenue;
+        """ for scope, key in keys)
+
+
+STATS_TRIGGERS = [("users", "INSERT", [("new", 1)]), ("users", "DELETE", [("old", -1)]),
+                  ("bookings", "INSERT", [("new", 1)]), ("bookings", "DELETE", [("old", -1)]),
+                  ("bookings", "UPDATE OF booking_type, total_cost, created_at", [("old", -1), ("new", 1)])]
+
+
+def _migration_7(cursor):
+    """Admin statistics kept current by triggers: running totals ('all'), per-day and per-booking-type rollups"""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS stats (
+        scope TEXT NOT NULL, key TEXT NOT NULL, users INTEGER NOT NULL DEFAULT 0, bookings INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0, PRIMARY KEY (scope, key)) WITHOUT ROWID''')
+    for table, event, deltas in STATS_TRIGGERS:
+        body = "".join(_stats_delta(table, row, sign) for row, sign in deltas)
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS stats_{table}_{event.split()[0].lower()} AFTER {event} ON {table} BEGIN {body} END")
+    cursor.execute("DELETE FROM stats")
+    cursor.execute("""INSERT INTO stats SELECT 'all', '', (SELECT COUNT(*) FROM users), COUNT(*), COALESCE(SUM(total_cost), 0)
+        FROM bookings""")
+    cursor.execute("""INSERT INTO stats SELECT 'type', COALESCE(booking_type, ''), 0, COUNT(*), COALESCE(SUM(total_cost), 0)
+        FROM bookings GROUP BY 2""")
+    cursor.execute("""INSERT INTO stats SELECT 'day', day, SUM(users), SUM(bookings), SUM(revenue) FROM (
+        SELECT COALESCE(date(created_at), '') AS day, 1 AS users, 0 AS bookings, 0 AS revenue FROM users
+        UNION ALL SELECT COALESCE(date(created_at), ''), 0, 1, COALESCE(total_cost, 0) FROM bookings) GROUP BY day""")
+
+
+def _migration_8(cursor):
+    """Admin lists newest first, paged by (created_at, id) straight off an index"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at DESC, id DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_created ON bookings(created_at DESC, id DESC)")
+
+
+def _rollup_delta(table, row, sign):
+    """Trigger statements adding (sign 1) or taking back (sign -1) one users/bookings row in stats and route_stats"""
+    day = f"COALESCE(date({row}.created_at), '')"
+    if table == "users":
+        return f"""INSERT INTO stats (scope, key, users) VALUES ('all', '', {sign}), ('day', {day}, {sign})
+        ON CONFLICT(scope, key) DO UPDATE SET users = users + excluded.users;"""
+    values = f"{sign}, {sign} * COALESCE({row}.total_cost, 0), {sign} * COALESCE({row}.travelers, 0)"
+    update = "bookings = bookings + excluded.bookings, revenue = revenue + excluded.revenue, travelers = travelers + excluded.travelers"
+    keys = [("all", "''"), ("day", day), ("type", f"COALESCE({row}.booking_type, '')")]
+    statements = [f"""INSERT INTO stats (scope, key, bookings, revenue, travelers) VALUES ('{scope}', {key}, {values})
+        ON CONFLICT(scope, key) DO UPDATE SET {update};""" for scope, key in keys]
+    statements.append(f"""INSERT INTO route_stats VALUES (COALESCE({row}.origin, ''), COALESCE({row}.destination, ''), {values})
+        ON CONFLICT(origin, destination) DO UPDATE SET {update};""")
+    return "\n        ".join(statements)
+
+
+ROLLUP_TRIGGERS = [("users", "INSERT", [("new", 1)]), ("users", "DELETE", [("old", -1)]),
+                   ("bookings", "INSERT", [("new", 1)]), ("bookings", "DELETE", [("old", -1)]),
+                   ("bookings", "UPDATE OF booking_type, origin, destination, travelers, total_cost, created_at",
+                    [("old", -1), ("new", 1)])]
+
+
+def rebuild_rollups(cursor):
+    """Recompute stats and route_stats from users and bookings, e.g. after a bulk load with the triggers off"""
+    cursor.execute("DELETE FROM stats")
+    cursor.execute("DELETE FROM route_stats")
+    cursor.execute("""INSERT INTO stats SELECT 'all', '', (SELECT COUNT(*) FROM users), COUNT(*), COALESCE(SUM(total_cost), 0),
+        COALESCE(SUM(travelers), 0) FROM bookings""")
+    cursor.execute("""INSERT INTO stats SELECT 'type', COALESCE(booking_type, ''), 0, COUNT(*), COALESCE(SUM(total_cost), 0),
+        COALESCE(SUM(travelers), 0) FROM bookings GROUP BY 2""")
+    cursor.execute("""INSERT INTO stats SELECT 'day', day, SUM(users), SUM(bookings), SUM(revenue), SUM(travelers) FROM (
+        SELECT COALESCE(date(created_at), '') AS day, 1 AS users, 0 AS bookings, 0 AS revenue, 0 AS travelers FROM users
+        UNION ALL SELECT COALESCE(date(created_at), ''), 0, 1, COALESCE(total_cost, 0), COALESCE(travelers, 0) FROM bookings)
+        GROUP BY day""")
+    cursor.execute("""INSERT INTO route_stats SELECT COALESCE(origin, ''), COALESCE(destination, ''), COUNT(*),
+        COALESCE(SUM(total_cost), 0), COALESCE(SUM(travelers), 0) FROM bookings GROUP BY 1, 2""")
+
+
+def _migration_9(cursor):
+    """Booking analytics: travelers in the stats rollups and a per-route rollup, both kept by the booking triggers"""
+    if "travelers" not in _column_names(cursor, "stats"):
+        cursor.execute("ALTER TABLE stats ADD COLUMN travelers INTEGER NOT NULL DEFAULT 0")
+    cursor.execute('''CREATE TABLE IF NOT EXISTS route_stats (
+        origin TEXT NOT NULL, destination TEXT NOT NULL, bookings INTEGER NOT NULL DEFAULT 0, revenue REAL NOT NULL DEFAULT 0,
+        travelers INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (origin, destination)) WITHOUT ROWID''')
+    for table, event, deltas in ROLLUP_TRIGGERS:  # replace migration 7's triggers, which wrote stats without column names
+        name = f"stats_{table}_{event.split()[0].lower()}"
+        body = "\n        ".join(_rollup_delta(table, row, sign) for row, sign in deltas)
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} AFTER {event} ON {table} BEGIN\n        {body}\n        END")
+    rebuild_rollups(cursor)
+
+
+def _migration_10(cursor):
+    """Location change feed for the autocomplete index: one row per location, re-sequenced on each insert, rename or delete"""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS location_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT, location_id INTEGER NOT NULL UNIQUE)''')
+    # DELETE + INSERT rather than INSERT OR REPLACE: inside a trigger the outer statement's conflict policy wins
+    for event, row in (("INSERT", "new"), ("DELETE", "old"), ("UPDATE OF name, country, airport_code", "new")):
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS location_changes_{event.split()[0].lower()} AFTER {event} ON locations
+        BEGIN DELETE FROM location_changes WHERE location_id = {row}.id;
+        INSERT INTO location_changes (location_id) VALUES ({row}.id); END""")
+
+
+def _migration_11(cursor):
+    """The change feed also covers moved locations, which the distance matrix reads it for"""
+    cursor.execute("DROP TRIGGER IF EXISTS location_changes_update")
+    cursor.execute("""CREATE TRIGGER location_changes_update AFTER UPDATE OF name, country, airport_code, lat, lng ON locations
+        BEGIN DELETE FROM location_changes WHERE location_id = new.id;
+        INSERT INTO location_changes (location_id) VALUES (new.id); END""")
+
+
+MIGRATIONS = [(1, _migration_1), (2, _migration_2), (3, _migration_3), (4, _migration_4), (5, _migration_5),
+              (6, _migration_6), (7, _migration_7), (8, _migration_8), (9, _migration_9), (10, _migration_10),
+              (11, _migration_11)]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def migrate(conn):
+    """Apply pending migrations, returns the list of versions applied"""
+    cursor = conn.cursor()
+    if get_schema_version(cursor) >= SCHEMA_VERSION:
+        return []
+    applied = []
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        current = get_schema_version(cursor)  # re-read under the write lock, another process may have migrated
+        for version, migration in MIGRATIONS:
+            if version > current:
+                migration(cursor)
+                cursor.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+                applied.append(version)
+        conn.commit()
+    except:
+        conn.rollback()
+        raise
+    return applied
+
+
+UPSERT_LOCATION = '''INSERT INTO locations (name, lat, lng, country, region, airport_code, name_norm) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET lat = excluded.lat, lng = excluded.lng, country = excluded.country,
+    region = excluded.region, airport_code = excluded.airport_code, name_norm = excluded.name_norm'''
+
+
+def seed_locations(conn, locations=LOCATIONS):
+    """Upsert the seed set if its hash differs from the stored one, returns True if it reseeded"""
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE IF NOT EXISTS app_meta (key TEXT PRIMARY KEY, value TEXT)")
+    digest = seed_hash(locations)
+    cursor.execute("SELECT value FROM app_meta WHERE key = 'seed_hash'")
+    row = cursor.fetchone()
+    if row and row[0] == digest:
+        return False
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.executemany(UPSERT_LOCATION, [(*loc, normalize_name(loc[0])) for loc in locations])
+        cursor.execute("INSERT OR REPLACE INTO app_meta (key, value) VALUES ('seed_hash', ?)", (digest,))
+        conn.commit()
+    except:
+        conn.rollback()
+        raise
+    return True
+
+
+# ============== BOOTSTRAP ==============
+def bootstrap(conn):
+    migrate(conn)
+    seed_locations(conn)
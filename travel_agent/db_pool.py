@@ -0,0 +1,160 @@
+"""
+TravelEase - SQLite Connection Pool
+WAL mode, one read connection per thread and a single writer thread that group-commits whatever is queued.
+"""
+import sqlite3
+import threading
+import queue
+from concurrent.futures import Future
+import database
+
+PRAGMAS = {
+    "synchronous": "NORMAL",     # safe with WAL, fsync only at checkpoints
+    "cache_size": -20000,        # ~20 MB page cache per connection
+    "mmap_size": 268435456,      # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+}
+GROUP_MAX = 64  # writes committed together when sessions queue up behind the writer
+
+
+class ConnectionPool:
+    def __init__(self, path=database.DB_PATH, pragmas=None, journal_mode="WAL", group_max=GROUP_MAX):
+        self.path = path
+        self.pragmas = dict(PRAGMAS, **(pragmas or {}))
+        self.journal_mode = journal_mode
+        self.group_max = group_max
+        self.counters = {"writes": 0, "failed_writes": 0, "transactions": 0}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._owners = {}   # thread -> its read connection
+        self._idle = []     # connections recycled from threads that have exited
+        self._writes = queue.Queue()
+        self._closed = False
+
+        conn = self._open()
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")  # persistent, stored in the database file
+        database.bootstrap(conn)
+        self._writer_conn = conn
+        self._writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self._writer.start()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def connection(self):
+        """Read connection owned by the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._acquire()
+        return conn
+
+    def _acquire(self):
+        # Streamlit runs each rerun on a fresh thread, so reclaim connections from dead threads
+        with self._lock:
+            for thread in [t for t in self._owners if not t.is_alive()]:
+                self._idle.append(self._owners.pop(thread))
+            conn = self._idle.pop() if self._idle else self._open()
+            self._owners[threading.current_thread()] = conn
+        return conn
+
+    def write(self, fn, *args):
+        """Run fn(conn, *args) on the writer thread and return its result once committed.
+
+        fn runs all-or-nothing: it may share a transaction with other queued writes, but under its own savepoint,
+        so if it raises only its changes are rolled back. fn must not commit.
+        """
+        return self.submit(fn, *args).result()
+
+    def submit(self, fn, *args):
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot write to a closed pool")
+            self._writes.put((fn, args, future))
+        return future
+
+    def _write_loop(self):
+        conn = self._writer_conn
+        running = True
+        while running:
+            batch, item = [], self._writes.get()
+            while item is not None:
+                if item[2].set_running_or_notify_cancel():
+                    batch.append(item)
+                if len(batch) >= self.group_max:
+                    break
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                running = False  # close() queued None; finish what came before it
+            if batch:
+                self._commit_group(conn, batch)
+
+    def _commit_group(self, conn, batch):
+        """One transaction (one fsync) for the batch, each write under a savepoint so a failing one rolls back alone"""
+        outcomes = []
+        # A lone write needs no savepoint (and bulk writes stay off SQLite's in-memory sub-journal, slow when large)
+        isolate = len(batch) > 1
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, _ in batch:
+                if not isolate:
+                    outcomes.append((True, fn(conn, *args)))
+                    continue
+                conn.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((True, fn(conn, *args)))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    outcomes.append((False, e))
+                conn.execute("RELEASE write")
+            conn.commit()
+        except BaseException as e:
+            conn.rollback()
+            self.counters["failed_writes"] += len(batch)
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        self.counters["transactions"] += 1
+        for (ok, value), (_, _, future) in zip(outcomes, batch):
+            self.counters["writes" if ok else "failed_writes"] += 1
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def stats(self):
+        stats = dict(self.counters, queued=self._writes.qsize())
+        stats["writes_per_transaction"] = stats["writes"] / stats["transactions"] if stats["transactions"] else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._writes.put(None)
+        self._writer.join()
+        with self._lock:
+            for conn in [self._writer_conn, *self._owners.values(), *self._idle]:
+                conn.close()
+            self._owners, self._idle = {}, []
+
+
+# ============== PROCESS-WIDE POOLS ==============
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=database.DB_PATH):
+    """Pool for path, created (and the database bootstrapped) on first use"""
+    pool = _pools.get(path)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        if path not in _pools:
+            _pools[path] = ConnectionPool(path)
+        return _pools[path]
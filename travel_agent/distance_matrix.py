@@ -0,0 +1,129 @@
+"""
+TravelEase - Precomputed Distance Matrix
+Great-circle km between every pair of known locations in a NumPy array, kept current from the location_changes feed.
+"""
+import time
+import threading
+import numpy as np
+from geo import haversine
+
+ROAD_FACTOR = 1.3
+MAX_LOCATIONS = 2048  # 2048² float64 = 32 MB; places beyond this fall back to computing on demand
+CHECK_INTERVAL = 2.0  # seconds between reads of the location_changes feed for moved or deleted places
+
+
+class DistanceMatrix:
+    def __init__(self, pool, max_size=MAX_LOCATIONS, check_interval=CHECK_INTERVAL, clock=time.monotonic):
+        self.pool = pool
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self.clock = clock
+        self._rows = {}  # location id -> row/column in _km
+        self._free = []  # rows of deleted locations, reused before the matrix grows
+        self._size = 0   # rows handed out so far, free ones included
+        self._lat = np.empty(0)
+        self._lng = np.empty(0)
+        self._km = np.empty((0, 0))
+        self.max_id = 0  # highest location id seen, so a lookup of a newer one refreshes straight away
+        self.seq = None  # last location_changes.seq applied, None until loaded
+        self._checked = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Apply locations added, moved or deleted since the last refresh, returns how many changed"""
+        with self._lock:
+            conn = self.pool.connection()
+            self._checked = self.clock()
+            # Read the feed position first: a change racing the reads below is simply applied again next time
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM location_changes").fetchone()[0]
+            if self.seq is None:
+                rows = conn.execute("SELECT id, lat, lng, 0 FROM locations ORDER BY id LIMIT ?", (self.max_size,)).fetchall()
+            else:
+                rows = conn.execute("""SELECT c.location_id, l.lat, l.lng, l.id IS NULL FROM location_changes c
+                    LEFT JOIN locations l ON l.id = c.location_id WHERE c.seq > ? ORDER BY c.seq""", (self.seq,)).fetchall()
+            placed = {}
+            for id_, lat, lng, gone in rows:
+                self.max_id = max(self.max_id, id_)
+                slot = self._rows.get(id_)
+                if gone:
+                    if slot is not None:
+                        del self._rows[id_]
+                        placed.pop(slot, None)
+                        self._free.append(slot)
+                    continue
+                if slot is None:
+                    slot = self._slot()
+                    if slot is None:
+                        continue  # full: this place is computed on demand
+                    self._rows[id_] = slot
+                placed[slot] = (lat, lng)
+            if placed:
+                self._place(placed)
+            self.seq = seq
+            return len(rows)
+
+    def _slot(self):
+        if self._free:
+            return self._free.pop()
+        if self._size >= self.max_size:
+            return None
+        if self._size == len(self._lat):
+            n, capacity = self._size, min(self.max_size, max(64, 2 * self._size))
+            lat, lng, km = np.zeros(capacity), np.zeros(capacity), np.zeros((capacity, capacity))
+            lat[:n], lng[:n], km[:n, :n] = self._lat[:n], self._lng[:n], self._km[:n, :n]
+            self._lat, self._lng, self._km = lat, lng, km
+        self._size += 1
+        return self._size - 1
+
+    def _place(self, placed):
+        """Write new coordinates for the given rows and recompute only those rows and their columns"""
+        slots, n = np.fromiter(placed, dtype=np.intp, count=len(placed)), self._size
+        self._lat[slots] = [lat for lat, _ in placed.values()]
+        self._lng[slots] = [lng for _, lng in placed.values()]
+        # haversine is symmetric, so the columns are the rows' transpose
+        block = haversine(self._lat[slots, None], self._lng[slots, None], self._lat[None, :n], self._lng[None, :n])
+        self._km[slots, :n] = block
+        self._km[:n, slots] = block.T
+
+    def _stale(self, ids):
+        """A lookup naming an id newer than any seen, or the change feed being due a check"""
+        return max(ids) > self.max_id or self.clock() - self._checked >= self.check_interval
+
+    def great_circle(self, origin, dest):
+        """km between two location dicts: a matrix lookup when both have ids, computed otherwise"""
+        i, j = self._rows.get(origin.get("id")), self._rows.get(dest.get("id"))
+        if self._stale((origin.get("id") or 0, dest.get("id") or 0)):
+            self.refresh()
+            i, j = self._rows.get(origin.get("id")), self._rows.get(dest.get("id"))
+        if i is not None and j is not None:
+            return self._km.item(i, j)
+        return float(haversine(origin["lat"], origin["lng"], dest["lat"], dest["lng"]))
+
+    def submatrix(self, locs):
+        """Great-circle km between every pair of location dicts, shape (N, N), from the matrix where it can"""
+        if self._stale([loc.get("id") or 0 for loc in locs]):
+            self.refresh()
+        rows = [self._rows.get(loc.get("id")) for loc in locs]
+        if None not in rows:
+            return self._km[np.ix_(rows, rows)]
+        lats, lngs = np.array([loc["lat"] for loc in locs]), np.array([loc["lng"] for loc in locs])
+        return haversine(lats[:, None], lngs[:, None], lats[None, :], lngs[None, :])
+
+    def road(self, origin, dest):
+        return self.great_circle(origin, dest) * ROAD_FACTOR
+
+    def __len__(self):
+        return len(self._rows)
+
+
+# ============== PROCESS-WIDE MATRICES ==============
+_matrices = {}
+_matrices_lock = threading.Lock()
+
+
+def get_matrix(pool):
+    with _matrices_lock:
+        if pool.path not in _matrices:
+            _matrices[pool.path] = DistanceMatrix(pool)
+        return _matrices[pool.path]
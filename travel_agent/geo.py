@@ -0,0 +1,32 @@
+"""
+TravelEase - Vectorized Great-Circle Distances
+One haversine implementation over NumPy arrays; the scalar helpers run the same code so results match bit for bit.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Great-circle km, element-wise over broadcastable arrays of degrees"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lng1, lat2, lng2))
+    # x * x rather than x ** 2: NumPy squares arrays with a multiply but 0-d values with pow(), which can differ by an ulp
+    sin_lat, sin_lng = np.sin((lat2 - lat1) / 2), np.sin((lng2 - lng1) / 2)
+    a = sin_lat * sin_lat + np.cos(lat1) * np.cos(lat2) * sin_lng * sin_lng
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def distance(lat1, lng1, lat2, lng2):
+    """km between two points, as a float"""
+    return float(haversine(lat1, lng1, lat2, lng2))
+
+
+def distances_from(lat, lng, lats, lngs):
+    """km from one point to each of lats/lngs, shape (N,)"""
+    return haversine(lat, lng, lats, lngs)
+
+
+def pairwise(lats1, lngs1, lats2, lngs2):
+    """km from every point in set 1 to every point in set 2, shape (N, M) -- N * M * 8 bytes"""
+    lats1, lngs1 = np.asarray(lats1, dtype=float)[:, None], np.asarray(lngs1, dtype=float)[:, None]
+    return haversine(lats1, lngs1, np.asarray(lats2, dtype=float)[None, :], np.asarray(lngs2, dtype=float)[None, :])
@@ -0,0 +1,116 @@
+"""
+TravelEase - Persistent Geocode Cache
+Nominatim results cached by normalized query: hits for 30 days, misses for an hour, an LRU in front of the table.
+"""
+import time
+import threading
+from collections import OrderedDict
+from location_index import normalize_name
+import nominatim
+import regions
+
+HIT_TTL = 30 * 24 * 3600
+MISS_TTL = 3600
+
+
+class GeocodeCache:
+    def __init__(self, pool, fetch=None, hit_ttl=HIT_TTL, miss_ttl=MISS_TTL, memory_size=1024, clock=time.time):
+        self.pool = pool
+        self.fetch = fetch or nominatim.get_client().search
+        self.clock = clock  # wall-clock seconds; expiry times are stored in the table
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.memory_size = memory_size
+        self._memory = OrderedDict()  # key -> (expires_at, result or None)
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "db_hits": 0, "negative_hits": 0, "misses": 0, "remote_errors": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _remember(self, key, expires_at, result):
+        with self._lock:
+            self._memory[key] = (expires_at, result)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def lookup(self, query):
+        """(True, result-or-None) when cached and fresh, (False, None) otherwise"""
+        key, now = normalize_name(query), self.clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+            else:
+                entry = None
+        if entry:
+            self._count("negative_hits" if entry[1] is None else "memory_hits")
+            return True, entry[1]
+        row = self.pool.connection().execute(
+            "SELECT found, name, lat, lng, country, code, expires_at FROM geocode_cache WHERE query = ?", (key,)).fetchone()
+        if not row or row[6] <= now:
+            self._count("misses")
+            return False, None
+        result = {"name": row[1], "lat": row[2], "lng": row[3], "country": row[4], "code": row[5]} if row[0] else None
+        self._remember(key, row[6], result)
+        self._count("negative_hits" if result is None else "db_hits")
+        return True, result
+
+    def store(self, query, result):
+        """Cache result (None for no match); hits are also promoted into locations, with their country's region"""
+        key = normalize_name(query)
+        expires_at = self.clock() + (self.hit_ttl if result else self.miss_ttl)
+        r = result or {}
+        region = regions.REGISTRY.region(r["country"]) if result else None  # an unmapped country is reported here, once
+
+        def write(conn):
+            conn.execute("""INSERT OR REPLACE INTO geocode_cache (query, found, name, lat, lng, country, code, expires_at)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                         (key, 1 if result else 0, r.get("name"), r.get("lat"), r.get("lng"), r.get("country"), r.get("code"), expires_at))
+            if result:
+                conn.execute("""INSERT INTO locations (name, lat, lng, country, region, airport_code, name_norm)
+                             VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING""",
+                             (r["name"], r["lat"], r["lng"], r["country"], region, r.get("code") or None, normalize_name(r["name"])))
+        self.pool.write(write)
+        self._remember(key, expires_at, result)
+
+    def resolve(self, query):
+        """Cached result for query, fetching and caching it on a miss; None if not found, network errors propagate"""
+        cached, result = self.lookup(query)
+        if cached:
+            return result
+        try:
+            result = self.fetch(query)
+        except Exception:
+            self._count("remote_errors")  # transient, not negative-cached
+            raise
+        self.store(query, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters, memory_entries=len(self._memory))
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        return stats
+
+    def purge_expired(self):
+        now = self.clock()
+        self.pool.write(lambda conn: conn.execute("DELETE FROM geocode_cache WHERE expires_at <= ?", (now,)))
+        with self._lock:
+            for key in [k for k, (expires_at, _) in self._memory.items() if expires_at <= now]:
+                del self._memory[key]
+
+
+# ============== PROCESS-WIDE CACHES ==============
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(pool):
+    with _caches_lock:
+        if pool.path not in _caches:
+            _caches[pool.path] = GeocodeCache(pool)
+        return _caches[pool.path]
@@ -0,0 +1,138 @@
+"""
+TravelEase - Multi-City Itinerary Planner
+Visiting order for several cities by road distance or fare: Held-Karp when exact is affordable, nearest neighbour + 2-opt beyond.
+"""
+import time
+import numpy as np
+import distance_matrix
+import pricing
+
+EXACT_MAX = 12  # destinations; Held-Karp keeps 2^n * n states, ~50k at 12
+TIME_BUDGET = 2.0  # seconds per plan; an exact search that runs out falls back to the heuristic
+OBJECTIVES = ("distance", "fare")
+
+
+def leg_fares(km, countries, profile=pricing.WEB):
+    """(N, N) cheapest per-person fare from city i to city j, all legs priced in one batch"""
+    n = len(countries)
+    origin, dest = np.repeat(countries, n), np.tile(countries, n)
+    ones = np.ones(n * n, dtype=np.int64)
+    batch = pricing.calculate_prices_batch(np.round(km, 1).ravel(), origin, dest, ones, 0 * ones, ones, profile)
+    cheapest = np.where(batch["has_buses"], batch["buses"][:, 0],
+                        np.where(batch["has_trains"], batch["trains"][:, 0], batch["flight_economy"]))
+    return cheapest.reshape(n, n).astype(float)
+
+
+def path_cost(cost, path):
+    path = np.asarray(path)
+    return float(cost[path[:-1], path[1:]].sum())
+
+
+def _closed(cost, round_trip):
+    """cost with a zero-cost sink appended for one-way trips, so both shapes are a tour that ends at a fixed node"""
+    if round_trip:
+        return cost, 0
+    n = len(cost)
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = cost
+    return padded, n
+
+
+def held_karp(cost, round_trip=False, deadline=None):
+    """Cheapest path from node 0 through every other node (and back if round_trip); None if deadline passes first"""
+    cost, end = _closed(cost, round_trip)
+    free = [i for i in range(1, len(cost)) if i != end]
+    if not free:
+        return [0, end] if round_trip else [0]
+    k = len(free)
+    nodes = np.array(free)
+    dp = np.full((1 << k, k), np.inf)  # dp[visited subset, last] = cheapest path from 0 covering subset ending at last
+    parent = np.full((1 << k, k), -1, dtype=np.int64)
+    dp[1 << np.arange(k), np.arange(k)] = cost[0, nodes]
+    masks = np.arange(1 << k)
+    sizes = np.array([bin(mask).count("1") for mask in range(1 << k)])
+    for size in range(2, k + 1):
+        if deadline is not None and time.monotonic() > deadline:
+            return None
+        layer = masks[sizes == size]
+        for j in range(k):
+            with_j = layer[(layer >> j) & 1 == 1]
+            candidates = dp[with_j ^ (1 << j)] + cost[nodes, nodes[j]][None, :]
+            best = candidates.argmin(axis=1)
+            dp[with_j, j] = candidates[np.arange(len(with_j)), best]
+            parent[with_j, j] = best
+    full = (1 << k) - 1
+    last = int((dp[full] + cost[nodes, end]).argmin())
+    order, mask = [], full
+    while last >= 0:
+        order.append(int(nodes[last]))
+        mask, last = mask ^ (1 << last), int(parent[mask, last])
+    path = [0] + order[::-1]
+    return path + [0] if round_trip else path
+
+
+def nearest_neighbour(cost, round_trip=False):
+    n = len(cost)
+    path, left = [0], set(range(1, n))
+    while left:
+        here = path[-1]
+        nxt = min(left, key=lambda j: (cost[here, j], j))
+        path.append(nxt)
+        left.remove(nxt)
+    return path + [0] if round_trip else path
+
+
+def two_opt(cost, path, round_trip=False, deadline=None):
+    """Reverse segments while that lowers the total; costs may be asymmetric, so reversed legs are re-priced"""
+    cost, end = _closed(cost, round_trip)
+    path = np.array(path if round_trip else list(path) + [end])
+    last = len(path) - 2  # positions 1..last can move; path[0] and path[-1] stay put
+    improved = True
+    while improved and last >= 2 and (deadline is None or time.monotonic() < deadline):
+        improved = False
+        fwd = np.concatenate(([0.0], np.cumsum(cost[path[:-1], path[1:]])))  # fwd[k]: cost of path[0..k]
+        rev = np.concatenate(([0.0], np.cumsum(cost[path[1:], path[:-1]])))  # the same legs walked backwards
+        for i in range(1, last):
+            j = np.arange(i + 1, last + 1)
+            before = cost[path[i - 1], path[i]] + (fwd[j] - fwd[i]) + cost[path[j], path[j + 1]]
+            after = cost[path[i - 1], path[j]] + (rev[j] - rev[i]) + cost[path[i], path[j + 1]]
+            gain = before - after
+            best = int(gain.argmax())
+            if gain[best] > 1e-9:
+                path[i:j[best] + 1] = path[i:j[best] + 1][::-1].copy()
+                improved = True
+                break
+    return [int(node) for node in (path if round_trip else path[:-1])]
+
+
+def order(cost, round_trip=False, time_budget=TIME_BUDGET):
+    """(path of node indexes starting at 0, method, optimal) within the time budget"""
+    deadline = time.monotonic() + time_budget
+    if len(cost) - 1 <= EXACT_MAX:
+        path = held_karp(cost, round_trip, deadline)
+        if path is not None:
+            return path, "Held-Karp", True
+    path = two_opt(cost, nearest_neighbour(cost, round_trip), round_trip, deadline)
+    return path, "nearest neighbour + 2-opt", len(cost) <= 3
+
+
+def plan(pool, start, destinations, objective="distance", round_trip=False, time_budget=TIME_BUDGET, profile=pricing.WEB):
+    """Visiting order for location dicts (id, name, lat, lng, country) from start through every destination.
+
+    Returns {"stops", "legs", "total_km", "total_fare", "method", "optimal"}; fares are per person.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    seen, stops = {start.get("id") or start["name"]}, [start]
+    for loc in destinations:
+        key = loc.get("id") or loc["name"]
+        if key not in seen:
+            seen.add(key)
+            stops.append(loc)
+    km = distance_matrix.get_matrix(pool).submatrix(stops) * distance_matrix.ROAD_FACTOR
+    fares = leg_fares(km, np.array([loc["country"] for loc in stops], dtype=object), profile)
+    path, method, optimal = order(km if objective == "distance" else fares, round_trip, time_budget)
+    legs = [{"from": stops[a], "to": stops[b], "distance_km": round(float(km[a, b]), 1), "fare": int(fares[a, b])}
+            for a, b in zip(path, path[1:])]
+    return {"stops": [stops[i] for i in path], "legs": legs, "total_km": round(path_cost(km, path), 1),
+            "total_fare": sum(leg["fare"] for leg in legs), "method": method, "optimal": optimal}
@@ -0,0 +1,93 @@
+"""
+TravelEase - Index-Backed Location Lookup
+Exact (COLLATE NOCASE index) -> prefix (normalized-name index) -> substring/fuzzy (FTS5 trigram) with deterministic ranking.
+"""
+import re
+import difflib
+import unicodedata
+
+COLUMNS = "id, name, lat, lng, country, region, COALESCE(airport_code, '') AS airport_code"
+JOINED_COLUMNS = "l.id, l.name, l.lat, l.lng, l.country, l.region, COALESCE(l.airport_code, '') AS airport_code"
+FUZZY_CUTOFF = 0.75
+_non_alnum = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name):
+    """'São Paulo ' -> 'sao paulo': accents stripped, lowercase, punctuation folded to single spaces"""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return _non_alnum.sub(" ", text).strip()
+
+
+def has_fts(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'locations_fts'").fetchone() is not None
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _exact(conn, query):
+    return conn.execute(f"SELECT {COLUMNS} FROM locations WHERE name = ? COLLATE NOCASE", (query,)).fetchall()
+
+
+def _by_code(conn, query):
+    return conn.execute(f"SELECT {COLUMNS} FROM locations WHERE airport_code = ? COLLATE NOCASE ORDER BY name",
+                        (query,)).fetchall()
+
+
+def _prefix(conn, norm, limit):
+    # Range scan on idx_locations_name_norm, shortest (closest) completion first
+    return conn.execute(f"""SELECT {COLUMNS} FROM locations WHERE name_norm >= ? AND name_norm < ?
+                        ORDER BY length(name_norm), name_norm, id LIMIT ?""", (norm, norm + "\uffff", limit)).fetchall()
+
+
+def _substring(conn, norm, limit):
+    # Earliest match position first, so 'goa' ranks 'Goa Velha' above 'Chicagoan'
+    return conn.execute(f"""SELECT {JOINED_COLUMNS} FROM locations_fts f JOIN locations l ON l.id = f.rowid
+                        WHERE locations_fts MATCH ? ORDER BY instr(l.name_norm, ?), length(l.name_norm), l.name_norm, l.id
+                        LIMIT ?""", (_fts_phrase(norm), norm, limit)).fetchall()
+
+
+def _fuzzy(conn, norm, limit, candidates=200):
+    # Any shared trigram makes a candidate, then rank by similarity to the whole query
+    trigrams = sorted({norm[i:i + 3] for i in range(len(norm) - 2)})
+    rows = conn.execute(f"""SELECT {JOINED_COLUMNS}, l.name_norm FROM locations_fts f JOIN locations l ON l.id = f.rowid
+                        WHERE locations_fts MATCH ? ORDER BY bm25(locations_fts), l.id LIMIT ?""",
+                        (" OR ".join(_fts_phrase(t) for t in trigrams), candidates)).fetchall()
+    scored = [(difflib.SequenceMatcher(None, norm, row[7]).ratio(), row) for row in rows]
+    scored = [(score, row) for score, row in scored if score >= FUZZY_CUTOFF]
+    scored.sort(key=lambda item: (-item[0], len(item[1][7]), item[1][7], item[1][0]))
+    return [row[:7] for _, row in scored[:limit]]
+
+
+def search_locations(conn, query, limit=6):
+    """Ranked matches as (id, name, lat, lng, country, region, airport_code) tuples"""
+    query = (query or "").strip()
+    norm = normalize_name(query)
+    if not norm:
+        return []
+    results, seen = [], set()
+
+    def add(rows):
+        for row in rows:
+            if row[0] not in seen and len(results) < limit:
+                seen.add(row[0])
+                results.append(row)
+
+    add(_exact(conn, query))
+    if len(query) == 3:
+        add(_by_code(conn, query))
+    if len(results) < limit:
+        add(_prefix(conn, norm, limit))
+    if len(results) < limit and len(norm) >= 3 and has_fts(conn):
+        add(_substring(conn, norm, limit))
+        if not results:
+            add(_fuzzy(conn, norm, limit))
+    return results
+
+
+def find_location(conn, query):
+    """Best single match for query, or None"""
+    results = search_locations(conn, query, limit=1)
+    return results[0] if results else None
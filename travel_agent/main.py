@@ -6,11 +6,26 @@ import customtkinter as ctk
 from tkinter import messagebox
 import tkinter as tk
 import sqlite3
-import math
-import requests
 import hashlib
 from datetime import datetime, timedelta
 import os
+import database
+import db_pool
+import location_index
+import autocomplete
+import geocode_cache
+import background
+import routing
+import distance_matrix
+import geo
+import spatial_index
+import pricing
+import regions
+import quote_cache
+import offers
+import bookings
+import analytics
+import admin_lists
 
 # Set appearance
 ctk.set_appearance_mode("light")
@@ -19,112 +34,56 @@ ctk.set_default_color_theme("blue")
 # ============== DATABASE SETUP ==============
 class Database:
     def __init__(self):
-        self.conn = sqlite3.connect('travel_agent.db', check_same_thread=False)
-        self.create_tables()
-        self.seed_data()
-    
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, email TEXT UNIQUE NOT NULL,
-            phone TEXT, password TEXT NOT NULL, points INTEGER DEFAULT 100, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-        cursor.execute('''CREATE TABLE IF NOT EXISTS bookings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, booking_type TEXT, origin TEXT, destination TEXT,
-            travelers INTEGER, total_cost REAL, status TEXT DEFAULT 'confirmed', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id))''')
-        cursor.execute('''CREATE TABLE IF NOT EXISTS locations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, lat REAL, lng REAL, country TEXT, region TEXT, airport_code TEXT)''')
-        self.conn.commit()
-    
-    def seed_data(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM locations")
-        if cursor.fetchone()[0] == 0:
-            locations = [
-                ("Mumbai", 19.0760, 72.8777, "India", "south_asia", "BOM"), ("Delhi", 28.6139, 77.2090, "India", "south_asia", "DEL"),
-                ("Bangalore", 12.9716, 77.5946, "India", "south_asia", "BLR"), ("Chennai", 13.0827, 80.2707, "India", "south_asia", "MAA"),
-                ("Kolkata", 22.5726, 88.3639, "India", "south_asia", "CCU"), ("Hyderabad", 17.3850, 78.4867, "India", "south_asia", "HYD"),
-                ("Pune", 18.5204, 73.8567, "India", "south_asia", "PNQ"), ("Jaipur", 26.9124, 75.7873, "India", "south_asia", "JAI"),
-                ("Goa", 15.2993, 74.1240, "India", "south_asia", "GOI"), ("Agra", 27.1767, 78.0081, "India", "south_asia", "AGR"),
-                ("Varanasi", 25.3176, 82.9739, "India", "south_asia", "VNS"), ("Udaipur", 24.5854, 73.7125, "India", "south_asia", "UDR"),
-                ("Manali", 32.2396, 77.1887, "India", "south_asia", "KUU"), ("Shimla", 31.1048, 77.1734, "India", "south_asia", "SLV"),
-                ("Rishikesh", 30.0869, 78.2676, "India", "south_asia", "DED"), ("Darjeeling", 27.0410, 88.2663, "India", "south_asia", "IXB"),
-                ("Ooty", 11.4102, 76.6950, "India", "south_asia", "CJB"), ("Ahmedabad", 23.0225, 72.5714, "India", "south_asia", "AMD"),
-                ("Lucknow", 26.8467, 80.9462, "India", "south_asia", "LKO"), ("Kochi", 9.9312, 76.2673, "India", "south_asia", "COK"),
-                ("Amritsar", 31.6340, 74.8723, "India", "south_asia", "ATQ"), ("Srinagar", 34.0837, 74.7973, "India", "south_asia", "SXR"),
-                ("Paris", 48.8566, 2.3522, "France", "western_europe", "CDG"), ("London", 51.5074, -0.1278, "UK", "western_europe", "LHR"),
-                ("New York", 40.7128, -74.0060, "USA", "north_america", "JFK"), ("Tokyo", 35.6762, 139.6503, "Japan", "east_asia", "NRT"),
-                ("Dubai", 25.2048, 55.2708, "UAE", "middle_east", "DXB"), ("Singapore", 1.3521, 103.8198, "Singapore", "southeast_asia", "SIN"),
-                ("Bangkok", 13.7563, 100.5018, "Thailand", "southeast_asia", "BKK"), ("Bali", -8.4095, 115.1889, "Indonesia", "southeast_asia", "DPS"),
-                ("Sydney", -33.8688, 151.2093, "Australia", "australia", "SYD"), ("Rome", 41.9028, 12.4964, "Italy", "western_europe", "FCO"),
-                ("Maldives", 3.2028, 73.2207, "Maldives", "south_asia", "MLE"), ("Phuket", 7.8804, 98.3923, "Thailand", "southeast_asia", "HKT"),
-            ]
-            cursor.executemany("INSERT OR IGNORE INTO locations (name, lat, lng, country, region, airport_code) VALUES (?, ?, ?, ?, ?, ?)", locations)
-            self.conn.commit()
+        self.pool = db_pool.get_pool(database.DB_PATH)
+        self.autocomplete = autocomplete.PrefixIndex.load(self.pool.connection())
     
     def get_user(self, email, password):
-        cursor = self.conn.cursor()
+        cursor = self.pool.connection().cursor()
         pwd_hash = hashlib.sha256(password.encode()).hexdigest()
         cursor.execute("SELECT * FROM users WHERE email=? AND password=?", (email, pwd_hash))
         return cursor.fetchone()
     
     def create_user(self, name, email, phone, password):
-        cursor = self.conn.cursor()
         pwd_hash = hashlib.sha256(password.encode()).hexdigest()
         try:
-            cursor.execute("INSERT INTO users (name, email, phone, password) VALUES (?, ?, ?, ?)", (name, email, phone, pwd_hash))
-            self.conn.commit()
+            self.pool.write(lambda conn: conn.execute("INSERT INTO users (name, email, phone, password) VALUES (?, ?, ?, ?)", (name, email, phone, pwd_hash)))
             return True
         except sqlite3.IntegrityError:
             return False
     
     def get_location(self, name):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM locations WHERE LOWER(name) LIKE ?", (f"%{name.lower()}%",))
-        return cursor.fetchone()
+        return location_index.find_location(self.pool.connection(), name)
     
     def search_locations(self, query):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT name, country, airport_code FROM locations WHERE LOWER(name) LIKE ? OR LOWER(airport_code) LIKE ? ORDER BY name LIMIT 6", 
-                      (f"{query.lower()}%", f"{query.lower()}%"))
-        return cursor.fetchall()
+        return self.autocomplete.search(query)
     
     def add_booking(self, user_id, booking_type, origin, dest, travelers, cost):
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, total_cost) VALUES (?, ?, ?, ?, ?, ?)",
-                      (user_id, booking_type, origin, dest, travelers, cost))
-        self.conn.commit()
-    
-    def get_user_bookings(self, user_id):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM bookings WHERE user_id=? ORDER BY created_at DESC", (user_id,))
-        return cursor.fetchall()
-    
-    def update_points(self, user_id, points):
-        cursor = self.conn.cursor()
-        cursor.execute("UPDATE users SET points = points + ? WHERE id = ?", (points, user_id))
-        self.conn.commit()
-    
-    def get_all_users(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, name, email, phone, points, created_at FROM users ORDER BY created_at DESC")
-        return cursor.fetchall()
+        """Booking plus its reward points in one transaction, returns the points earned"""
+        return bookings.book(self.pool, user_id, booking_type, origin, dest, travelers, cost)["points"]
+    
+    def get_user_bookings(self, user_id, after=None):
+        """One page of history newest first and the cursor for the next page (None on the last)"""
+        return bookings.history(self.pool.connection(), user_id, after)
+    
+    def get_all_users(self, after=None, search=""):
+        """One page of users newest first and the cursor for the next page (None on the last)"""
+        return admin_lists.users_page(self.pool.connection(), after, search)
+    
+    def get_all_bookings(self, after=None, search="", booking_type=None):
+        """One page of bookings newest first and the cursor for the next page (None on the last)"""
+        return admin_lists.bookings_page(self.pool.connection(), after, search, booking_type)
     
     def get_stats(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM bookings")
-        total_bookings = cursor.fetchone()[0]
-        cursor.execute("SELECT COALESCE(SUM(total_cost), 0) FROM bookings")
-        total_revenue = cursor.fetchone()[0]
-        return {"total_users": total_users, "total_bookings": total_bookings, "total_revenue": total_revenue}
+        """Totals, per-type and weekly rollups and the top routes, all read from the rollup tables"""
+        conn = self.pool.connection()
+        return dict(analytics.totals(conn), by_type=analytics.by_type(conn), weeks=analytics.series(conn, "week", 8),
+                    routes=analytics.top_routes(conn, 5))
     
     def delete_user(self, user_id):
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM bookings WHERE user_id = ?", (user_id,))
-        cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        self.conn.commit()
+        def delete(conn):
+            conn.execute("DELETE FROM bookings WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        self.pool.write(delete)
 
 
 # ============== LOCATION SERVICE ==============
@@ -134,95 +93,67 @@ class LocationService:
     
     def geocode(self, query):
         loc = self.db.get_location(query)
-        if loc:
-            return {"name": loc[1], "lat": loc[2], "lng": loc[3], "country": loc[4], "code": loc[6] if len(loc) > 6 else ""}
-        try:
-            url = "https://nominatim.openstreetmap.org/search"
-            response = requests.get(url, params={"q": query, "format": "json", "limit": 1}, headers={"User-Agent": "TravelEase/1.0"}, timeout=10)
-            data = response.json()
-            if data:
-                parts = data[0].get("display_name", "").split(", ")
-                return {"name": query.title(), "lat": float(data[0]["lat"]), "lng": float(data[0]["lon"]), "country": parts[-1] if parts else "Unknown", "code": ""}
-        except:
-            pass
-        return None
+        if not loc:
+            # Nominatim hits and misses are cached, hits are promoted into locations and read back with their id
+            result = geocode_cache.get_cache(self.db.pool).resolve(query)
+            if result:
+                self.db.autocomplete.refresh(self.db.pool.connection())
+            loc = self.db.get_location(query) if result else None
+            if not loc:
+                return spatial_index.with_airport(self.db.pool.connection(), result)
+        # Towns without an airport of their own show the nearest one
+        return spatial_index.with_airport(self.db.pool.connection(), {"id": loc[0], "name": loc[1], "lat": loc[2], "lng": loc[3],
+                                                                      "country": loc[4], "code": loc[6]})
     
     def calculate_distance(self, lat1, lng1, lat2, lng2):
-        R = 6371
-        lat1_rad, lat2_rad = math.radians(lat1), math.radians(lat2)
-        delta_lat, delta_lng = math.radians(lat2 - lat1), math.radians(lng2 - lng1)
-        a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng/2)**2
-        return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        return geo.distance(lat1, lng1, lat2, lng2)
+    
+    def resolve(self, queries):
+        """Geocode queries concurrently -> (locations, {query: failure reason})"""
+        return routing.resolve_places(self.geocode, queries)
     
     def get_route_info(self, origin, dest):
-        origin_loc, dest_loc = self.geocode(origin), self.geocode(dest)
+        """(route, {}) or (None, {place: reason})"""
+        (origin_loc, dest_loc), failures = self.resolve([origin, dest])
+        return self.route_between(origin_loc, dest_loc), failures
+    
+    def route_between(self, origin_loc, dest_loc):
+        """Route dict for two geocoded locations, None if either is missing"""
         if not origin_loc or not dest_loc:
             return None
-        distance = self.calculate_distance(origin_loc["lat"], origin_loc["lng"], dest_loc["lat"], dest_loc["lng"]) * 1.3
+        distance = distance_matrix.get_matrix(self.db.pool).road(origin_loc, dest_loc)
         return {"origin": origin_loc, "destination": dest_loc, "distance_km": round(distance, 1)}
 
 
 # ============== PRICING ENGINE ==============
 class PricingEngine:
-    def __init__(self):
-        self.cost_index = {"south_asia": 1.0, "southeast_asia": 1.2, "east_asia": 2.5, "middle_east": 2.0, "western_europe": 3.5, "north_america": 3.0, "australia": 3.2}
+    @property
+    def cost_index(self):
+        return pricing.table().cost_index
     
     def get_region(self, country):
-        regions = {"south_asia": ["India", "Nepal", "Bangladesh", "Sri Lanka", "Maldives"], "southeast_asia": ["Thailand", "Vietnam", "Indonesia", "Malaysia", "Singapore"],
-                   "east_asia": ["Japan", "South Korea"], "middle_east": ["UAE", "Saudi Arabia"], "western_europe": ["UK", "France", "Germany", "Italy"],
-                   "north_america": ["USA", "Canada"], "australia": ["Australia", "New Zealand"]}
-        for region, countries in regions.items():
-            if country in countries:
-                return region
-        return "south_asia"
-    
-    def calculate_prices(self, distance, origin_country, dest_country, adults, children, nights):
-        travelers = adults + children
-        avg_index = (self.cost_index.get(self.get_region(origin_country), 1) + self.cost_index.get(self.get_region(dest_country), 1)) / 2
-        is_intl = origin_country != dest_country
-        
-        flight_base = 5 * distance * avg_index * (1.5 if is_intl else 1)
-        flight_eco = max(2500, min(int(flight_base * 0.8), 150000))
-        
-        trains, buses, cabs = [], [], []
-        if not is_intl and distance < 2000:
-            train_base = 0.8 * distance * avg_index
-            trains = [{"type": "Sleeper", "price": max(250, int(train_base * 0.6))}, {"type": "AC 3-Tier", "price": max(500, int(train_base))},
-                     {"type": "AC 2-Tier", "price": max(800, int(train_base * 1.5))}, {"type": "AC First", "price": max(1200, int(train_base * 2.5))}]
-        if not is_intl and distance < 1200:
-            bus_base = 0.5 * distance * avg_index
-            buses = [{"type": "Non-AC Seater", "price": max(200, int(bus_base * 0.5))}, {"type": "AC Seater", "price": max(350, int(bus_base * 0.8))},
-                    {"type": "AC Sleeper", "price": max(500, int(bus_base * 1.2))}, {"type": "Volvo Multi-Axle", "price": max(700, int(bus_base * 1.8))}]
-        
-        cab_base = 14 * distance * self.cost_index.get(self.get_region(dest_country), 1)
-        cabs = [{"type": "Sedan (Swift/Etios)", "price": max(800, int(cab_base * 0.7))}, {"type": "SUV (Innova/Ertiga)", "price": max(1200, int(cab_base))},
-               {"type": "Luxury (BMW/Audi)", "price": max(3000, int(cab_base * 2.5))}]
-        
-        dest_idx = self.cost_index.get(self.get_region(dest_country), 1)
-        hotels = {"budget": int(900 * dest_idx), "mid": int(3500 * dest_idx), "luxury": int(15000 * dest_idx)}
-        
-        rooms = max(1, (travelers + 1) // 2)
-        packages = []
-        cheap = buses[0]["price"] if buses else (trains[0]["price"] if trains else flight_eco)
-        packages.append({"name": "💰 Budget Saver", "total": (cheap * travelers * 2) + (hotels["budget"] * nights * rooms) + (600 * nights * travelers), "color": "#10B981"})
-        packages.append({"name": "⭐ Comfort Plus", "total": (flight_eco * travelers * 2) + (hotels["mid"] * nights * rooms) + (1800 * nights * travelers), "color": "#0770E3"})
-        packages.append({"name": "👑 Premium Luxury", "total": (flight_eco * 2.5 * travelers * 2) + (hotels["luxury"] * nights * rooms) + (5000 * nights * travelers), "color": "#FF6B00"})
-        for p in packages:
-            p["per_person"] = int(p["total"] // travelers)
-            p["total"] = int(p["total"])
-        
-        return {"flights": [{"type": "Economy", "price": flight_eco}, {"type": "Business", "price": int(flight_eco * 2.5)}],
-                "trains": trains, "buses": buses, "cabs": cabs, "hotels": hotels, "packages": packages}
+        return pricing.get_region(country)
+    
+    def calculate_prices(self, distance, origin_country, dest_country, adults, children, nights, departure=None):
+        # Lazy: the flights/trains/buses/cabs screens price only the mode they show
+        return pricing.quote(distance, origin_country, dest_country, adults, children, nights, pricing.DESKTOP, departure)
 
 
 # ============== AUTOCOMPLETE DROPDOWN ==============
 class AutocompleteEntry(ctk.CTkFrame):
+    DEBOUNCE_MS = 120
+    MAX_ROWS = 6
+    ROW_HEIGHT = 45
+    
     def __init__(self, parent, db, placeholder="", colors=None, font_size=24, **kwargs):
         super().__init__(parent, fg_color="transparent")
         self.db = db
         self.placeholder = placeholder
         self.colors = colors
         self.dropdown = None
+        self.rows = []
+        self._pending = None  # after() id of the scheduled lookup
+        self._seq = 0  # bumped per keystroke, older lookups drop their results
         
         self.entry = ctk.CTkEntry(self, font=ctk.CTkFont(size=font_size, weight="bold"),
                                  fg_color="transparent", border_width=0, placeholder_text=placeholder,
@@ -232,49 +163,77 @@ class AutocompleteEntry(ctk.CTkFrame):
         self.entry.bind("<FocusOut>", lambda e: self.after(200, self.hide_dropdown))
     
     def on_key(self, event):
-        if event.keysym in ("Up", "Down", "Return", "Escape"):
+        if event.keysym in ("Up", "Down", "Return"):
+            return
+        self._seq += 1
+        if self._pending:
+            self.after_cancel(self._pending)
+            self._pending = None
+        if event.keysym == "Escape" or not self.entry.get().strip():
+            self.hide_dropdown()
+            return
+        self._pending = self.after(self.DEBOUNCE_MS, self.lookup, self._seq)
+    
+    def lookup(self, seq):
+        self._pending = None
+        if seq != self._seq:
             return
         query = self.entry.get().strip()
-        if query:
+        if query and query != query.title():
             # Auto capitalize
             pos = self.entry.index(ctk.INSERT)
             self.entry.delete(0, "end")
             self.entry.insert(0, query.title())
             self.entry.icursor(pos)
-        if len(query) >= 1:
-            results = self.db.search_locations(query)
-            if results:
-                self.show_dropdown(results)
-            else:
-                self.hide_dropdown()
+        results = self.db.search_locations(query) if query else []
+        if seq != self._seq:
+            return  # a newer keystroke arrived while searching
+        if results:
+            self.show_dropdown(results)
         else:
             self.hide_dropdown()
     
-    def show_dropdown(self, results):
-        self.hide_dropdown()
+    def build_dropdown(self):
         self.dropdown = ctk.CTkToplevel(self)
         self.dropdown.wm_overrideredirect(True)
         self.dropdown.attributes("-topmost", True)
-        x, y = self.entry.winfo_rootx(), self.entry.winfo_rooty() + self.entry.winfo_height()
-        self.dropdown.geometry(f"280x{min(len(results)*45, 270)}+{x}+{y}")
-        
-        for name, country, code in results:
-            btn = ctk.CTkButton(self.dropdown, text=f"{name} [{code}], {country}", anchor="w",
+        self.dropdown.withdraw()
+        for _ in range(self.MAX_ROWS):
+            btn = ctk.CTkButton(self.dropdown, text="", anchor="w",
                                font=ctk.CTkFont(size=12), fg_color=self.colors["white"],
                                text_color=self.colors["text"], hover_color=self.colors["light_blue"],
-                               corner_radius=0, height=45,
-                               command=lambda n=name: self.select(n))
-            btn.pack(fill="x")
+                               corner_radius=0, height=self.ROW_HEIGHT)
+            self.rows.append(btn)
+    
+    def show_dropdown(self, results):
+        if self.dropdown is None:
+            self.build_dropdown()
+        results = results[:self.MAX_ROWS]
+        for btn, (name, country, code) in zip(self.rows, results):
+            btn.configure(text=f"{name} [{code}], {country}", command=lambda n=name: self.select(n))
+        # Re-pack only when the visible row count changes so rows keep their order
+        if len(results) != self.visible_rows():
+            for btn in self.rows:
+                btn.pack_forget()
+            for btn in self.rows[:len(results)]:
+                btn.pack(fill="x")
+        x, y = self.entry.winfo_rootx(), self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.dropdown.geometry(f"280x{len(results) * self.ROW_HEIGHT}+{x}+{y}")
+        self.dropdown.deiconify()
+        self.dropdown.lift()
+    
+    def visible_rows(self):
+        return sum(1 for btn in self.rows if btn.winfo_manager())
     
     def select(self, name):
+        self._seq += 1
         self.entry.delete(0, "end")
         self.entry.insert(0, name)
         self.hide_dropdown()
     
     def hide_dropdown(self):
-        if self.dropdown:
-            self.dropdown.destroy()
-            self.dropdown = None
+        if self.dropdown is not None and self.dropdown.winfo_exists():
+            self.dropdown.withdraw()
     
     def get(self):
         return self.entry.get()
@@ -286,6 +245,91 @@ class AutocompleteEntry(ctk.CTkFrame):
         self.entry.insert(idx, text)
 
 
+# ============== VIRTUAL LIST ==============
+class VirtualList(ctk.CTkFrame):
+    """Scrolling list with widgets only for the rows in view, reused as it scrolls.
+
+    fetch(after) returns (records, cursor) a page at a time; the next page is fetched as the end comes into view.
+    make_row(parent) builds one empty row, fill_row(row, record) shows a record in it.
+    """
+    OVERSCAN = 2  # spare rows kept under the visible ones
+    
+    def __init__(self, parent, fetch, make_row, fill_row, row_height=48, height=420, empty_text="Nothing here", **kwargs):
+        super().__init__(parent, height=height, **kwargs)
+        self.fetch, self.make_row, self.fill_row = fetch, make_row, fill_row
+        self.row_height = row_height
+        self.records, self.cursor, self.done = [], None, False
+        self.top = 0  # pixels scrolled
+        self.rows = []
+        
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent", height=height)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.empty = ctk.CTkLabel(self.viewport, text=empty_text, text_color="gray50")
+        self.viewport.bind("<Configure>", lambda e: self.refresh())
+        self._bind_wheel(self.viewport)
+        self.reload()
+    
+    def reload(self, fetch=None):
+        """Start over from the first page, with a new fetch if the filters changed"""
+        self.fetch = fetch or self.fetch
+        self.records, self.cursor, self.done, self.top = [], None, False, 0
+        self._load_more()
+        self.refresh()
+    
+    def _load_more(self):
+        records, self.cursor = self.fetch(self.cursor)
+        self.records.extend(records)
+        self.done = self.cursor is None
+    
+    def _bind_wheel(self, widget):
+        # "break" keeps the enclosing scrollable page from scrolling along
+        widget.bind("<MouseWheel>", lambda e: (self.scroll(-e.delta / 120 * self.row_height), "break")[1], add="+")
+        widget.bind("<Button-4>", lambda e: (self.scroll(-self.row_height), "break")[1], add="+")
+        widget.bind("<Button-5>", lambda e: (self.scroll(self.row_height), "break")[1], add="+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+    
+    def scroll(self, pixels):
+        self.top += int(pixels)
+        self.refresh()
+    
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.records) * self.row_height)
+        elif args[0] == "scroll":
+            step = self.viewport.winfo_height() if args[2] == "pages" else self.row_height
+            self.top += int(args[1]) * step
+        self.refresh()
+    
+    def refresh(self):
+        view = max(self.viewport.winfo_height(), self.row_height)
+        needed = view // self.row_height + self.OVERSCAN
+        while len(self.rows) < needed:
+            row = self.make_row(self.viewport)
+            self._bind_wheel(row)
+            self.rows.append(row)
+        while not self.done and (self.top + view) // self.row_height + needed >= len(self.records):
+            self._load_more()
+        total = len(self.records) * self.row_height
+        self.top = max(0, min(self.top, total - view))
+        first, offset = divmod(self.top, self.row_height)
+        for i, row in enumerate(self.rows):
+            index = first + i
+            if index < len(self.records) and i < needed:
+                self.fill_row(row, self.records[index])
+                row.place(x=0, y=i * self.row_height - offset, relwidth=1, height=self.row_height - 4)
+            else:
+                row.place_forget()
+        if self.records:
+            self.empty.place_forget()
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + view) / total))
+        else:
+            self.empty.place(relx=0.5, rely=0.5, anchor="center")
+            self.scrollbar.set(0, 1)
+
+
 # ============== MAIN APPLICATION ==============
 class TravelEaseApp(ctk.CTk):
     def __init__(self):
@@ -298,6 +342,8 @@ class TravelEaseApp(ctk.CTk):
         self.location_service = LocationService(self.db)
         self.pricing = PricingEngine()
         self.current_user = None
+        self.executor = background.TkExecutor(self)
+        self.pending = None  # in-flight background search, cancelled when superseded
         
         self.colors = {"primary": "#0770E3", "secondary": "#FF6B00", "accent": "#00A651",
                       "dark": "#1A1A2E", "light_blue": "#E8F4FD", "white": "#FFFFFF",
@@ -311,8 +357,14 @@ class TravelEaseApp(ctk.CTk):
         self.ret_date = None
         
         self.configure(fg_color=self.colors["gray"])
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.build_ui()
     
+    def on_close(self):
+        self.cancel_pending()
+        self.executor.shutdown()
+        self.destroy()
+    
     def build_ui(self):
         self.build_header()
         self.content = ctk.CTkScrollableFrame(self, fg_color=self.colors["gray"])
@@ -848,211 +900,128 @@ class TravelEaseApp(ctk.CTk):
                 messagebox.showerror("Error", "Enter origin and destination")
                 return
             
-            route = self.location_service.get_route_info(orig, dest)
-            if not route:
-                messagebox.showerror("Error", f"Could not find: {orig} or {dest}")
-                return
             
-            prices = self.pricing.calculate_prices(route["distance_km"], route["origin"]["country"],
-                                                   route["destination"]["country"], 
-                                                   self.adults_var.get(), self.children_var.get(), 3)
+            def done(locs):
+                route, prices = self.get_quote(*locs, self.adults_var.get(), self.children_var.get(), 3, self.dep_date.date())
+                if not route:
+                    messagebox.showerror("Error", f"Could not find: {orig} or {dest}")
+                    return
+                if tab == "flights":
+                    self.show_flight_results(route, prices)
+                elif tab == "trains":
+                    self.show_train_results(route, prices)
+                elif tab == "buses":
+                    self.show_bus_results(route, prices)
+                else:
+                    self.show_results(route, prices, self.adults_var.get() + self.children_var.get(), 3, self.tab_results)
             
-            if tab == "flights":
-                self.show_flight_results(route, prices)
-            elif tab == "trains":
-                self.show_train_results(route, prices)
-            elif tab == "buses":
-                self.show_bus_results(route, prices)
+            self.run_search(f"{orig} → {dest}", [orig, dest], done)
+    
+    def get_quote(self, origin_loc, dest_loc, adults, children, nights, departure=None):
+        """(route, prices) for two geocoded locations and departure (a date), from the shared quote cache when both have ids"""
+        if not origin_loc or not dest_loc:
+            return None, None
+        cache = quote_cache.get_cache(self.db.pool)
+        key = None
+        if origin_loc.get("id") and dest_loc.get("id"):
+            key = ("desktop", origin_loc["id"], dest_loc["id"], adults, children, nights,
+                   departure.isoformat() if departure else None)
+            cached = cache.get(key)
+            if cached:
+                return cached
+        route = self.location_service.route_between(origin_loc, dest_loc)
+        prices = self.pricing.calculate_prices(route["distance_km"], route["origin"]["country"],
+                                               route["destination"]["country"], adults, children, nights, departure)
+        if key:
+            cache.put(key, (route, prices))
+        return route, prices
+    
+    def get_fare_calendar(self, route, start, mode="flights"):
+        """Fare calendar for one mode on the route from start, cached per route like quotes"""
+        origin, dest = route["origin"], route["destination"]
+        key = ("desktop-calendar", origin.get("id"), dest.get("id"), mode, start.isoformat(), pricing.WINDOW_DAYS)
+        cache = quote_cache.get_cache(self.db.pool)
+        calendar = cache.get(key) if key[1] and key[2] else None
+        if calendar is None:
+            calendar = pricing.fare_calendar(route["distance_km"], origin["country"], dest["country"], start,
+                                             profile=pricing.DESKTOP, mode=mode)
+            if key[1] and key[2] and calendar is not None:
+                cache.put(key, calendar)
+        return calendar
+    
+    def show_fare_calendar(self, route):
+        """Scrollable strip of economy fares around the departure date; clicking a day reprices the results for it"""
+        calendar = self.get_fare_calendar(route, pricing.calendar_start(self.dep_date.date()), "flights")
+        fares = calendar["lowest"].tolist()
+        cheapest = min(fares)
+        
+        ctk.CTkLabel(self.tab_results, text="📅 Fare Calendar (economy, per person)", font=ctk.CTkFont(size=16, weight="bold"),
+                    text_color=self.colors["text"]).pack(anchor="w", pady=(10, 5))
+        strip = ctk.CTkScrollableFrame(self.tab_results, orientation="horizontal", height=70, fg_color="transparent")
+        strip.pack(fill="x", pady=(0, 10))
+        for day, fare in zip(calendar["dates"].tolist(), fares):
+            selected = day == self.dep_date.date()
+            cell = ctk.CTkFrame(strip, fg_color=self.colors["primary"] if selected else self.colors["white"], corner_radius=8)
+            cell.pack(side="left", padx=3)
+            color = self.colors["white"] if selected else (self.colors["accent"] if fare == cheapest else self.colors["text"])
+            for text, size in ((day.strftime("%a %d %b"), 10), (f"₹{fare:,}", 12)):
+                lbl = ctk.CTkLabel(cell, text=text, font=ctk.CTkFont(size=size, weight="bold" if size == 12 else "normal"),
+                                  text_color=color)
+                lbl.pack(padx=8)
+                lbl.bind("<Button-1>", lambda e, d=day: self.set_dep_date(d, route))
+    
+    def set_dep_date(self, day, route):
+        """Make day the departure date and reprice the shown flights for it"""
+        self.dep_date = datetime(day.year, day.month, day.day)
+        if hasattr(self, 'date_lbl'):
+            self.date_lbl.configure(text=self.dep_date.strftime("%d %b'%y"))
+        route, prices = self.get_quote(route["origin"], route["destination"], self.adults_var.get(), self.children_var.get(),
+                                       3, day)
+        self.show_flight_results(route, prices)
+    
+    def run_search(self, label, queries, on_done):
+        """Geocode queries concurrently off the Tk thread, with a cancellable progress row meanwhile"""
+        self.cancel_pending()
+        for w in self.tab_results.winfo_children():
+            w.destroy()
+        row = ctk.CTkFrame(self.tab_results, fg_color=self.colors["white"], corner_radius=12)
+        row.pack(fill="x", pady=5)
+        ctk.CTkLabel(row, text=f"⏳ Searching {label}...", font=ctk.CTkFont(size=14),
+                    text_color=self.colors["text"]).pack(side="left", padx=20, pady=15)
+        ctk.CTkButton(row, text="Cancel", font=ctk.CTkFont(size=11), fg_color=self.colors["gray"],
+                     text_color=self.colors["text"], corner_radius=15, width=80, height=30,
+                     command=self.cancel_search).pack(side="right", padx=20)
+        
+        def finish(result):
+            locs, failures = result
+            self.pending = None
+            if not row.winfo_exists():
+                return
+            row.destroy()
+            if failures:
+                messagebox.showerror("Error", f"Could not find: {routing.describe_failures(failures)}")
             else:
-                self.show_results(route, prices, self.adults_var.get() + self.children_var.get(), 3)
-        self.clear_content()
-        
-        # Hero with search
-        hero = ctk.CTkFrame(self.content, fg_color=self.colors["primary"], corner_radius=0, height=380)
-        hero.pack(fill="x")
-        hero.pack_propagate(False)
-        
-        # Search card
-        card = ctk.CTkFrame(hero, fg_color=self.colors["white"], corner_radius=20)
-        card.pack(padx=40, pady=25, fill="x")
-        
-        # Trip type row
-        trip_row = ctk.CTkFrame(card, fg_color="transparent")
-        trip_row.pack(fill="x", padx=25, pady=(20, 10))
-        
-        ctk.CTkRadioButton(trip_row, text="One Way", variable=self.trip_type, value="oneway",
-                          font=ctk.CTkFont(size=13), fg_color=self.colors["primary"]).pack(side="left", padx=10)
-        ctk.CTkRadioButton(trip_row, text="Round Trip", variable=self.trip_type, value="round",
-                          font=ctk.CTkFont(size=13), fg_color=self.colors["primary"]).pack(side="left", padx=10)
-        ctk.CTkLabel(trip_row, text="📢 Book round trip to save more!",
-                    font=ctk.CTkFont(size=12), text_color=self.colors["accent"]).pack(side="right", padx=15)
-        
-        # Main fields row
-        fields = ctk.CTkFrame(card, fg_color="transparent")
-        fields.pack(fill="x", padx=15, pady=10)
-        
-        # FROM
-        from_box = ctk.CTkFrame(fields, fg_color=self.colors["gray"], corner_radius=15)
-        from_box.pack(side="left", fill="both", expand=True, padx=5)
-        ctk.CTkLabel(from_box, text="FROM", font=ctk.CTkFont(size=10, weight="bold"),
-                    text_color=self.colors["text_light"]).pack(anchor="w", padx=15, pady=(12, 0))
-        self.from_entry = AutocompleteEntry(from_box, self.db, "Delhi", self.colors)
-        self.from_entry.pack(anchor="w", padx=15)
-        self.from_label = ctk.CTkLabel(from_box, text="[DEL] Indira Gandhi Intl Airport",
-                                       font=ctk.CTkFont(size=9), text_color=self.colors["text_light"])
-        self.from_label.pack(anchor="w", padx=15, pady=(0, 12))
-        
-        # Swap
-        ctk.CTkButton(fields, text="⇄", font=ctk.CTkFont(size=16), fg_color=self.colors["primary"],
-                     width=40, height=40, corner_radius=20, command=self.swap_cities).pack(side="left", padx=5)
-        
-        # TO
-        to_box = ctk.CTkFrame(fields, fg_color=self.colors["gray"], corner_radius=15)
-        to_box.pack(side="left", fill="both", expand=True, padx=5)
-        ctk.CTkLabel(to_box, text="TO", font=ctk.CTkFont(size=10, weight="bold"),
-                    text_color=self.colors["text_light"]).pack(anchor="w", padx=15, pady=(12, 0))
-        self.to_entry = AutocompleteEntry(to_box, self.db, "Mumbai", self.colors)
-        self.to_entry.pack(anchor="w", padx=15)
-        self.to_label = ctk.CTkLabel(to_box, text="[BOM] Chhatrapati Shivaji Intl Airport",
-                                     font=ctk.CTkFont(size=9), text_color=self.colors["text_light"])
-        self.to_label.pack(anchor="w", padx=15, pady=(0, 12))
-        
-        # Departure
-        dep_box = ctk.CTkFrame(fields, fg_color=self.colors["gray"], corner_radius=15, cursor="hand2")
-        dep_box.pack(side="left", fill="y", padx=5)
-        ctk.CTkLabel(dep_box, text="DEPARTURE", font=ctk.CTkFont(size=10, weight="bold"),
-                    text_color=self.colors["text_light"]).pack(anchor="w", padx=15, pady=(12, 0))
-        self.dep_day_lbl = ctk.CTkLabel(dep_box, text=self.dep_date.strftime("%d"),
-                                        font=ctk.CTkFont(size=26, weight="bold"), text_color=self.colors["text"])
-        self.dep_day_lbl.pack(anchor="w", padx=15)
-        self.dep_month_lbl = ctk.CTkLabel(dep_box, text=self.dep_date.strftime("%b'%y, %A"),
-                                          font=ctk.CTkFont(size=9), text_color=self.colors["text_light"])
-        self.dep_month_lbl.pack(anchor="w", padx=15, pady=(0, 12))
-        dep_box.bind("<Button-1>", lambda e: self.pick_date("dep"))
-        
-        # Return
-        ret_box = ctk.CTkFrame(fields, fg_color=self.colors["gray"], corner_radius=15, cursor="hand2")
-        ret_box.pack(side="left", fill="y", padx=5)
-        ctk.CTkLabel(ret_box, text="RETURN", font=ctk.CTkFont(size=10, weight="bold"),
-                    text_color=self.colors["text_light"]).pack(anchor="w", padx=15, pady=(12, 0))
-        self.ret_lbl = ctk.CTkLabel(ret_box, text="Book round trip\nto save more",
-                                    font=ctk.CTkFont(size=10), text_color=self.colors["accent"])
-        self.ret_lbl.pack(anchor="w", padx=15, pady=12)
-        ret_box.bind("<Button-1>", lambda e: self.pick_date("ret"))
-
+                on_done(locs)
         
-        # Travellers
-        trav_box = ctk.CTkFrame(fields, fg_color=self.colors["gray"], corner_radius=15, cursor="hand2")
-        trav_box.pack(side="left", fill="y", padx=5)
-        ctk.CTkLabel(trav_box, text="TRAVELLERS & CLASS", font=ctk.CTkFont(size=10, weight="bold"),
-                    text_color=self.colors["text_light"]).pack(anchor="w", padx=15, pady=(12, 0))
-        self.trav_count_lbl = ctk.CTkLabel(trav_box, text="1",
-                                           font=ctk.CTkFont(size=26, weight="bold"), text_color=self.colors["text"])
-        self.trav_count_lbl.pack(anchor="w", padx=15)
-        ctk.CTkLabel(trav_box, text="Traveller, Economy",
-                    font=ctk.CTkFont(size=9), text_color=self.colors["text_light"]).pack(anchor="w", padx=15, pady=(0, 12))
-        trav_box.bind("<Button-1>", lambda e: self.pick_travellers())
-        
-        # Special fares
-        fares_row = ctk.CTkFrame(card, fg_color="transparent")
-        fares_row.pack(fill="x", padx=25, pady=8)
-        ctk.CTkLabel(fares_row, text="Special Fares:", font=ctk.CTkFont(size=11),
-                    text_color=self.colors["text_light"]).pack(side="left")
-        for fare in ["Regular", "Student", "Senior Citizen", "Armed Forces", "Doctor/Nurse"]:
-            ctk.CTkButton(fares_row, text=fare, font=ctk.CTkFont(size=10), fg_color=self.colors["gray"],
-                         text_color=self.colors["text"], hover_color=self.colors["light_blue"],
-                         corner_radius=15, height=28, width=95).pack(side="left", padx=4)
+        def failed(error):
+            self.pending = None
+            if row.winfo_exists():
+                row.destroy()
+                messagebox.showerror("Error", f"Search failed: {error}")
         
-        # Search button
-        ctk.CTkButton(card, text="SEARCH", font=ctk.CTkFont(size=16, weight="bold"),
-                     fg_color=self.colors["secondary"], hover_color="#E55A00",
-                     corner_radius=25, width=220, height=50, command=self.search).pack(pady=18)
-        
-        # Popular routes
-        pop_frame = ctk.CTkFrame(self.content, fg_color="transparent")
-        pop_frame.pack(fill="x", padx=40, pady=20)
-        ctk.CTkLabel(pop_frame, text="🔥 Popular Routes", font=ctk.CTkFont(size=18, weight="bold"),
-                    text_color=self.colors["text"]).pack(anchor="w", pady=(0, 15))
-        
-        routes_row = ctk.CTkFrame(pop_frame, fg_color="transparent")
-        routes_row.pack(fill="x")
-        popular = [("Delhi", "Mumbai", "₹4,299"), ("Mumbai", "Goa", "₹3,599"),
-                  ("Bangalore", "Delhi", "₹5,199"), ("Delhi", "Dubai", "₹15,999")]
-        for orig, dest, price in popular:
-            c = ctk.CTkFrame(routes_row, fg_color=self.colors["white"], corner_radius=15, cursor="hand2")
-            c.pack(side="left", fill="both", expand=True, padx=8)
-            ctk.CTkLabel(c, text=f"{orig} → {dest}", font=ctk.CTkFont(size=14, weight="bold"),
-                        text_color=self.colors["text"]).pack(pady=(18, 5))
-            ctk.CTkLabel(c, text=f"Starting {price}", font=ctk.CTkFont(size=12),
-                        text_color=self.colors["accent"]).pack(pady=(0, 18))
-            c.bind("<Button-1>", lambda e, o=orig, d=dest: self.quick_search(o, d))
-        
-        # Offers section
-        offers_frame = ctk.CTkFrame(self.content, fg_color="transparent")
-        offers_frame.pack(fill="x", padx=40, pady=20)
-        ctk.CTkLabel(offers_frame, text="🎉 Exclusive Offers", font=ctk.CTkFont(size=18, weight="bold"),
-                    text_color=self.colors["text"]).pack(anchor="w", pady=(0, 15))
-        
-        offers_row = ctk.CTkFrame(offers_frame, fg_color="transparent")
-        offers_row.pack(fill="x")
-        offers = [("🏖️ Goa Package", "3N/4D from ₹8,999", "GOA30", "30% OFF"),
-                 ("🏔️ Manali Trip", "4N/5D from ₹12,999", "MANALI25", "25% OFF"),
-                 ("✈️ Dubai Flights", "From ₹15,999", "FLY20", "20% OFF")]
-        for title, desc, code, off in offers:
-            c = ctk.CTkFrame(offers_row, fg_color=self.colors["white"], corner_radius=15)
-            c.pack(side="left", fill="both", expand=True, padx=8)
-            ctk.CTkLabel(c, text=off, font=ctk.CTkFont(size=11, weight="bold"),
-                        fg_color=self.colors["secondary"], text_color=self.colors["white"],
-                        corner_radius=8).pack(anchor="ne", padx=10, pady=10)
-            ctk.CTkLabel(c, text=title, font=ctk.CTkFont(size=14, weight="bold"),
-                        text_color=self.colors["text"]).pack(anchor="w", padx=15)
-            ctk.CTkLabel(c, text=desc, font=ctk.CTkFont(size=12),
-                        text_color=self.colors["primary"]).pack(anchor="w", padx=15, pady=3)
-            ctk.CTkLabel(c, text=f"Code: {code}", font=ctk.CTkFont(size=11, weight="bold"),
-                        text_color=self.colors["text_light"]).pack(anchor="w", padx=15, pady=(0, 15))
-        
-        # Results area
-        self.results_frame = ctk.CTkFrame(self.content, fg_color="transparent")
-        self.results_frame.pack(fill="both", expand=True, padx=40, pady=10)
-
+        self.pending = self.executor.submit(self.location_service.resolve, queries, on_done=finish, on_error=failed)
     
-    def swap_cities(self):
-        f, t = self.from_entry.get(), self.to_entry.get()
-        self.from_entry.delete(0, "end")
-        self.to_entry.delete(0, "end")
-        self.from_entry.insert(0, t)
-        self.to_entry.insert(0, f)
+    def cancel_pending(self):
+        if self.pending:
+            self.pending.cancel()
+            self.pending = None
     
-    def pick_date(self, dtype):
-        dlg = ctk.CTkToplevel(self)
-        dlg.title("Select Date")
-        dlg.geometry("320x220")
-        dlg.transient(self)
-        dlg.grab_set()
-        
-        ctk.CTkLabel(dlg, text=f"Select {'Departure' if dtype=='dep' else 'Return'} Date",
-                    font=ctk.CTkFont(size=14, weight="bold")).pack(pady=20)
-        
-        row = ctk.CTkFrame(dlg, fg_color="transparent")
-        row.pack(pady=10)
-        day_var, mon_var, yr_var = ctk.StringVar(value="15"), ctk.StringVar(value="Jan"), ctk.StringVar(value="2026")
-        ctk.CTkComboBox(row, values=[str(i) for i in range(1, 32)], variable=day_var, width=65).pack(side="left", padx=5)
-        ctk.CTkComboBox(row, values=["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"],
-                       variable=mon_var, width=75).pack(side="left", padx=5)
-        ctk.CTkComboBox(row, values=["2026","2027"], variable=yr_var, width=75).pack(side="left", padx=5)
-        
-        def apply():
-            txt = f"{day_var.get()} {mon_var.get()}'{yr_var.get()[-2:]}"
-            if dtype == "dep":
-                self.dep_day_lbl.configure(text=day_var.get())
-                self.dep_month_lbl.configure(text=f"{mon_var.get()}'{yr_var.get()[-2:]}")
-            else:
-                self.ret_lbl.configure(text=txt)
-                self.trip_type.set("round")
-            dlg.destroy()
-        
-        ctk.CTkButton(dlg, text="Select", fg_color=self.colors["primary"], corner_radius=20,
-                     width=120, command=apply).pack(pady=20)
+    def cancel_search(self):
+        self.cancel_pending()
+        for w in self.tab_results.winfo_children():
+            w.destroy()
+        ctk.CTkLabel(self.tab_results, text="Search cancelled", font=ctk.CTkFont(size=13),
+                    text_color=self.colors["text_light"]).pack(anchor="w", pady=10)
     
     def pick_date(self):
         """Pick departure date"""
@@ -1126,43 +1095,20 @@ class TravelEaseApp(ctk.CTk):
                      command=lambda: self.children_var.set(self.children_var.get()+1)).pack(side="left", padx=5)
         
         def done():
-            self.trav_count_lbl.configure(text=str(self.adults_var.get() + self.children_var.get()))
+            if hasattr(self, 'tab_trav_lbl'):
+                self.tab_trav_lbl.configure(text=str(self.adults_var.get() + self.children_var.get()))
             dlg.destroy()
         
         ctk.CTkButton(dlg, text="Done", fg_color=self.colors["secondary"], corner_radius=20,
                      width=140, command=done).pack(pady=25)
     
-    def quick_search(self, orig, dest):
-        self.from_entry.delete(0, "end")
-        self.from_entry.insert(0, orig)
-        self.to_entry.delete(0, "end")
-        self.to_entry.insert(0, dest)
-        self.search()
-
-    
-    def search(self):
-        orig, dest = self.from_entry.get().strip(), self.to_entry.get().strip()
-        if not orig or not dest:
-            messagebox.showerror("Error", "Enter origin and destination")
-            return
-        
-        route = self.location_service.get_route_info(orig, dest)
-        if not route:
-            messagebox.showerror("Error", f"Could not find: {orig} or {dest}")
-            return
-        
-        adults, children = self.adults_var.get(), self.children_var.get()
-        nights = self.nights_var.get()
-        prices = self.pricing.calculate_prices(route["distance_km"], route["origin"]["country"],
-                                               route["destination"]["country"], adults, children, nights)
-        self.show_results(route, prices, adults + children, nights)
-    
-    def show_results(self, route, prices, travelers, nights):
-        for w in self.results_frame.winfo_children():
+    def show_results(self, route, prices, travelers, nights, frame=None):
+        frame = frame or self.tab_results
+        for w in frame.winfo_children():
             w.destroy()
         
         # Route header
-        hdr = ctk.CTkFrame(self.results_frame, fg_color=self.colors["dark"], corner_radius=20)
+        hdr = ctk.CTkFrame(frame, fg_color=self.colors["dark"], corner_radius=20)
         hdr.pack(fill="x", pady=(0, 20))
         hdr_content = ctk.CTkFrame(hdr, fg_color="transparent")
         hdr_content.pack(fill="x", padx=30, pady=25)
@@ -1186,7 +1132,7 @@ class TravelEaseApp(ctk.CTk):
                     text_color=self.colors["white"]).pack(side="left", padx=12)
         
         # Transport options row
-        trans_row = ctk.CTkFrame(self.results_frame, fg_color="transparent")
+        trans_row = ctk.CTkFrame(frame, fg_color="transparent")
         trans_row.pack(fill="x", pady=10)
         
         # Flights
@@ -1247,10 +1193,10 @@ class TravelEaseApp(ctk.CTk):
 
         
         # Packages
-        ctk.CTkLabel(self.results_frame, text="🎁 Complete Packages", font=ctk.CTkFont(size=18, weight="bold"),
+        ctk.CTkLabel(frame, text="🎁 Complete Packages", font=ctk.CTkFont(size=18, weight="bold"),
                     text_color=self.colors["text"]).pack(anchor="w", pady=(20, 12))
         
-        pkg_row = ctk.CTkFrame(self.results_frame, fg_color="transparent")
+        pkg_row = ctk.CTkFrame(frame, fg_color="transparent")
         pkg_row.pack(fill="x")
         
         for pkg in prices["packages"]:
@@ -1265,13 +1211,13 @@ class TravelEaseApp(ctk.CTk):
                         text_color=self.colors["text_light"]).pack(pady=(0, 5))
             ctk.CTkButton(pc, text="Book Now", font=ctk.CTkFont(size=12, weight="bold"),
                          fg_color=self.colors["secondary"], hover_color="#E55A00",
-                         corner_radius=20, width=130, command=lambda p=pkg: self.book(p)).pack(pady=(10, 20))
+                         corner_radius=20, width=130, command=lambda p=pkg: self.book(p, route)).pack(pady=(10, 20))
         
         # Hotels
-        ctk.CTkLabel(self.results_frame, text="🏨 Hotels", font=ctk.CTkFont(size=18, weight="bold"),
+        ctk.CTkLabel(frame, text="🏨 Hotels", font=ctk.CTkFont(size=18, weight="bold"),
                     text_color=self.colors["text"]).pack(anchor="w", pady=(25, 12))
         
-        htl_row = ctk.CTkFrame(self.results_frame, fg_color="transparent")
+        htl_row = ctk.CTkFrame(frame, fg_color="transparent")
         htl_row.pack(fill="x")
         
         hotel_info = [("Budget", "budget", "⭐⭐", "Basic amenities"),
@@ -1289,7 +1235,19 @@ class TravelEaseApp(ctk.CTk):
             ctk.CTkLabel(hc, text=f"₹{prices['hotels'][key]:,}/night", font=ctk.CTkFont(size=16, weight="bold"),
                         text_color=self.colors["primary"]).pack(anchor="w", padx=18, pady=(5, 15))
     
-    def show_flight_results(self, route, prices):
+    def offer_toolbar(self, sorts, sort, filters, view, on_change):
+        """Sort and filter buttons above an offer list; on_change(sort, view) renders the list again, after the click returns"""
+        bar = ctk.CTkFrame(self.tab_results, fg_color="transparent")
+        bar.pack(fill="x", pady=(0, 5))
+        ctk.CTkLabel(bar, text="Sort", font=ctk.CTkFont(size=11), text_color=self.colors["text_light"]).pack(side="left", padx=(0, 5))
+        sort_btn = ctk.CTkSegmentedButton(bar, values=list(sorts), command=lambda label: self.after(0, on_change, sorts[label], view))
+        sort_btn.set(next(label for label, key in sorts.items() if key == sort))
+        sort_btn.pack(side="left")
+        filter_btn = ctk.CTkSegmentedButton(bar, values=list(filters), command=lambda label: self.after(0, on_change, sort, label))
+        filter_btn.set(view)
+        filter_btn.pack(side="right")
+    
+    def show_flight_results(self, route, prices, sort="price", view="Any time"):
         """Show flight-specific results"""
         for w in self.tab_results.winfo_children():
             w.destroy()
@@ -1304,18 +1262,19 @@ class TravelEaseApp(ctk.CTk):
         ctk.CTkLabel(hdr_c, text=f"{route['distance_km']:,.0f} km", font=ctk.CTkFont(size=12),
                     text_color=self.colors["accent"]).pack(side="right")
         
+        self.show_fare_calendar(route)
+        
         # Flight list
         ctk.CTkLabel(self.tab_results, text="Available Flights", font=ctk.CTkFont(size=16, weight="bold"),
                     text_color=self.colors["text"]).pack(anchor="w", pady=(10, 10))
         
-        airlines = [("IndiGo", "6E-2145", "06:00", "08:15", prices["flights"][0]["price"]),
-                   ("Air India", "AI-865", "08:30", "10:45", int(prices["flights"][0]["price"] * 1.1)),
-                   ("SpiceJet", "SG-412", "10:00", "12:20", int(prices["flights"][0]["price"] * 0.95)),
-                   ("Vistara", "UK-945", "14:00", "16:10", int(prices["flights"][0]["price"] * 1.2)),
-                   ("IndiGo", "6E-6721", "18:30", "20:45", int(prices["flights"][0]["price"] * 1.05)),
-                   ("Air India", "AI-502", "21:00", "23:15", prices["flights"][1]["price"])]
+        self.offer_toolbar({"Cheapest": "price", "Earliest": "departure", "Fastest": "duration"}, sort,
+                           offers.DEPARTURE_WINDOWS, view, lambda s, v: self.show_flight_results(route, prices, s, v))
+        shown = offers.select(offers.flight_offers(prices), sort, offers.RESULTS_PAGE, **offers.DEPARTURE_WINDOWS[view])
+        self.show_no_offers(shown)
         
-        for airline, flight_no, dep, arr, price in airlines:
+        for offer in shown:
+            airline, flight_no, dep, arr, price = offer.provider, offer.product, offer.depart, offer.arrive, offer.price
             c = ctk.CTkFrame(self.tab_results, fg_color=self.colors["white"], corner_radius=12)
             c.pack(fill="x", pady=5)
             
@@ -1332,7 +1291,7 @@ class TravelEaseApp(ctk.CTk):
             mid.pack(side="left", expand=True, padx=20)
             ctk.CTkLabel(mid, text=f"{dep}  ✈️  {arr}", font=ctk.CTkFont(size=16, weight="bold"),
                         text_color=self.colors["text"]).pack()
-            ctk.CTkLabel(mid, text="Non-stop • 2h 15m", font=ctk.CTkFont(size=10),
+            ctk.CTkLabel(mid, text=f"Non-stop • {offer.minutes // 60}h {offer.minutes % 60:02d}m", font=ctk.CTkFont(size=10),
                         text_color=self.colors["text_light"]).pack()
             
             # Price & Book
@@ -1344,7 +1303,7 @@ class TravelEaseApp(ctk.CTk):
                          fg_color=self.colors["secondary"], corner_radius=15, width=80, height=30,
                          command=lambda p=price, a=airline: self.book_transport("Flight", a, p)).pack(pady=5)
     
-    def show_train_results(self, route, prices):
+    def show_train_results(self, route, prices, sort="price", view="Any time"):
         """Show train-specific results"""
         for w in self.tab_results.winfo_children():
             w.destroy()
@@ -1365,13 +1324,13 @@ class TravelEaseApp(ctk.CTk):
         ctk.CTkLabel(self.tab_results, text="Available Trains", font=ctk.CTkFont(size=16, weight="bold"),
                     text_color=self.colors["text"]).pack(anchor="w", pady=(10, 10))
         
-        trains = [("Rajdhani Express", "12951", "16:25", "08:15", prices["trains"][3]["price"]),
-                 ("Shatabdi Express", "12009", "06:00", "14:30", prices["trains"][2]["price"]),
-                 ("Duronto Express", "12267", "23:00", "08:45", prices["trains"][2]["price"]),
-                 ("Garib Rath", "12216", "17:30", "06:00", prices["trains"][1]["price"]),
-                 ("Superfast Express", "12137", "22:15", "12:30", prices["trains"][0]["price"])]
+        self.offer_toolbar({"Cheapest": "price", "Earliest": "departure", "Fastest": "duration"}, sort,
+                           offers.DEPARTURE_WINDOWS, view, lambda s, v: self.show_train_results(route, prices, s, v))
+        shown = offers.select(offers.train_offers(prices), sort, offers.RESULTS_PAGE, **offers.DEPARTURE_WINDOWS[view])
+        self.show_no_offers(shown)
         
-        for name, num, dep, arr, price in trains:
+        for offer in shown:
+            name, num, dep, arr = offer.provider, offer.product, offer.depart, offer.arrive
             c = ctk.CTkFrame(self.tab_results, fg_color=self.colors["white"], corner_radius=12)
             c.pack(fill="x", pady=5)
             
@@ -1397,7 +1356,7 @@ class TravelEaseApp(ctk.CTk):
                              hover_color=self.colors["light_blue"], corner_radius=8, width=55, height=40,
                              command=lambda pr=p, n=name: self.book_transport("Train", n, pr)).pack(side="left", padx=2)
     
-    def show_bus_results(self, route, prices):
+    def show_bus_results(self, route, prices, sort="price", view="Any time"):
         """Show bus-specific results"""
         for w in self.tab_results.winfo_children():
             w.destroy()
@@ -1417,13 +1376,14 @@ class TravelEaseApp(ctk.CTk):
         ctk.CTkLabel(self.tab_results, text="Available Buses", font=ctk.CTkFont(size=16, weight="bold"),
                     text_color=self.colors["text"]).pack(anchor="w", pady=(10, 10))
         
-        buses = [("VRL Travels", "Volvo Multi-Axle", "21:00", "06:30", prices["buses"][3]["price"], "⭐ 4.5"),
-                ("SRS Travels", "AC Sleeper", "22:00", "07:00", prices["buses"][2]["price"], "⭐ 4.2"),
-                ("Neeta Travels", "AC Seater", "20:30", "05:30", prices["buses"][1]["price"], "⭐ 4.0"),
-                ("Orange Travels", "Non-AC Seater", "19:00", "04:00", prices["buses"][0]["price"], "⭐ 3.8"),
-                ("Parveen Travels", "Volvo Multi-Axle", "23:00", "08:30", prices["buses"][3]["price"], "⭐ 4.3")]
+        self.offer_toolbar({"Cheapest": "price", "Earliest": "departure", "Top rated": "stars"}, sort,
+                           offers.DEPARTURE_WINDOWS, view, lambda s, v: self.show_bus_results(route, prices, s, v))
+        shown = offers.select(offers.bus_offers(prices), sort, offers.RESULTS_PAGE, **offers.DEPARTURE_WINDOWS[view])
+        self.show_no_offers(shown)
         
-        for operator, bus_type, dep, arr, price, rating in buses:
+        for offer in shown:
+            operator, bus_type, dep, arr, price = offer.provider, offer.product, offer.depart, offer.arrive, offer.price
+            rating = f"⭐ {offer.rating}"
             c = ctk.CTkFrame(self.tab_results, fg_color=self.colors["white"], corner_radius=12)
             c.pack(fill="x", pady=5)
             
@@ -1449,15 +1409,19 @@ class TravelEaseApp(ctk.CTk):
     
     def show_hotel_results(self, city):
         """Show hotel results for a city"""
-        for w in self.tab_results.winfo_children():
-            w.destroy()
-        
-        loc = self.location_service.geocode(city)
+        self.run_search(city, [city], lambda locs: self.render_hotel_results(city, locs[0]))
+    
+    def render_hotel_results(self, city, loc):
         if not loc:
             messagebox.showerror("Error", f"Could not find: {city}")
             return
         
         dest_idx = self.pricing.cost_index.get(self.pricing.get_region(loc["country"]), 1)
+        self.show_hotel_offers(city, dest_idx)
+    
+    def show_hotel_offers(self, city, dest_idx, sort="price", view="Any"):
+        for w in self.tab_results.winfo_children():
+            w.destroy()
         
         hdr = ctk.CTkFrame(self.tab_results, fg_color=self.colors["dark"], corner_radius=15)
         hdr.pack(fill="x", pady=(0, 15))
@@ -1469,14 +1433,13 @@ class TravelEaseApp(ctk.CTk):
         ctk.CTkLabel(self.tab_results, text="Available Hotels", font=ctk.CTkFont(size=16, weight="bold"),
                     text_color=self.colors["text"]).pack(anchor="w", pady=(10, 10))
         
-        hotels = [("Taj Hotel", "⭐⭐⭐⭐⭐", "Luxury", int(15000 * dest_idx), "Pool, Spa, Restaurant"),
-                 ("Marriott", "⭐⭐⭐⭐⭐", "Luxury", int(12000 * dest_idx), "Gym, Pool, Bar"),
-                 ("Hyatt Regency", "⭐⭐⭐⭐", "Premium", int(8000 * dest_idx), "Restaurant, Gym"),
-                 ("Lemon Tree", "⭐⭐⭐", "Mid-Range", int(3500 * dest_idx), "WiFi, Restaurant"),
-                 ("OYO Rooms", "⭐⭐", "Budget", int(1200 * dest_idx), "AC, WiFi, TV"),
-                 ("FabHotel", "⭐⭐", "Budget", int(900 * dest_idx), "AC, WiFi")]
+        self.offer_toolbar({"Cheapest": "price", "Top rated": "stars"}, sort, offers.STAR_FILTERS, view,
+                           lambda s, v: self.show_hotel_offers(city, dest_idx, s, v))
+        shown = offers.select(offers.hotel_offers(dest_idx), sort, offers.RESULTS_PAGE, **offers.STAR_FILTERS[view])
+        self.show_no_offers(shown)
         
-        for name, stars, category, price, amenities in hotels:
+        for offer in shown:
+            name, stars, category, price, amenities = offer.provider, "⭐" * offer.stars, offer.product, offer.price, offer.details
             c = ctk.CTkFrame(self.tab_results, fg_color=self.colors["white"], corner_radius=12)
             c.pack(fill="x", pady=5)
             
@@ -1499,16 +1462,18 @@ class TravelEaseApp(ctk.CTk):
     
     def show_cab_results(self, pickup, drop):
         """Show cab results"""
-        for w in self.tab_results.winfo_children():
-            w.destroy()
-        
-        route = self.location_service.get_route_info(pickup, drop)
+        self.run_search(f"{pickup} → {drop}", [pickup, drop], lambda locs: self.render_cab_results(pickup, drop, locs))
+    
+    def render_cab_results(self, pickup, drop, locs):
+        route, prices = self.get_quote(*locs, 1, 0, 1)
         if not route:
             messagebox.showerror("Error", f"Could not find route: {pickup} to {drop}")
             return
-        
-        prices = self.pricing.calculate_prices(route["distance_km"], route["origin"]["country"],
-                                               route["destination"]["country"], 1, 0, 1)
+        self.show_cab_offers(pickup, drop, route, prices)
+    
+    def show_cab_offers(self, pickup, drop, route, prices, sort="price", view="Any"):
+        for w in self.tab_results.winfo_children():
+            w.destroy()
         
         hdr = ctk.CTkFrame(self.tab_results, fg_color=self.colors["dark"], corner_radius=15)
         hdr.pack(fill="x", pady=(0, 15))
@@ -1522,15 +1487,13 @@ class TravelEaseApp(ctk.CTk):
         ctk.CTkLabel(self.tab_results, text="Available Cabs", font=ctk.CTkFont(size=16, weight="bold"),
                     text_color=self.colors["text"]).pack(anchor="w", pady=(10, 10))
         
-        cabs = [("Ola", "Mini", "Swift/WagonR", prices["cabs"][0]["price"], "4 Seater"),
-               ("Uber", "Go", "Swift Dzire", int(prices["cabs"][0]["price"] * 1.1), "4 Seater"),
-               ("Ola", "Prime Sedan", "Etios/Xcent", prices["cabs"][0]["price"], "4 Seater"),
-               ("Uber", "Premier", "Honda City", int(prices["cabs"][1]["price"] * 0.9), "4 Seater"),
-               ("Ola", "SUV", "Innova/Ertiga", prices["cabs"][1]["price"], "6 Seater"),
-               ("Uber", "XL", "Innova Crysta", int(prices["cabs"][1]["price"] * 1.1), "6 Seater"),
-               ("Ola", "Lux", "BMW/Audi", prices["cabs"][2]["price"], "4 Seater")]
+        self.offer_toolbar({"Cheapest": "price"}, sort, offers.SEAT_FILTERS, view,
+                           lambda s, v: self.show_cab_offers(pickup, drop, route, prices, s, v))
+        shown = offers.select(offers.cab_offers(prices), sort, offers.RESULTS_PAGE, **offers.SEAT_FILTERS[view])
+        self.show_no_offers(shown)
         
-        for provider, cab_type, car, price, capacity in cabs:
+        for offer in shown:
+            provider, cab_type, car, price, capacity = offer.provider, offer.product, offer.details, offer.price, f"{offer.capacity} Seater"
             c = ctk.CTkFrame(self.tab_results, fg_color=self.colors["white"], corner_radius=12)
             c.pack(fill="x", pady=5)
             
@@ -1549,6 +1512,11 @@ class TravelEaseApp(ctk.CTk):
                          fg_color=self.colors["secondary"], corner_radius=15, width=80, height=30,
                          command=lambda p=price, t=f"{provider} {cab_type}": self.book_transport("Cab", t, p)).pack(pady=5)
     
+    def show_no_offers(self, shown):
+        if not shown:
+            ctk.CTkLabel(self.tab_results, text="No offers match these filters", font=ctk.CTkFont(size=13),
+                        text_color=self.colors["text_light"]).pack(pady=30)
+    
     def book_transport(self, transport_type, name, price):
         """Book a specific transport/hotel"""
         if not self.current_user:
@@ -1560,23 +1528,19 @@ class TravelEaseApp(ctk.CTk):
             orig = self.tab_from.get() if hasattr(self, 'tab_from') else (self.cab_pickup.get() if hasattr(self, 'cab_pickup') else "")
             dest = self.tab_to.get() if hasattr(self, 'tab_to') else (self.cab_drop.get() if hasattr(self, 'cab_drop') else self.hotel_city.get() if hasattr(self, 'hotel_city') else "")
             
-            self.db.add_booking(self.current_user[0], transport_type.lower(), orig, dest, 
-                               self.adults_var.get() + self.children_var.get(), price)
-            pts = int(price / 100)
-            self.db.update_points(self.current_user[0], pts)
+            pts = self.db.add_booking(self.current_user[0], transport_type.lower(), orig, dest,
+                                      self.adults_var.get() + self.children_var.get(), price)
             messagebox.showinfo("Success", f"🎉 {transport_type} Booked!\nYou earned {pts} reward points!")
             self.update_user_section()
     
-    def book(self, pkg):
+    def book(self, pkg, route):
         if not self.current_user:
             messagebox.showinfo("Login Required", "Please login to book")
             self.show_login()
             return
         if messagebox.askyesno("Confirm Booking", f"Book {pkg['name']}?\n\nTotal: ₹{pkg['total']:,}"):
-            self.db.add_booking(self.current_user[0], "package", self.from_entry.get(),
-                               self.to_entry.get(), self.adults_var.get() + self.children_var.get(), pkg['total'])
-            pts = int(pkg['total'] / 100)
-            self.db.update_points(self.current_user[0], pts)
+            pts = self.db.add_booking(self.current_user[0], "package", route["origin"]["name"],
+                                      route["destination"]["name"], self.adults_var.get() + self.children_var.get(), pkg['total'])
             messagebox.showinfo("Success", f"🎉 Booking Confirmed!\nYou earned {pts} reward points!")
             self.update_user_section()
 
@@ -1699,24 +1663,34 @@ class TravelEaseApp(ctk.CTk):
         ctk.CTkLabel(self.content, text="📋 My Bookings", font=ctk.CTkFont(size=18, weight="bold"),
                     text_color=self.colors["text"]).pack(anchor="w", padx=40, pady=(25, 12))
         
-        bookings = self.db.get_user_bookings(self.current_user[0])
-        if bookings:
-            for b in bookings:
-                c = ctk.CTkFrame(self.content, fg_color=self.colors["white"], corner_radius=12)
-                c.pack(fill="x", padx=40, pady=4)
-                ctk.CTkLabel(c, text=f"{b[3]} → {b[4]}", font=ctk.CTkFont(size=13, weight="bold"),
-                            text_color=self.colors["text"]).pack(side="left", padx=18, pady=12)
-                ctk.CTkLabel(c, text=f"₹{b[6]:,.0f}", font=ctk.CTkFont(size=13, weight="bold"),
-                            text_color=self.colors["primary"]).pack(side="right", padx=18, pady=12)
-                ctk.CTkLabel(c, text=b[7].upper(), font=ctk.CTkFont(size=10),
-                            text_color=self.colors["accent"]).pack(side="right", padx=10)
-        else:
-            ctk.CTkLabel(self.content, text="No bookings yet. Start planning your trip!",
+        history = ctk.CTkFrame(self.content, fg_color="transparent")
+        history.pack(fill="x")
+        if not self.show_booking_page(history, None):
+            ctk.CTkLabel(history, text="No bookings yet. Start planning your trip!",
                         font=ctk.CTkFont(size=12), text_color=self.colors["text_light"]).pack(pady=20)
         
         ctk.CTkButton(self.content, text="← Back to Home", fg_color=self.colors["dark"],
                      corner_radius=20, command=self.show_home).pack(pady=25)
     
+    def show_booking_page(self, history, after):
+        """Append the page of bookings after the cursor, with a Load more button while older ones remain"""
+        page, next_cursor = self.db.get_user_bookings(self.current_user[0], after)
+        for b in page:
+            c = ctk.CTkFrame(history, fg_color=self.colors["white"], corner_radius=12)
+            c.pack(fill="x", padx=40, pady=4)
+            ctk.CTkLabel(c, text=f"{b[1]} → {b[2]}", font=ctk.CTkFont(size=13, weight="bold"),
+                        text_color=self.colors["text"]).pack(side="left", padx=18, pady=12)
+            ctk.CTkLabel(c, text=f"₹{b[4]:,.0f}", font=ctk.CTkFont(size=13, weight="bold"),
+                        text_color=self.colors["primary"]).pack(side="right", padx=18, pady=12)
+            ctk.CTkLabel(c, text=b[5].upper(), font=ctk.CTkFont(size=10),
+                        text_color=self.colors["accent"]).pack(side="right", padx=10)
+        if next_cursor:
+            more = ctk.CTkButton(history, text="Load more", fg_color="transparent", border_width=1,
+                                 border_color=self.colors["primary"], text_color=self.colors["primary"], corner_radius=20)
+            more.configure(command=lambda: (more.destroy(), self.show_booking_page(history, next_cursor)))
+            more.pack(pady=8)
+        return len(page)
+    
     def logout(self):
         self.current_user = None
         self.update_user_section()
@@ -1805,26 +1779,126 @@ class TravelEaseApp(ctk.CTk):
             ctk.CTkLabel(c, text=lbl, font=ctk.CTkFont(size=11), text_color=self.colors["text_light"]).pack(pady=(20, 5))
             ctk.CTkLabel(c, text=str(val), font=ctk.CTkFont(size=24, weight="bold"), text_color=clr).pack(pady=(0, 20))
         
-        ctk.CTkLabel(self.content, text="👥 All Users", font=ctk.CTkFont(size=18, weight="bold"),
-                    text_color=self.colors["text"]).pack(anchor="w", padx=40, pady=(25, 12))
+        unmapped = regions.REGISTRY.stats()["unknown_countries"]
+        if unmapped:
+            ctk.CTkLabel(self.content, text="🌐 No region in pricing_tables.json (priced with the default): " +
+                        ", ".join(f"{country} ({count})" for country, count in unmapped.items()),
+                        font=ctk.CTkFont(size=12), text_color=self.colors["secondary"], wraplength=900,
+                        justify="left").pack(anchor="w", padx=40, pady=(0, 10))
+        
+        if stats["by_type"]:
+            types_row = ctk.CTkFrame(self.content, fg_color="transparent")
+            types_row.pack(fill="x", padx=40, pady=(0, 10))
+            for booking_type, count, revenue, travelers in stats["by_type"]:
+                c = ctk.CTkFrame(types_row, fg_color=self.colors["white"], corner_radius=12)
+                c.pack(side="left", fill="both", expand=True, padx=6)
+                ctk.CTkLabel(c, text=(booking_type or "other").title(), font=ctk.CTkFont(size=11),
+                            text_color=self.colors["text_light"]).pack(pady=(12, 2))
+                ctk.CTkLabel(c, text=f"{count} · ₹{revenue:,.0f}", font=ctk.CTkFont(size=13, weight="bold"),
+                            text_color=self.colors["text"]).pack()
+                ctk.CTkLabel(c, text=f"👥 {travelers:.1f} avg", font=ctk.CTkFont(size=10),
+                            text_color=self.colors["text_light"]).pack(pady=(0, 12))
+        
+        if stats["routes"]:
+            ctk.CTkLabel(self.content, text="📈 Weekly Revenue & Top Routes", font=ctk.CTkFont(size=18, weight="bold"),
+                        text_color=self.colors["text"]).pack(anchor="w", padx=40, pady=(25, 12))
+            weeks_row = ctk.CTkFrame(self.content, fg_color="transparent")
+            weeks_row.pack(fill="x", padx=40, pady=(0, 8))
+            for week, _, count, revenue, _ in stats["weeks"]:
+                c = ctk.CTkFrame(weeks_row, fg_color=self.colors["white"], corner_radius=10)
+                c.pack(side="left", fill="both", expand=True, padx=3)
+                ctk.CTkLabel(c, text=datetime.strptime(week, "%Y-%m-%d").strftime("%d %b"), font=ctk.CTkFont(size=10),
+                            text_color=self.colors["text_light"]).pack(pady=(8, 0))
+                ctk.CTkLabel(c, text=f"₹{revenue:,.0f}", font=ctk.CTkFont(size=12, weight="bold"),
+                            text_color=self.colors["primary"]).pack()
+                ctk.CTkLabel(c, text=f"{count} bookings", font=ctk.CTkFont(size=9),
+                            text_color=self.colors["text_light"]).pack(pady=(0, 8))
+            for origin, dest, count, revenue, travelers in stats["routes"]:
+                c = ctk.CTkFrame(self.content, fg_color=self.colors["white"], corner_radius=12)
+                c.pack(fill="x", padx=40, pady=3)
+                ctk.CTkLabel(c, text=f"{origin} → {dest}", font=ctk.CTkFont(size=12, weight="bold"),
+                            text_color=self.colors["text"]).pack(side="left", padx=18, pady=10)
+                ctk.CTkLabel(c, text=f"₹{revenue:,.0f}", font=ctk.CTkFont(size=12, weight="bold"),
+                            text_color=self.colors["primary"]).pack(side="right", padx=18)
+                ctk.CTkLabel(c, text=f"{count} bookings · 👥 {travelers:.1f} avg", font=ctk.CTkFont(size=11),
+                            text_color=self.colors["text_light"]).pack(side="right", padx=10)
+        
+        head = ctk.CTkFrame(self.content, fg_color="transparent")
+        head.pack(fill="x", padx=40, pady=(25, 12))
+        ctk.CTkLabel(head, text="👥 All Users", font=ctk.CTkFont(size=18, weight="bold"),
+                    text_color=self.colors["text"]).pack(side="left")
+        user_search = ctk.CTkEntry(head, placeholder_text="Search name, email or phone", width=260)
+        user_search.pack(side="right")
         
-        users = self.db.get_all_users()
-        for u in users:
-            c = ctk.CTkFrame(self.content, fg_color=self.colors["white"], corner_radius=12)
-            c.pack(fill="x", padx=40, pady=3)
-            ctk.CTkLabel(c, text=f"{u[1]}", font=ctk.CTkFont(size=12, weight="bold"),
-                        text_color=self.colors["text"]).pack(side="left", padx=18, pady=10)
-            ctk.CTkLabel(c, text=u[2], font=ctk.CTkFont(size=11),
-                        text_color=self.colors["text_light"]).pack(side="left", padx=10)
-            ctk.CTkLabel(c, text=f"{u[4]} pts", font=ctk.CTkFont(size=11, weight="bold"),
-                        text_color=self.colors["primary"]).pack(side="right", padx=18)
-            ctk.CTkButton(c, text="🗑️", width=35, height=30, corner_radius=8,
-                         fg_color="#EF4444", hover_color="#DC2626",
-                         command=lambda uid=u[0]: self.delete_user(uid)).pack(side="right", padx=5)
+        users = VirtualList(self.content, lambda after: self.db.get_all_users(after), self.make_user_row, self.fill_user_row,
+                            fg_color="transparent", empty_text="No users match")
+        users.pack(fill="x", padx=40)
+        
+        head = ctk.CTkFrame(self.content, fg_color="transparent")
+        head.pack(fill="x", padx=40, pady=(25, 12))
+        ctk.CTkLabel(head, text="📋 All Bookings", font=ctk.CTkFont(size=18, weight="bold"),
+                    text_color=self.colors["text"]).pack(side="left")
+        booking_type = ctk.CTkOptionMenu(head, values=["All"] + [t[0] for t in stats["by_type"]], width=120)
+        booking_type.pack(side="right", padx=(8, 0))
+        booking_search = ctk.CTkEntry(head, placeholder_text="Search traveller or city", width=220)
+        booking_search.pack(side="right")
+        
+        booking_list = VirtualList(self.content, lambda after: self.db.get_all_bookings(after), self.make_booking_row,
+                                   self.fill_booking_row, fg_color="transparent", empty_text="No bookings match")
+        booking_list.pack(fill="x", padx=40)
+        
+        def filter_users(event=None):
+            search = user_search.get().strip()
+            users.reload(lambda after: self.db.get_all_users(after, search))
+        
+        def filter_bookings(*_):
+            search, kind = booking_search.get().strip(), booking_type.get()
+            booking_list.reload(lambda after: self.db.get_all_bookings(after, search, None if kind == "All" else kind))
+        
+        user_search.bind("<Return>", filter_users)
+        booking_search.bind("<Return>", filter_bookings)
+        booking_type.configure(command=filter_bookings)
         
         ctk.CTkButton(self.content, text="← Back to Home", fg_color=self.colors["dark"],
                      corner_radius=20, command=self.show_home).pack(pady=25)
     
+    def make_user_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color=self.colors["white"], corner_radius=12)
+        row.name = ctk.CTkLabel(row, font=ctk.CTkFont(size=12, weight="bold"), text_color=self.colors["text"])
+        row.name.pack(side="left", padx=18)
+        row.email = ctk.CTkLabel(row, font=ctk.CTkFont(size=11), text_color=self.colors["text_light"])
+        row.email.pack(side="left", padx=10)
+        row.points = ctk.CTkLabel(row, font=ctk.CTkFont(size=11, weight="bold"), text_color=self.colors["primary"])
+        row.points.pack(side="right", padx=18)
+        row.delete = ctk.CTkButton(row, text="🗑️", width=35, height=30, corner_radius=8,
+                                   fg_color="#EF4444", hover_color="#DC2626")
+        row.delete.pack(side="right", padx=5)
+        return row
+    
+    def fill_user_row(self, row, u):
+        row.name.configure(text=u[1])
+        row.email.configure(text=u[2])
+        row.points.configure(text=f"{u[4]} pts")
+        row.delete.configure(command=lambda uid=u[0]: self.delete_user(uid))
+    
+    def make_booking_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color=self.colors["white"], corner_radius=12)
+        row.route = ctk.CTkLabel(row, font=ctk.CTkFont(size=12, weight="bold"), text_color=self.colors["text"])
+        row.route.pack(side="left", padx=18)
+        row.who = ctk.CTkLabel(row, font=ctk.CTkFont(size=11), text_color=self.colors["text_light"])
+        row.who.pack(side="left", padx=10)
+        row.cost = ctk.CTkLabel(row, font=ctk.CTkFont(size=12, weight="bold"), text_color=self.colors["primary"])
+        row.cost.pack(side="right", padx=18)
+        row.kind = ctk.CTkLabel(row, font=ctk.CTkFont(size=10), text_color=self.colors["accent"])
+        row.kind.pack(side="right", padx=10)
+        return row
+    
+    def fill_booking_row(self, row, b):
+        row.route.configure(text=f"{b[3]} → {b[4]}")
+        row.who.configure(text=f"{b[1]} · 👥 {b[5]} · {b[8]}")
+        row.cost.configure(text=f"₹{b[6] or 0:,.0f}")
+        row.kind.configure(text=f"{(b[2] or '').upper()} · {(b[7] or '').upper()}")
+    
     def delete_user(self, uid):
         if messagebox.askyesno("Confirm", f"Delete user ID {uid} and all bookings?"):
             self.db.delete_user(uid)
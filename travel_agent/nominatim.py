@@ -0,0 +1,149 @@
+"""
+TravelEase - Nominatim Client
+One pooled keep-alive session, a 1 request/second token bucket, retries with backoff and coalesced duplicate lookups.
+"""
+import os
+import time
+import threading
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from location_index import normalize_name
+
+NOMINATIM_URL = os.environ.get("TRAVELEASE_NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+USER_AGENT = "TravelEase/1.0"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after(value, now=None):
+    """Seconds a Retry-After header asks for, either delay-seconds or an HTTP-date; 0 (plain backoff) if unreadable"""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class TokenBucket:
+    def __init__(self, rate=1.0, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until it is due; returns the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1  # may go negative: a reservation later callers queue behind
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class NominatimClient:
+    def __init__(self, url=NOMINATIM_URL, rate=1.0, retries=2, backoff=0.5, timeout=10, pool_size=8):
+        self.url = url
+        self.limiter = TokenBucket(rate) if rate else None
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self._inflight = {}  # normalized query -> Future shared by concurrent callers
+        self._lock = threading.Lock()
+        self.counters = {"lookups": 0, "requests": 0, "coalesced": 0, "retries": 0, "errors": 0,
+                         "throttled_seconds": 0.0, "request_seconds": 0.0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def search(self, query):
+        """{"name", "lat", "lng", "country", "code"} for the best match, None if none; network errors propagate"""
+        key = normalize_name(query)
+        with self._lock:
+            self.counters["lookups"] += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.counters["coalesced"] += 1
+        if not owner:
+            return future.result()
+        try:
+            future.set_result(self._search(query))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return future.result()
+
+    def _search(self, query):
+        data = self._get({"q": query, "format": "json", "limit": 1})
+        if not data:
+            return None
+        parts = data[0].get("display_name", "").split(", ")
+        return {"name": query.title(), "lat": float(data[0]["lat"]), "lng": float(data[0]["lon"]),
+                "country": parts[-1] if parts else "Unknown", "code": ""}
+
+    def _get(self, params):
+        for attempt in range(self.retries + 1):
+            if self.limiter:
+                self._count("throttled_seconds", self.limiter.acquire())
+            started = time.perf_counter()
+            try:
+                response = self.session.get(self.url, params=params, timeout=self.timeout)
+                retry = response.status_code in RETRY_STATUSES
+                if not retry:
+                    response.raise_for_status()
+                    return response.json()
+                error = requests.HTTPError(f"{response.status_code} from Nominatim", response=response)
+                delay = retry_after(response.headers.get("Retry-After"))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error, delay = e, 0
+            finally:
+                self._count("requests")
+                self._count("request_seconds", time.perf_counter() - started)
+            if attempt == self.retries:
+                self._count("errors")
+                raise error
+            self._count("retries")
+            time.sleep(min(max(delay, self.backoff * 2 ** attempt), 30))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters, inflight=len(self._inflight))
+        stats["avg_request_ms"] = stats["request_seconds"] * 1000 / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+# ============== PROCESS-WIDE CLIENT ==============
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url=NOMINATIM_URL):
+    """Shared client for url, so every lookup in the process counts against one rate limit"""
+    with _clients_lock:
+        if url not in _clients:
+            _clients[url] = NominatimClient(url)
+        return _clients[url]
@@ -0,0 +1,134 @@
+"""
+TravelEase - Offer Results Engine
+Offers are generated as typed records from a quote and filtered, sorted and cut to the top k without building the full list.
+"""
+import heapq
+from dataclasses import dataclass
+import pricing_table
+
+
+@dataclass(frozen=True, slots=True)
+class Offer:
+    kind: str  # flight, train, bus, hotel or cab
+    provider: str
+    product: str  # flight/train number, bus or cab type, hotel category
+    price: int
+    depart: str = None  # "HH:MM"
+    arrive: str = None
+    stars: int = None
+    rating: float = None
+    capacity: int = None
+    details: str = ""
+
+    @property
+    def minutes(self):
+        """Journey time, arrivals before the departure time being next day"""
+        if not self.depart or not self.arrive:
+            return None
+        (dh, dm), (ah, am) = (map(int, t.split(":")) for t in (self.depart, self.arrive))
+        return (ah * 60 + am - dh * 60 - dm) % (24 * 60)
+
+
+# ============== INVENTORY ==============
+# (provider, product, depart, arrive, fare index, multiplier): price = int(fare * multiplier)
+FLIGHTS = [("IndiGo", "6E-2145", "06:00", "08:15", 0, 1), ("Air India", "AI-865", "08:30", "10:45", 0, 1.1),
+           ("SpiceJet", "SG-412", "10:00", "12:20", 0, 0.95), ("Vistara", "UK-945", "14:00", "16:10", 0, 1.2),
+           ("IndiGo", "6E-6721", "18:30", "20:45", 0, 1.05), ("Air India", "AI-502", "21:00", "23:15", 1, 1)]
+# (name, number, depart, arrive, headline class tier)
+TRAINS = [("Rajdhani Express", "12951", "16:25", "08:15", 3), ("Shatabdi Express", "12009", "06:00", "14:30", 2),
+          ("Duronto Express", "12267", "23:00", "08:45", 2), ("Garib Rath", "12216", "17:30", "06:00", 1),
+          ("Superfast Express", "12137", "22:15", "12:30", 0)]
+# (operator, bus type, depart, arrive, tier, rating)
+BUSES = [("VRL Travels", "Volvo Multi-Axle", "21:00", "06:30", 3, 4.5), ("SRS Travels", "AC Sleeper", "22:00", "07:00", 2, 4.2),
+         ("Neeta Travels", "AC Seater", "20:30", "05:30", 1, 4.0), ("Orange Travels", "Non-AC Seater", "19:00", "04:00", 0, 3.8),
+         ("Parveen Travels", "Volvo Multi-Axle", "23:00", "08:30", 3, 4.3)]
+# (name, stars, category, base per night before the city's cost index, amenities)
+HOTELS = [("Taj Hotel", 5, "Luxury", 15000, "Pool, Spa, Restaurant"), ("Marriott", 5, "Luxury", 12000, "Gym, Pool, Bar"),
+          ("Hyatt Regency", 4, "Premium", 8000, "Restaurant, Gym"), ("Lemon Tree", 3, "Mid-Range", 3500, "WiFi, Restaurant"),
+          ("OYO Rooms", 2, "Budget", 1200, "AC, WiFi, TV"), ("FabHotel", 2, "Budget", 900, "AC, WiFi")]
+# (provider, cab type, car, tier, multiplier, seats)
+CABS = [("Ola", "Mini", "Swift/WagonR", 0, 1, 4), ("Uber", "Go", "Swift Dzire", 0, 1.1, 4),
+        ("Ola", "Prime Sedan", "Etios/Xcent", 0, 1, 4), ("Uber", "Premier", "Honda City", 1, 0.9, 4),
+        ("Ola", "SUV", "Innova/Ertiga", 1, 1, 6), ("Uber", "XL", "Innova Crysta", 1, 1.1, 6),
+        ("Ola", "Lux", "BMW/Audi", 2, 1, 4)]
+
+
+def _require_tiers():
+    """Check the tier indexes above against the pricing table now and on every reload, not at the first IndexError"""
+    for mode, tiers in (("trains", [t[4] for t in TRAINS]), ("buses", [b[4] for b in BUSES]), ("cabs", [c[3] for c in CABS])):
+        pricing_table.require_tiers(mode, max(tiers) + 1)
+
+
+_require_tiers()
+
+
+def _price(fare, multiplier):
+    return fare if multiplier == 1 else int(fare * multiplier)
+
+
+def flight_offers(prices):
+    for provider, number, depart, arrive, fare, multiplier in FLIGHTS:
+        yield Offer("flight", provider, number, _price(prices["flights"][fare]["price"], multiplier), depart, arrive)
+
+
+def train_offers(prices):
+    trains = prices["trains"]
+    for name, number, depart, arrive, tier in TRAINS if trains else ():
+        yield Offer("train", name, number, trains[tier]["price"], depart, arrive)
+
+
+def bus_offers(prices):
+    buses = prices["buses"]
+    for operator, bus_type, depart, arrive, tier, rating in BUSES if buses else ():
+        yield Offer("bus", operator, bus_type, buses[tier]["price"], depart, arrive, rating=rating)
+
+
+def hotel_offers(cost_index):
+    for name, stars, category, base, amenities in HOTELS:
+        yield Offer("hotel", name, category, int(base * cost_index), stars=stars, details=amenities)
+
+
+def cab_offers(prices):
+    for provider, cab_type, car, tier, multiplier, seats in CABS:
+        yield Offer("cab", provider, cab_type, _price(prices["cabs"][tier]["price"], multiplier), capacity=seats, details=car)
+
+
+# ============== SELECTION ==============
+RESULTS_PAGE = 10  # offers rendered per list; the rest are never materialized
+DEPARTURE_WINDOWS = {"Any time": {}, "Morning": {"depart_before": "11:59"},
+                     "Afternoon": {"depart_after": "12:00", "depart_before": "17:59"}, "Evening": {"depart_after": "18:00"}}
+STAR_FILTERS = {"Any": {}, "3★+": {"min_stars": 3}, "4★+": {"min_stars": 4}, "5★": {"min_stars": 5}}
+SEAT_FILTERS = {"Any": {}, "6+ seats": {"min_capacity": 6}}
+SORTS = {
+    "price": lambda o: (o.price, o.depart or ""),
+    "departure": lambda o: (o.depart or "99:99", o.price),
+    "duration": lambda o: (o.minutes if o.minutes is not None else 24 * 60, o.price),
+    "stars": lambda o: (-(o.stars or 0), -(o.rating or 0), o.price),
+}
+
+
+def matches(offer, min_price=None, max_price=None, min_stars=None, min_capacity=None, depart_after=None, depart_before=None):
+    """Filters left as None match everything; departure bounds are inclusive "HH:MM" strings"""
+    if min_price is not None and offer.price < min_price:
+        return False
+    if max_price is not None and offer.price > max_price:
+        return False
+    if min_stars is not None and (offer.stars or 0) < min_stars:
+        return False
+    if min_capacity is not None and (offer.capacity or 0) < min_capacity:
+        return False
+    if depart_after is not None and (offer.depart is None or offer.depart < depart_after):
+        return False
+    if depart_before is not None and (offer.depart is None or offer.depart > depart_before):
+        return False
+    return True
+
+
+def select(offers, sort="price", k=None, **filters):
+    """Offers passing filters in sort order; with k only the best k are kept while the generator is consumed"""
+    key = SORTS[sort]
+    kept = (offer for offer in offers if matches(offer, **filters)) if filters else offers
+    if k is None:
+        return sorted(kept, key=key)
+    return heapq.nsmallest(k, kept, key=key)
+
@@ -0,0 +1,258 @@
+"""
+TravelEase - Pricing Engine
+Fare rules from pricing_table for both front ends, priced one route at a time or as NumPy columns for thousands of quotes at once.
+"""
+import datetime
+from collections.abc import Mapping
+import numpy as np
+import regions
+import pricing_table
+
+WEB, DESKTOP = "web", "desktop"  # profile names in pricing_tables.json
+
+
+def table():
+    """The live pricing table, reloaded when pricing_tables.json changes"""
+    return pricing_table.current()
+
+
+def get_region(country):
+    return regions.REGISTRY.region(country)
+
+
+def region_index(country, rules=None):
+    """Cost index of country's region, from rules (a PricingTable) or the live table"""
+    rules = rules or table()
+    return rules.cost_index.get(regions.REGISTRY.region(country, rules), 1)
+
+
+class Quote(Mapping):
+    """One route's prices, computed a mode at a time: quote["trains"] prices trains only and remembers the result.
+
+    Reads like the calculate_prices() dict (flights, trains, buses, cabs, hotels, packages); packages pull in the
+    modes they are built from. Availability thresholds are decided once, up front. With a departure date, flight,
+    train and bus fares carry that day's demand multiplier, exactly as fare_calendar() shows them.
+    """
+    MODES = ("flights", "trains", "buses", "cabs", "hotels", "packages")
+
+    def __init__(self, distance, origin_country, dest_country, adults, children, nights, profile=WEB, departure=None):
+        rules = table()
+        self.departure = departure
+        self.multiplier = None if departure is None else float(demand(np.array([departure], dtype="datetime64[D]"), rules)[0])
+        self.profile = rules.profiles[profile]
+        self.distance, self.adults, self.children, self.nights = distance, adults, children, nights
+        self.origin_index, self.dest_index = region_index(origin_country, rules), region_index(dest_country, rules)
+        self.avg_index = (self.origin_index + self.dest_index) / 2
+        self.is_international = origin_country != dest_country
+        self.has_trains = not self.is_international and distance < self.profile.train_max_km
+        self.has_buses = not self.is_international and distance < self.profile.bus_max_km
+        self._modes = {}
+
+    def __getitem__(self, mode):
+        value = self._modes.get(mode)
+        if value is None:
+            if mode not in self.MODES:
+                raise KeyError(mode)
+            value = getattr(self, "_" + mode)()
+            if self.multiplier is not None and mode in CALENDAR_MODES:
+                value = [{"type": t["type"], "price": int(self.multiplier * t["price"])} for t in value]
+            self._modes[mode] = value
+        return value
+
+    def __iter__(self):
+        return iter(self.MODES)
+
+    def __len__(self):
+        return len(self.MODES)
+
+    def computed(self):
+        """Modes priced so far"""
+        return [mode for mode in self.MODES if mode in self._modes]
+
+    def as_dict(self):
+        return {mode: self[mode] for mode in self.MODES}
+
+    def _tiers(self, base, rules):
+        return [{"type": t.label, "price": max(t.minimum, int(base * t.factor))} for t in rules]
+
+    def _flights(self):
+        p = self.profile
+        flight_base = p.flight_per_km * self.distance * self.avg_index * (1.5 if self.is_international else 1)
+        economy = max(p.flight_min, min(int(flight_base * 0.8), p.flight_max))
+        return [{"type": "Economy", "price": economy}, {"type": "Business", "price": int(economy * 2.5)}]
+
+    def _trains(self):
+        if not self.has_trains:
+            return []
+        p = self.profile
+        return self._tiers(p.train_per_km * self.distance * (self.origin_index if p.train_index == "origin" else self.avg_index),
+                           p.trains)
+
+    def _buses(self):
+        if not self.has_buses:
+            return []
+        p = self.profile
+        return self._tiers(p.bus_per_km * self.distance * (self.origin_index if p.bus_index == "origin" else self.avg_index),
+                           p.buses)
+
+    def _cabs(self):
+        return self._tiers(self.profile.cab_per_km * self.distance * self.dest_index, self.profile.cabs)
+
+    def _hotels(self):
+        return {h.key: int(h.base * self.dest_index) for h in self.profile.hotels}
+
+    def _packages(self):
+        p = self.profile
+        travelers = self.adults + self.children
+        rooms = max(1, (travelers + 1) // 2)
+        days = self.nights + p.extra_days
+        economy, business = (f["price"] for f in self["flights"])
+        needed = {pkg.transport for pkg in p.packages}
+        fares = {"economy": economy, "business": business}
+        if "cheapest" in needed:
+            buses, trains = self["buses"], self["trains"]
+            fares["cheapest"] = buses[0]["price"] if buses else (trains[0]["price"] if trains else economy)
+        if "second_train" in needed:
+            trains = self["trains"]
+            fares["second_train"] = trains[1]["price"] if len(trains) > 1 else economy
+        hotels = self["hotels"]
+        packages = []
+        for pkg in p.packages:
+            fare = fares[pkg.transport] if pkg.multiplier == 1 else fares[pkg.transport] * pkg.multiplier
+            total = (fare * travelers * 2) + (hotels[pkg.hotel] * self.nights * rooms) + (pkg.daily * days * travelers)
+            packages.append({"name": pkg.name, "total": int(total), "per_person": int(total // travelers), "color": pkg.color})
+        return packages
+
+
+def quote(distance, origin_country, dest_country, adults, children, nights, profile=WEB, departure=None):
+    """Lazy Quote for one route, for departure (a date) if given; nothing is priced until a mode is read"""
+    return Quote(distance, origin_country, dest_country, adults, children, nights, profile, departure)
+
+
+def calculate_prices(distance, origin_country, dest_country, adults, children, nights, profile=WEB, departure=None):
+    """Quote for one route: flights, trains, buses, cabs, hotels and packages, all priced now"""
+    return Quote(distance, origin_country, dest_country, adults, children, nights, profile, departure).as_dict()
+
+
+# ============== BATCH PRICING ==============
+def _indexes(countries, rules):
+    """Cost index per row, resolving each distinct country once (so unknowns count once per batch)"""
+    seen = {}
+    for country in countries:
+        if country not in seen:
+            seen[country] = region_index(country, rules)
+    return np.array([seen[country] for country in countries], dtype=float)
+
+
+def _tiers(base, rules):
+    return np.stack([np.maximum(t.minimum, np.trunc(base * t.factor).astype(np.int64)) for t in rules], axis=1)
+
+
+def calculate_prices_batch(distance, origin_country, dest_country, adults, children, nights, profile=WEB):
+    """Columnar quotes: every argument is a sequence of N values, every price an int64 array with N rows.
+
+    Row i matches calculate_prices() on the i-th values exactly; trains/buses rows are only meaningful where
+    has_trains/has_buses is True. "table" and "profile" record the rules used, so batch_row() labels rows to match.
+    """
+    rules = table()
+    p = rules.profiles[profile]
+    distance = np.asarray(distance, dtype=float)
+    adults, children, nights = (np.asarray(v, dtype=np.int64) for v in (adults, children, nights))
+    origin_country = np.asarray(origin_country, dtype=object)
+    dest_country = np.asarray(dest_country, dtype=object)
+    travelers = adults + children
+    origin_index, dest_index = _indexes(origin_country, rules), _indexes(dest_country, rules)
+    avg_index = (origin_index + dest_index) / 2
+    is_international = origin_country != dest_country
+
+    # Same operation order as the scalar path so every float rounds identically before truncation
+    flight_base = p.flight_per_km * distance * avg_index * np.where(is_international, 1.5, 1)
+    flight_economy = np.maximum(p.flight_min, np.minimum(np.trunc(flight_base * 0.8).astype(np.int64), p.flight_max))
+    flight_business = np.trunc(flight_economy * 2.5).astype(np.int64)
+
+    has_trains = ~is_international & (distance < p.train_max_km)
+    has_buses = ~is_international & (distance < p.bus_max_km)
+    train_index = origin_index if p.train_index == "origin" else avg_index
+    bus_index = origin_index if p.bus_index == "origin" else avg_index
+    trains = _tiers(p.train_per_km * distance * train_index, p.trains)
+    buses = _tiers(p.bus_per_km * distance * bus_index, p.buses)
+    cabs = _tiers(p.cab_per_km * distance * dest_index, p.cabs)
+    hotels = np.stack([np.trunc(h.base * dest_index).astype(np.int64) for h in p.hotels], axis=1)
+    hotel_column = {h.key: i for i, h in enumerate(p.hotels)}
+
+    rooms = np.maximum(1, (travelers + 1) // 2)
+    days = nights + p.extra_days
+    fares = {"cheapest": np.where(has_buses, buses[:, 0], np.where(has_trains, trains[:, 0], flight_economy)),
+             "second_train": np.where(has_trains, trains[:, 1], flight_economy),
+             "economy": flight_economy, "business": flight_business}
+    totals, per_person = [], []
+    for pkg in p.packages:
+        fare = fares[pkg.transport] if pkg.multiplier == 1 else fares[pkg.transport] * pkg.multiplier
+        total = (fare * travelers * 2) + (hotels[:, hotel_column[pkg.hotel]] * nights * rooms) + (pkg.daily * days * travelers)
+        totals.append(np.trunc(total).astype(np.int64))
+        per_person.append(np.trunc(total // travelers).astype(np.int64))
+
+    return {"flight_economy": flight_economy, "flight_business": flight_business,
+            "has_trains": has_trains, "trains": trains, "has_buses": has_buses, "buses": buses, "cabs": cabs,
+            "hotels": hotels, "package_total": np.stack(totals, axis=1), "package_per_person": np.stack(per_person, axis=1),
+            "table": rules, "profile": profile}
+
+
+def batch_row(batch, i):
+    """Row i of a batch in calculate_prices() form"""
+    p = batch["table"].profiles[batch["profile"]]
+
+    def tiers(row, rules):
+        return [{"type": t.label, "price": int(price)} for t, price in zip(rules, row)]
+    return {"flights": [{"type": "Economy", "price": int(batch["flight_economy"][i])},
+                        {"type": "Business", "price": int(batch["flight_business"][i])}],
+            "trains": tiers(batch["trains"][i], p.trains) if batch["has_trains"][i] else [],
+            "buses": tiers(batch["buses"][i], p.buses) if batch["has_buses"][i] else [],
+            "cabs": tiers(batch["cabs"][i], p.cabs),
+            "hotels": {h.key: int(price) for h, price in zip(p.hotels, batch["hotels"][i])},
+            "packages": [{"name": pkg.name, "total": int(total), "per_person": int(pp), "color": pkg.color}
+                         for pkg, total, pp in zip(p.packages, batch["package_total"][i], batch["package_per_person"][i])]}
+
+
+# ============== FARE CALENDAR ==============
+WINDOW_DAYS = 60
+CALENDAR_MODES = ("flights", "trains", "buses")  # fares that vary with the departure date
+CALENDAR_LEAD = 7  # days shown before the chosen departure, so cheaper days just before it stay visible
+
+
+def calendar_start(departure, today=None):
+    """First day of the calendar window around departure (a date), never before today"""
+    return max(today or datetime.date.today(), departure - datetime.timedelta(days=CALENDAR_LEAD))
+
+
+def demand(dates, rules=None):
+    """Weekday x season demand multiplier for each date in a datetime64[D] array"""
+    calendar = (rules or table()).calendar
+    days = dates.astype("datetime64[D]")
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday; Monday is 0
+    months = days.astype("datetime64[M]")
+    mmdd = (months.astype(np.int64) % 12 + 1) * 100 + (days - months).astype(np.int64) + 1
+    season = np.ones(len(days))
+    for s in calendar.seasons:
+        inside = (mmdd >= s.start) & (mmdd <= s.end) if s.start <= s.end else (mmdd >= s.start) | (mmdd <= s.end)
+        season = np.where(inside, s.multiplier, season)
+    return np.asarray(calendar.weekday)[weekday] * season
+
+
+def fare_calendar(distance, origin_country, dest_country, start, days=WINDOW_DAYS, profile=WEB, mode="flights"):
+    """Per-person fares for one transport mode on each of the days from start (a date), in one pass over the window.
+
+    Only that mode is priced. "fares" has a column per class in "types" and "lowest" is the cheapest class each day;
+    None when the route has no such service.
+    """
+    if mode not in CALENDAR_MODES:
+        raise ValueError(f"mode must be one of {CALENDAR_MODES}")
+    rules = table()
+    tiers = quote(distance, origin_country, dest_country, 1, 0, 1, profile)[mode]
+    if not tiers:
+        return None
+    dates = np.datetime64(start, "D") + np.arange(days)
+    multiplier = demand(dates, rules)
+    priced = np.trunc(multiplier[:, None] * np.array([t["price"] for t in tiers])[None, :]).astype(np.int64)
+    return {"dates": dates, "demand": multiplier, "mode": mode, "types": [t["type"] for t in tiers],
+            "fares": priced, "lowest": priced.min(axis=1)}
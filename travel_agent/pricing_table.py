@@ -0,0 +1,241 @@
+"""
+TravelEase - Pricing Tables
+Fare rules read from pricing_tables.json into frozen slotted records; a changed file is swapped in whole.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+
+TABLE_PATH = os.environ.get("TRAVELEASE_PRICING_TABLE",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricing_tables.json"))
+CHECK_INTERVAL = 2.0  # seconds between checks of the file's mtime
+TRANSPORTS = {"cheapest", "second_train", "economy", "business"}  # fares a package can be built on
+INDEXES = {"origin", "average"}  # which cost index trains/buses are priced with
+# Tiers a profile must define: main.py shows all four train classes, offers.py raises these to what its inventories pick
+MIN_TIERS = {"trains": 4, "buses": 4, "cabs": 3}
+
+
+@dataclass(frozen=True, slots=True)
+class Tier:
+    label: str
+    factor: float
+    minimum: int  # priced max(minimum, int(base * factor))
+
+
+@dataclass(frozen=True, slots=True)
+class Hotel:
+    key: str
+    base: int  # per room-night before the destination's cost index
+
+
+@dataclass(frozen=True, slots=True)
+class Package:
+    name: str
+    transport: str
+    multiplier: float
+    hotel: str
+    daily: int  # spend per traveler per day, days = nights + extra_days
+    color: str
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    flight_per_km: float
+    flight_min: int
+    flight_max: int
+    train_per_km: float
+    train_max_km: float
+    train_index: str
+    trains: tuple
+    bus_per_km: float
+    bus_max_km: float
+    bus_index: str
+    buses: tuple
+    cab_per_km: float
+    cabs: tuple
+    hotels: tuple
+    packages: tuple
+    extra_days: int
+
+
+@dataclass(frozen=True, slots=True)
+class Season:
+    name: str
+    start: int  # month * 100 + day, inclusive; a season with start > end wraps over the new year
+    end: int
+    multiplier: float
+
+
+@dataclass(frozen=True, slots=True)
+class Calendar:
+    weekday: tuple  # demand multiplier per departure weekday, Monday first
+    seasons: tuple  # non-overlapping Season ranges; days outside all of them are 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class PricingTable:
+    version: int
+    digest: str  # of the file's bytes, so an edit that forgets to bump version still reads as a new table
+    cost_index: MappingProxyType
+    regions: MappingProxyType  # country -> region
+    default_region: str  # for countries missing from regions
+    calendar: Calendar
+    profiles: MappingProxyType
+
+
+def _check_tiers(name, profile, mode, count):
+    if len(getattr(profile, mode)) < count:
+        raise ValueError(f"pricing profile {name!r}: {mode} needs at least {count} tiers")
+
+
+def _profile(name, rules):
+    try:
+        profile = Profile(**dict(rules, trains=tuple(Tier(*t) for t in rules["trains"]),
+                                 buses=tuple(Tier(*t) for t in rules["buses"]),
+                                 cabs=tuple(Tier(*t) for t in rules["cabs"]),
+                                 hotels=tuple(Hotel(*h) for h in rules["hotels"]),
+                                 packages=tuple(Package(*p) for p in rules["packages"])))
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"pricing profile {name!r}: {e}") from None
+    hotels = {hotel.key for hotel in profile.hotels}
+    if profile.train_index not in INDEXES or profile.bus_index not in INDEXES:
+        raise ValueError(f"pricing profile {name!r}: train_index/bus_index must be one of {sorted(INDEXES)}")
+    for mode, count in MIN_TIERS.items():
+        _check_tiers(name, profile, mode, count)
+    for package in profile.packages:
+        if package.transport not in TRANSPORTS or package.hotel not in hotels:
+            raise ValueError(f"pricing profile {name!r}: package {package.name!r} uses an unknown transport or hotel")
+    return profile
+
+
+def _month_day(text):
+    month, day = (int(part) for part in text.split("-"))
+    if not 1 <= month <= 12 or not 1 <= day <= 31:
+        raise ValueError(f"bad month-day {text!r}")
+    return month * 100 + day
+
+
+def _in_season(season, mmdd):
+    if season.start <= season.end:
+        return season.start <= mmdd <= season.end
+    return mmdd >= season.start or mmdd <= season.end
+
+
+def _calendar(rules):
+    try:
+        calendar = Calendar(tuple(float(m) for m in rules["weekday"]),
+                            tuple(Season(name, _month_day(start), _month_day(end), float(multiplier))
+                                  for name, start, end, multiplier in rules["seasons"]))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"pricing calendar: {e}") from None
+    if len(calendar.weekday) != 7:
+        raise ValueError("pricing calendar: weekday needs one multiplier per day, Monday first")
+    for mmdd in (month * 100 + day for month in range(1, 13) for day in range(1, 32)):
+        matching = [season.name for season in calendar.seasons if _in_season(season, mmdd)]
+        if len(matching) > 1:
+            raise ValueError(f"pricing calendar: seasons {matching} overlap on {mmdd // 100:02d}-{mmdd % 100:02d}")
+    return calendar
+
+
+def _regions(rules, cost_index):
+    try:
+        pairs = [(region, country) for region, countries in rules.items() for country in countries]
+    except (AttributeError, TypeError) as e:
+        raise ValueError(f"pricing regions: {e}") from None
+    by_country = {}
+    for region, country in pairs:
+        if region not in cost_index:
+            raise ValueError(f"pricing regions: {region!r} has no cost_index")
+        if by_country.setdefault(country, region) != region:
+            raise ValueError(f"pricing regions: {country!r} is in both {by_country[country]!r} and {region!r}")
+    return by_country
+
+
+def parse(data, digest=""):
+    """PricingTable from the decoded JSON document; ValueError if anything is missing or inconsistent"""
+    try:
+        version, cost_index, profiles = int(data["version"]), dict(data["cost_index"]), data["profiles"]
+        default_region = data["default_region"]
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"pricing table: {e}") from None
+    if default_region not in cost_index:
+        raise ValueError(f"pricing table: default_region {default_region!r} has no cost_index")
+    return PricingTable(version, digest, MappingProxyType(cost_index),
+                        MappingProxyType(_regions(data.get("regions", {}), cost_index)), default_region,
+                        _calendar(data.get("calendar", {})),
+                        MappingProxyType({name: _profile(name, rules) for name, rules in profiles.items()}))
+
+
+def load(path=TABLE_PATH):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return parse(json.loads(raw), hashlib.sha256(raw).hexdigest()[:16])
+
+
+class TableSource:
+    """The live table for one file; readers get a complete table, a bad edit leaves the previous one in place"""
+
+    def __init__(self, path=TABLE_PATH, check_interval=CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._table = load(path)
+        self._mtime = os.stat(path).st_mtime_ns
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+        self.counters = {"reloads": 0, "failed_reloads": 0}
+        self.last_error = None
+
+    def current(self):
+        if time.monotonic() - self._checked >= self.check_interval:
+            self._maybe_reload()
+        return self._table
+
+    def _maybe_reload(self):
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                self.last_error = str(e)
+                return
+            if mtime != self._mtime and self._reload():
+                self._mtime = mtime  # a failed read (e.g. a half-written file) is retried at the next check
+
+    def _reload(self):
+        try:
+            table = load(self.path)
+        except (OSError, ValueError) as e:
+            self.counters["failed_reloads"] += 1
+            self.last_error = str(e)
+            return False
+        self._table = table  # one reference swap: no reader sees half a table
+        self.counters["reloads"] += 1
+        self.last_error = None
+        return True
+
+    def reload(self):
+        """Re-read the file now regardless of its mtime"""
+        with self._lock:
+            self._reload()
+        return self._table
+
+    def stats(self):
+        return dict(self.counters, version=self._table.version, digest=self._table.digest, last_error=self.last_error)
+
+
+SOURCE = TableSource()
+
+
+def current():
+    return SOURCE.current()
+
+
+def require_tiers(mode, count):
+    """For code indexing tiers up to count - 1: later loads need that many, ValueError if the live table is short"""
+    MIN_TIERS[mode] = max(MIN_TIERS[mode], count)
+    for name, profile in current().profiles.items():
+        _check_tiers(name, profile, mode, count)
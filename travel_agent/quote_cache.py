@@ -0,0 +1,93 @@
+"""
+TravelEase - Quote Cache
+Bounded LRU of priced routes keyed by location ids and trip parameters, shared by every session in the process.
+"""
+import time
+import threading
+from collections import OrderedDict
+import pricing
+
+SEED_CHECK_INTERVAL = 2.0  # seconds between reads of the seed hash, which only changes when a front end reseeds
+
+
+class QuoteCache:
+    def __init__(self, pool, maxsize=4096, seed_check_interval=SEED_CHECK_INTERVAL, clock=time.monotonic):
+        self.pool = pool
+        self.maxsize = maxsize
+        self.seed_check_interval = seed_check_interval
+        self.clock = clock
+        # (profile, origin_id, dest_id, adults, children, nights, departure day or None) -> (route, prices), or
+        # (profile-calendar, origin_id, dest_id, mode, start day, days) -> fare calendar
+        self._entries = OrderedDict()
+        self._version = None
+        self._seed = None
+        self._seed_checked = None
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def version(self):
+        """Changes whenever the fare rules or the seeded locations do"""
+        rules = pricing.table()
+        return rules.version, rules.digest, self._seed_hash()
+
+    def _seed_hash(self):
+        """The seeded locations' hash, re-read from app_meta at most every seed_check_interval seconds"""
+        now = self.clock()
+        if self._seed_checked is None or now - self._seed_checked >= self.seed_check_interval:
+            row = self.pool.connection().execute("SELECT value FROM app_meta WHERE key = 'seed_hash'").fetchone()
+            self._seed = row[0] if row else None
+            self._seed_checked = now
+        return self._seed
+
+    def _check_version(self):
+        version = self.version()
+        if version != self._version:
+            if self._entries:
+                self.counters["invalidations"] += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key):
+        """(route, prices) for key or None; shared across sessions, so treat the result as read-only"""
+        with self._lock:
+            self._check_version()
+            value = self._entries.get(key)
+            if value is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._check_version()
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.counters["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters, entries=len(self._entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# ============== PROCESS-WIDE CACHES ==============
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(pool):
+    with _caches_lock:
+        if pool.path not in _caches:
+            _caches[pool.path] = QuoteCache(pool)
+        return _caches[pool.path]
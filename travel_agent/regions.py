@@ -0,0 +1,46 @@
+"""
+TravelEase - Country to Region Registry
+Countries map to regions through the "regions" table in pricing_tables.json, reloaded with it; unknown countries
+fall back to its default_region, are counted and logged once each.
+"""
+import logging
+import threading
+from collections import Counter
+import pricing_table
+
+log = logging.getLogger(__name__)
+
+
+class RegionRegistry:
+    def __init__(self, source=None):
+        self.source = source or pricing_table.SOURCE
+        self.unknown = Counter()  # country -> lookups that fell back to the default
+        self._lock = threading.Lock()
+
+    def region(self, country, rules=None):
+        """Region of country under rules (a PricingTable) or the live table"""
+        rules = rules or self.source.current()
+        region = rules.regions.get(country)
+        if region is None:
+            self.report_unknown(country)
+            return rules.default_region
+        return region
+
+    def report_unknown(self, country, count=1):
+        with self._lock:
+            first = country not in self.unknown
+            self.unknown[country] += count
+        if first:
+            log.warning("no region for country %r in %s; priced as %s", country, self.source.path,
+                        self.source.current().default_region)
+
+    def countries(self):
+        return dict(self.source.current().regions)
+
+    def stats(self):
+        with self._lock:
+            return {"countries": len(self.source.current().regions), "unknown_lookups": sum(self.unknown.values()),
+                    "unknown_countries": dict(self.unknown.most_common(20))}
+
+
+REGISTRY = RegionRegistry()
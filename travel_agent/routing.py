@@ -0,0 +1,31 @@
+"""
+TravelEase - Concurrent Route Resolution
+Places geocoded in parallel under one overall deadline, with per-place failure reasons.
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+
+DEADLINE = 12.0
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="geocode")
+
+
+def resolve_places(geocode, queries, deadline=DEADLINE):
+    """(locations in query order, None where unresolved; {query: reason} for each failure)"""
+    futures = {query: _executor.submit(geocode, query) for query in dict.fromkeys(queries)}
+    done, _ = wait(futures.values(), timeout=deadline)
+    found, failures = {}, {}
+    for query, future in futures.items():
+        if future not in done:
+            future.cancel()  # a lookup already running finishes in the background and still fills the cache
+            failures[query] = f"timed out after {deadline:g}s"
+        elif future.exception() is not None:
+            failures[query] = f"lookup failed ({type(future.exception()).__name__})"
+        elif future.result() is None:
+            failures[query] = "not found"
+        else:
+            found[query] = future.result()
+    return [found.get(query) for query in queries], failures
+
+
+def describe_failures(failures):
+    """'Xyz: not found; Pune: timed out after 12s'"""
+    return "; ".join(f"{query}: {reason}" for query, reason in failures.items())
@@ -0,0 +1,71 @@
+"""
+TravelEase - Spatial Location Queries
+Radius and nearest-airport search: R*Tree bounding boxes pick candidates, exact haversine ranks them.
+"""
+import math
+import geo
+from location_index import JOINED_COLUMNS
+
+AIRPORT_RADII_KM = (100, 400, 1600, 6400, 20100)  # expanding search, the last covers the whole globe
+NEAREST_AIRPORT_KM = 500  # further than this a town gets no airport code attached
+
+
+def has_rtree(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'locations_rtree'").fetchone() is not None
+
+
+def _boxes(lat, lng, km):
+    """(min_lat, max_lat, min_lng, max_lng) boxes covering the circle, split at the antimeridian"""
+    delta = km / geo.EARTH_RADIUS_KM
+    min_lat, max_lat = lat - math.degrees(delta), lat + math.degrees(delta)
+    if min_lat <= -90 or max_lat >= 90 or math.sin(delta) >= math.cos(math.radians(lat)):
+        return [(max(min_lat, -90), min(max_lat, 90), -180, 180)]  # circle reaches a pole
+    d_lng = math.degrees(math.asin(math.sin(delta) / math.cos(math.radians(lat))))
+    west, east = lng - d_lng, lng + d_lng
+    if west < -180:
+        return [(min_lat, max_lat, west + 360, 180), (min_lat, max_lat, -180, east)]
+    if east > 180:
+        return [(min_lat, max_lat, west, 180), (min_lat, max_lat, -180, east - 360)]
+    return [(min_lat, max_lat, west, east)]
+
+
+def _candidates(conn, lat, lng, km, airports_only):
+    airport = " AND l.airport_code IS NOT NULL AND l.airport_code <> ''" if airports_only else ""
+    if not has_rtree(conn):
+        return conn.execute(f"SELECT {JOINED_COLUMNS} FROM locations l WHERE 1{airport}").fetchall()
+    rows = []
+    for box in _boxes(lat, lng, km):
+        rows += conn.execute(f"""SELECT {JOINED_COLUMNS} FROM locations_rtree r JOIN locations l ON l.id = r.id
+                             WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lng >= ? AND r.min_lng <= ?{airport}""",
+                             box).fetchall()
+    return rows
+
+
+def within(conn, lat, lng, km, limit=None, airports_only=False):
+    """Locations within km of (lat, lng), nearest first, as (id, name, lat, lng, country, region, airport_code, distance_km)"""
+    rows = _candidates(conn, lat, lng, km, airports_only)
+    if not rows:
+        return []
+    distances = geo.distances_from(lat, lng, [row[2] for row in rows], [row[3] for row in rows]).tolist()
+    hits = sorted(((d, row) for d, row in zip(distances, rows) if d <= km), key=lambda hit: (hit[0], hit[1][0]))
+    return [(*row, d) for d, row in hits[:limit]]
+
+
+def nearest_airport(conn, lat, lng, max_km=None):
+    """Closest location with an airport code, None if there is none within max_km"""
+    for radius in AIRPORT_RADII_KM:
+        if max_km is not None and radius > max_km:
+            radius = max_km
+        hits = within(conn, lat, lng, radius, limit=1, airports_only=True)
+        if hits or radius == max_km:
+            return hits[0] if hits else None
+    return None
+
+
+def with_airport(conn, loc, max_km=NEAREST_AIRPORT_KM):
+    """loc with "code" set to the nearest airport's when it has none of its own"""
+    if loc and not loc.get("code"):
+        airport = nearest_airport(conn, loc["lat"], loc["lng"], max_km)
+        if airport:
+            return dict(loc, code=airport[6])
+    return loc
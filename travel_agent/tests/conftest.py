@@ -0,0 +1,22 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # modules are imported by plain name
+
+import db_pool
+from benchmark import StubNominatim
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = db_pool.ConnectionPool(str(tmp_path / "travel_agent.db"))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def stub():
+    stub = StubNominatim(0)
+    yield stub
+    stub.close()
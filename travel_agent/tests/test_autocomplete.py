@@ -0,0 +1,36 @@
+import autocomplete
+
+
+def names(index, query):
+    return [name for name, _, _ in index.search(query)]
+
+
+def test_refresh_applies_inserts_renames_and_deletes(pool):
+    index = autocomplete.PrefixIndex.load(pool.connection())
+    loaded = len(index)
+    pool.write(lambda c: c.execute("INSERT INTO locations (name, lat, lng, country, airport_code, name_norm) "
+                                   "VALUES ('Zzyzx', 35.1, -116.1, 'USA', 'ZZX', 'zzyzx')"))
+    assert index.refresh(pool.connection()) == 1
+    assert names(index, "zzy") == ["Zzyzx"] and len(index) == loaded + 1
+
+    pool.write(lambda c: c.execute("UPDATE locations SET name = 'Qwerton', name_norm = 'qwerton' WHERE name = 'Zzyzx'"))
+    assert index.refresh(pool.connection()) == 1
+    assert names(index, "zzy") == [] and names(index, "qwer") == ["Qwerton"]
+    assert names(index, "zzx") == ["Qwerton"]  # the code still points at the renamed row
+
+    pool.write(lambda c: c.execute("DELETE FROM locations WHERE name = 'Qwerton'"))
+    assert index.refresh(pool.connection()) == 1
+    assert names(index, "qwer") == [] and names(index, "zzx") == [] and len(index) == loaded
+    assert index.refresh(pool.connection()) == 0
+
+
+def test_bulk_refresh_matches_a_fresh_load(pool):
+    index = autocomplete.PrefixIndex.load(pool.connection())
+    pool.write(lambda c: c.executemany("INSERT INTO locations (name, lat, lng, country, name_norm) VALUES (?, 0, 0, 'Nowhere', ?)",
+                                       [(f"Town {i:04d}", f"town {i:04d}") for i in range(1500)]))
+    pool.write(lambda c: c.execute("DELETE FROM locations WHERE name LIKE 'Town 00%'"))
+    assert index.refresh(pool.connection()) == 1500  # one feed row per location, the deleted ones included
+    fresh = autocomplete.PrefixIndex.load(pool.connection())
+    assert len(index) == len(fresh)
+    assert names(index, "town") == names(fresh, "town") == [f"Town {i:04d}" for i in range(100, 106)]
+    assert names(index, "0050") == []
@@ -0,0 +1,30 @@
+import pytest
+import bookings
+
+
+def plan(conn, sql, args):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, args)]
+
+
+@pytest.mark.parametrize("sql, args", [(bookings.HISTORY_FIRST, (1, bookings.HISTORY_PAGE)),
+                                       (bookings.HISTORY_AFTER, (1, "2024-06-01 00:00:00", 0, bookings.HISTORY_PAGE))])
+def test_history_pages_read_the_index_in_order(pool, sql, args):
+    steps = plan(pool.connection(), sql, args)
+    assert any("USING INDEX idx_bookings_user_created" in step for step in steps), steps
+    assert not any("TEMP B-TREE" in step for step in steps), steps
+
+
+def test_keyset_pages_cover_the_history_once(pool):
+    user_id = pool.write(lambda c: c.execute("INSERT INTO users (name, email, password) VALUES ('A', 'a@test', 'x')").lastrowid)
+    stamps = [f"2024-01-{1 + i // 3:02d} 10:00:00" for i in range(25)]  # three bookings per timestamp: ties broken by id
+    pool.write(lambda c: c.executemany("INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, "
+                                       "total_cost, created_at) VALUES (?, 'package', 'Delhi', 'Goa', 1, 5000, ?)",
+                                       [(user_id, stamp) for stamp in stamps]))
+    conn, seen, cursor = pool.connection(), [], None
+    while True:
+        rows, cursor = bookings.history(conn, user_id, cursor, limit=4)
+        seen += rows
+        if cursor is None:
+            break
+    assert len(seen) == 25 and len({row[0] for row in seen}) == 25
+    assert [(row[6], row[0]) for row in seen] == sorted(((row[6], row[0]) for row in seen), reverse=True)
@@ -0,0 +1,27 @@
+import logging
+import sqlite3
+import database
+
+
+def test_migration_3_merges_case_duplicates_into_the_oldest_row(tmp_path, caplog):
+    conn = sqlite3.connect(str(tmp_path / "old.db"), isolation_level=None)
+    cursor = conn.cursor()
+    database.get_schema_version(cursor)
+    for version, migration in database.MIGRATIONS[:2]:
+        migration(cursor)
+        cursor.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+    cursor.executemany("INSERT INTO locations (name, lat, lng, country) VALUES (?, 15.3, 74.1, 'India')",
+                       [("Goa",), ("Delhi",), ("GOA",), ("goa",)])
+    cursor.executemany("INSERT INTO bookings (user_id, booking_type, origin, destination, travelers, total_cost) "
+                       "VALUES (1, 'package', ?, ?, 1, 5000)", [("Delhi", "GOA"), ("goa", "Delhi"), ("Delhi", "Goa")])
+
+    with caplog.at_level(logging.WARNING, logger="database"):
+        assert database.migrate(conn) == [v for v, _ in database.MIGRATIONS[2:]]
+
+    assert conn.execute("SELECT id, name FROM locations ORDER BY id").fetchall() == [(1, "Goa"), (2, "Delhi")]
+    assert conn.execute("SELECT origin, destination FROM bookings ORDER BY id").fetchall() == [
+        ("Delhi", "Goa"), ("Goa", "Delhi"), ("Delhi", "Goa")]
+    removed = [r.getMessage() for r in caplog.records if "migration 3" in r.getMessage()]
+    assert len(removed) == 2 and "'GOA'" in removed[0] and "'goa'" in removed[1]
+    assert conn.execute("SELECT users, bookings FROM stats WHERE scope = 'all'").fetchone()[1] == 3
+    conn.close()
@@ -0,0 +1,42 @@
+import pytest
+import distance_matrix
+from geo import haversine
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def place(pool, name):
+    row = pool.connection().execute("SELECT id, lat, lng FROM locations WHERE name = ?", (name,)).fetchone()
+    return {"id": row[0], "lat": row[1], "lng": row[2]}
+
+
+def test_moved_places_are_repriced_once_the_feed_check_is_due(pool):
+    clock = Clock()
+    matrix = distance_matrix.DistanceMatrix(pool, check_interval=2.0, clock=clock)
+    goa, delhi = place(pool, "Goa"), place(pool, "Delhi")
+    before = matrix.great_circle(goa, delhi)
+    pool.write(lambda c: c.execute("UPDATE locations SET lat = 15.5, lng = 73.8 WHERE name = 'Goa'"))
+    assert matrix.great_circle(goa, delhi) == before
+    clock.now = 2.0
+    assert matrix.great_circle(goa, delhi) == pytest.approx(float(haversine(15.5, 73.8, delhi["lat"], delhi["lng"])))
+    assert matrix.great_circle(delhi, goa) == matrix.great_circle(goa, delhi)
+
+
+def test_deleted_places_free_their_row_for_the_next_one(pool):
+    matrix = distance_matrix.DistanceMatrix(pool, check_interval=0)
+    seeded, delhi = len(matrix), place(pool, "Delhi")
+    pool.write(lambda c: c.execute("DELETE FROM locations WHERE name = 'Goa'"))
+    assert matrix.refresh() == 1 and len(matrix) == seeded - 1
+    pool.write(lambda c: c.execute("INSERT INTO locations (name, lat, lng, country, name_norm) "
+                                   "VALUES ('Zzyzx', 35.1, -116.1, 'USA', 'zzyzx')"))
+    zzyzx = place(pool, "Zzyzx")
+    assert matrix.great_circle(zzyzx, delhi) == pytest.approx(float(haversine(35.1, -116.1, delhi["lat"], delhi["lng"])))
+    assert len(matrix) == seeded and matrix._size == seeded  # the freed row was reused, the matrix did not grow
+    km = matrix.submatrix([zzyzx, delhi, place(pool, "Paris")])
+    assert km[0, 1] == km[1, 0] == pytest.approx(matrix.great_circle(zzyzx, delhi))
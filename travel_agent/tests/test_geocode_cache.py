@@ -0,0 +1,86 @@
+import geocode_cache
+import regions
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Fetch:
+    """Stand-in for the Nominatim lookup: counts calls, no match for queries containing 'zz'"""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, query):
+        self.calls.append(query)
+        if "zz" in query.lower():
+            return None
+        return {"name": query.title(), "lat": 12.5, "lng": 77.5, "country": "India", "code": ""}
+
+
+def make_cache(pool, **kwargs):
+    clock, fetch = Clock(), Fetch()
+    return geocode_cache.GeocodeCache(pool, fetch=fetch, clock=clock, **kwargs), clock, fetch
+
+
+def test_hit_skips_the_network(pool):
+    cache, _, fetch = make_cache(pool)
+    first = cache.resolve("Hampi")
+    assert cache.resolve("  hampi ") == first
+    assert fetch.calls == ["Hampi"]
+    assert cache.stats()["memory_hits"] == 1
+    fresh, _, fetch = make_cache(pool)  # empty LRU, same table
+    assert fresh.resolve("Hampi") == first and fetch.calls == []
+    assert fresh.stats()["db_hits"] == 1
+
+
+def test_positive_entries_expire_after_their_ttl(pool):
+    cache, clock, fetch = make_cache(pool, hit_ttl=100, miss_ttl=10)
+    cache.resolve("Hampi")
+    clock.now += 99
+    cache.resolve("Hampi")
+    assert len(fetch.calls) == 1
+    clock.now += 1
+    assert cache.lookup("Hampi") == (False, None)
+    cache.resolve("Hampi")
+    assert len(fetch.calls) == 2
+
+
+def test_negative_entries_expire_after_their_ttl(pool):
+    cache, clock, fetch = make_cache(pool, hit_ttl=100, miss_ttl=10)
+    assert cache.resolve("Zzyzx") is None
+    clock.now += 9
+    assert cache.resolve("Zzyzx") is None
+    assert len(fetch.calls) == 1 and cache.stats()["negative_hits"] == 1
+    clock.now += 1
+    assert cache.lookup("Zzyzx") == (False, None)
+    cache.resolve("Zzyzx")
+    assert len(fetch.calls) == 2
+
+
+def test_lru_holds_at_capacity(pool):
+    cache, _, _ = make_cache(pool, memory_size=3)
+    for name in ("Agra", "Hampi", "Kochi"):
+        cache.resolve(name)
+    cache.resolve("Agra")  # most recently used now
+    cache.resolve("Ooty")  # evicts Hampi, the least recently used
+    assert len(cache._memory) == 3
+    assert list(cache._memory) == ["kochi", "agra", "ooty"]
+    cache.lookup("Hampi")
+    assert cache.stats()["db_hits"] == 1  # evicted from memory, still served from the table
+    assert len(cache._memory) == 3
+
+
+def test_promoted_hits_carry_their_countrys_region(pool, monkeypatch):
+    registry = regions.RegionRegistry()
+    monkeypatch.setattr(regions, "REGISTRY", registry)
+    cache, _, _ = make_cache(pool)
+    cache.store("Kyoto", {"name": "Kyoto", "lat": 35.0, "lng": 135.8, "country": "Japan", "code": ""})
+    cache.store("Atlantis", {"name": "Atlantis", "lat": 0.0, "lng": -30.0, "country": "Atlantis", "code": ""})
+    rows = dict(pool.connection().execute("SELECT name, region FROM locations WHERE name IN ('Kyoto', 'Atlantis')"))
+    assert rows == {"Kyoto": "east_asia", "Atlantis": registry.source.current().default_region}
+    assert registry.stats()["unknown_countries"] == {"Atlantis": 1}
@@ -0,0 +1,81 @@
+import time
+import threading
+import pytest
+import requests
+import nominatim
+
+
+def test_concurrent_identical_lookups_share_one_request(stub):
+    stub.delay = 0.2
+    client = nominatim.NominatimClient(stub.url, rate=None)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.search("Same Town"))) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stub.requests == 1
+    assert len(results) == 20 and all(r == results[0] for r in results) and results[0]["name"] == "Same Town"
+    assert client.stats()["coalesced"] == 19
+    client.close()
+
+
+@pytest.mark.parametrize("status", [503, 429])
+def test_lookup_succeeds_after_retryable_errors(stub, status):
+    stub.fail_next, stub.fail_status = 2, status
+    client = nominatim.NominatimClient(stub.url, rate=None, retries=2, backoff=0.01)
+    assert client.search("Flaky Town")["name"] == "Flaky Town"
+    assert stub.requests == 3
+    assert client.stats()["retries"] == 2 and client.stats()["errors"] == 0
+    client.close()
+
+
+@pytest.mark.parametrize("header", ["0", "Wed, 21 Oct 2015 07:28:00 GMT", "soon"])
+def test_any_retry_after_form_is_retried(stub, header):
+    stub.fail_next, stub.fail_status, stub.retry_after = 1, 503, header
+    client = nominatim.NominatimClient(stub.url, rate=None, retries=1, backoff=0.01)
+    assert client.search("Busy Town")["name"] == "Busy Town"
+    assert stub.requests == 2
+    client.close()
+
+
+def test_retry_after_reads_seconds_and_http_dates():
+    now = 1445412480.0  # Wed, 21 Oct 2015 07:28:00 GMT
+    assert nominatim.retry_after("120", now) == 120
+    assert nominatim.retry_after("Wed, 21 Oct 2015 07:28:05 GMT", now) == 5
+    assert nominatim.retry_after("Wed, 21 Oct 2015 07:27:00 GMT", now) == 0  # already past
+    assert nominatim.retry_after("soon", now) == nominatim.retry_after(None, now) == 0
+
+
+def test_gives_up_after_the_last_retry(stub):
+    stub.fail_next = 3
+    client = nominatim.NominatimClient(stub.url, rate=None, retries=2, backoff=0.01)
+    with pytest.raises(requests.HTTPError):
+        client.search("Down Town")
+    assert stub.requests == 3 and client.stats()["errors"] == 1
+    client.close()
+
+
+def test_request_rate_stays_within_the_limit(stub):
+    rate, lookups = 20.0, 12
+    client = nominatim.NominatimClient(stub.url, rate=rate)
+    threads = [threading.Thread(target=client.search, args=(f"Town {i}",)) for i in range(lookups)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    arrivals = sorted(stub.arrivals)
+    assert len(arrivals) == lookups
+    burst = client.limiter.burst
+    for k, arrived in enumerate(arrivals):  # the k-th request cannot beat the k-th token
+        assert arrived - started >= (k + 1 - burst) / rate - 0.005
+    assert (lookups - burst) / (arrivals[-1] - started) <= rate
+    client.close()
+
+
+def test_token_bucket_waits_for_each_token():
+    bucket = nominatim.TokenBucket(rate=50, burst=1)
+    waits = [bucket.acquire() for _ in range(5)]
+    assert waits[0] == 0
+    assert all(w > 0 for w in waits[1:])
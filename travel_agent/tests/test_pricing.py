@@ -0,0 +1,27 @@
+import datetime
+import pytest
+import pricing
+
+
+@pytest.mark.parametrize("mode", pricing.CALENDAR_MODES)
+def test_dated_quote_matches_its_calendar_day(mode):
+    start = datetime.date(2026, 12, 10)  # runs into the winter holiday season
+    calendar = pricing.fare_calendar(900, "India", "India", start, mode=mode)
+    for offset in (0, 5, 13, 30, 59):
+        day = start + datetime.timedelta(days=offset)
+        quote = pricing.quote(900, "India", "India", 2, 1, 3, departure=day)
+        assert [t["price"] for t in quote[mode]] == calendar["fares"][offset].tolist()
+
+
+def test_departure_date_reaches_packages():
+    quiet, busy = (pricing.quote(900, "India", "UAE", 2, 0, 3, departure=day)
+                   for day in (datetime.date(2026, 8, 4), datetime.date(2026, 12, 26)))
+    assert busy["flights"][0]["price"] > quiet["flights"][0]["price"]
+    assert busy["packages"][0]["total"] > quiet["packages"][0]["total"]
+    assert quiet["hotels"] == busy["hotels"] and quiet["cabs"] == busy["cabs"]
+
+
+def test_calendar_starts_a_week_before_departure_but_not_in_the_past():
+    today = datetime.date(2026, 10, 17)
+    assert pricing.calendar_start(datetime.date(2026, 11, 1), today) == datetime.date(2026, 10, 25)
+    assert pricing.calendar_start(datetime.date(2026, 10, 20), today) == today
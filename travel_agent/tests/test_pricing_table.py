@@ -0,0 +1,48 @@
+import json
+import pytest
+import offers
+import pricing
+import pricing_table
+
+
+def minimal_table(tmp_path, **tiers):
+    """The shipped table cut down to the fewest tiers validation allows, or to the given counts"""
+    with open(pricing_table.TABLE_PATH) as f:
+        data = json.load(f)
+    for profile in data["profiles"].values():
+        for mode, count in pricing_table.MIN_TIERS.items():
+            profile[mode] = profile[mode][:tiers.get(mode, count)]
+    path = tmp_path / "pricing_tables.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.mark.parametrize("mode", sorted(pricing_table.MIN_TIERS))
+def test_too_few_tiers_are_rejected(tmp_path, mode):
+    with pytest.raises(ValueError, match=f"{mode} needs at least"):
+        pricing_table.load(minimal_table(tmp_path, **{mode: pricing_table.MIN_TIERS[mode] - 1}))
+
+
+@pytest.mark.parametrize("profile", [pricing.WEB, pricing.DESKTOP])
+def test_minimal_table_prices_every_offer(tmp_path, monkeypatch, profile):
+    monkeypatch.setattr(pricing_table, "SOURCE", pricing_table.TableSource(minimal_table(tmp_path)))
+    prices = pricing.calculate_prices(300, "India", "India", 2, 0, 3, profile)
+    assert prices["trains"] and prices["buses"]
+    for offers_for in (offers.flight_offers, offers.train_offers, offers.bus_offers, offers.cab_offers):
+        everything = list(offers_for(prices))
+        assert offers.select(offers_for(prices), k=3) == sorted(everything, key=offers.SORTS["price"])[:3]
+
+
+def test_offer_inventories_only_pick_tiers_the_table_must_define():
+    for mode, tiers in (("trains", [t[4] for t in offers.TRAINS]), ("buses", [b[4] for b in offers.BUSES]),
+                        ("cabs", [c[3] for c in offers.CABS])):
+        assert max(tiers) < pricing_table.MIN_TIERS[mode]
+
+
+def test_required_tiers_apply_to_the_live_table_and_later_loads(tmp_path, monkeypatch):
+    monkeypatch.setitem(pricing_table.MIN_TIERS, "cabs", pricing_table.MIN_TIERS["cabs"])
+    monkeypatch.setattr(pricing_table, "SOURCE", pricing_table.TableSource(minimal_table(tmp_path)))
+    with pytest.raises(ValueError, match="cabs needs at least 4"):
+        pricing_table.require_tiers("cabs", 4)  # an inventory picking cab tier 3 fails at import, not mid-search
+    with pytest.raises(ValueError, match="cabs needs at least 4"):
+        pricing_table.load(pricing_table.TABLE_PATH)
@@ -0,0 +1,39 @@
+import pricing_table
+import quote_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hits_stay_in_memory_until_the_seed_check_is_due(pool):
+    clock = Clock()
+    cache = quote_cache.QuoteCache(pool, seed_check_interval=2.0, clock=clock)
+    cache.put(("web", 1, 2, 2, 0, 3, None), "quote")
+    statements = []
+    pool.connection().set_trace_callback(statements.append)
+    assert all(cache.get(("web", 1, 2, 2, 0, 3, None)) == "quote" for _ in range(100))
+    assert statements == []
+
+    pool.write(lambda c: c.execute("UPDATE app_meta SET value = 'reseeded' WHERE key = 'seed_hash'"))
+    clock.now = 1.9
+    assert cache.get(("web", 1, 2, 2, 0, 3, None)) == "quote"
+    clock.now = 2.0
+    assert cache.get(("web", 1, 2, 2, 0, 3, None)) is None
+    assert len(statements) == 1 and cache.stats()["invalidations"] == 1
+    pool.connection().set_trace_callback(None)
+
+
+def test_a_pricing_table_reload_clears_the_cache(pool, tmp_path, monkeypatch):
+    cache = quote_cache.QuoteCache(pool)
+    cache.put(("web", 1, 2, 2, 0, 3, None), "quote")
+    edited = tmp_path / "pricing_tables.json"
+    with open(pricing_table.TABLE_PATH) as f:
+        edited.write_text(f.read() + "\n")  # same rules, new digest
+    monkeypatch.setattr(pricing_table, "SOURCE", pricing_table.TableSource(str(edited)))
+    assert cache.get(("web", 1, 2, 2, 0, 3, None)) is None
+    assert cache.stats()["invalidations"] == 1